@@ -0,0 +1,65 @@
+"""Бенчмарк сравнения двух версий данных (SnapshotDiff) против merge pandas.
+
+Вторая версия получается из первой: часть строк получает баллы, места
+пересчитываются, часть участников выбывает и появляются новые.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_diff [--participants N] [--churn доля]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.config import MainConfig
+from core.parser import RatingStore
+from core.analytics import SnapshotDiff
+from benchmarks.bench_history import next_snapshot
+from benchmarks.fixtures import make_season, make_pages
+
+
+def naive_diff(previous: RatingStore, current: RatingStore) -> pd.DataFrame:
+    """Сравнение через внешнее соединение pandas по (участник, тип рейтинга)."""
+    columns = ['participant', 'rating_type', 'rank', 'points']
+    before = previous.frame[columns].astype({'participant': object, 'rating_type': object})
+    after = current.frame[columns].astype({'participant': object, 'rating_type': object})
+    merged = after.merge(before, on=['participant', 'rating_type'], how='outer',
+                         suffixes=('_after', '_before'), indicator=True)
+    merged['rank_delta'] = merged['rank_before'].astype(float) - merged['rank_after'].astype(float)
+    merged['points_delta'] = merged['points_after'] - merged['points_before']
+    return merged
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=100000)
+    arg_parser.add_argument('--churn', type=float, default=0.01, help="доля строк, меняющихся за обновление")
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=args.participants, zero_share=0.4)
+    previous = RatingStore.from_pages(make_pages(season))
+    current = next_snapshot(previous, args.churn, np.random.default_rng(42))
+    frame = current.frame
+    dropped = frame['participant'].cat.categories[:args.participants // 100]
+    current = RatingStore(frame[~frame['participant'].isin(dropped)].reset_index(drop=True))
+    print(f"Строк: {len(previous)} -> {len(current)}")
+
+    for name, function in (('SnapshotDiff', SnapshotDiff.compute), ('merge pandas', naive_diff)):
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            function(previous, current)
+            times.append(time.perf_counter() - started)
+        print(f"{name:<13} медиана {np.median(times) * 1000:7.0f} мс, минимум {np.min(times) * 1000:7.0f} мс")
+
+    diff = SnapshotDiff.compute(previous, current)
+    started = time.perf_counter()
+    diff.summary()
+    diff.climbers
+    print(f"Сводка и лучшие по языкам: {(time.perf_counter() - started) * 1000:.0f} мс")
+
+
+if __name__ == '__main__':
+    main()
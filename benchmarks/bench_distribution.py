@@ -0,0 +1,96 @@
+"""Бенчмарк распределения баллов и активности: гистограммы одним np.bincount
+и процентили np.nanpercentile по матрице участник × язык
+(RatingMatrix.score_distribution) против pd.cut + groupby по длинному формату,
+активность по дням - resample по дате последнего решения (RatingMatrix.activity)
+против groupby по дате в прежнем формате.
+
+Время матрицы измеряется без построения RatingMatrix (оно выполняется один
+раз на версию данных и измеряется отдельно).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_distribution [--participants N]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.config import MainConfig
+from core.parser import RatingStore
+from core.analytics import RatingMatrix
+from core.analytics.config import StatConfig
+from benchmarks.fixtures import make_season, make_pages
+
+
+def naive_distribution(store: RatingStore, bin_edges: list) -> tuple:
+    """Гистограммы и процентили через pd.cut и groupby по языкам."""
+    frame = store.frame
+    frame = frame.drop_duplicates(['participant', 'rating_type'])
+    frame = frame[(frame['points'] > 0) & frame['rating_type'].isin(StatConfig.LANGUAGES)
+                  & (frame['rating_type'] != 'Общий')]
+    # Интервалы [a, b), последний закрыт справа - как у np.histogram
+    edges = [*bin_edges[:-1], np.inf]
+    bins = pd.cut(frame['points'].round(store.POINTS_DECIMALS), edges, right=False, labels=False)
+    histograms = frame.groupby([frame['rating_type'].astype(str), bins]).size().unstack(fill_value=0)
+    quantiles = frame.groupby(frame['rating_type'].astype(str))['points'].quantile(
+        [percentile / 100 for percentile in StatConfig.SCORE_PERCENTILES]
+    ).unstack()
+    return histograms, quantiles
+
+
+def naive_activity(store: RatingStore) -> pd.Series:
+    """Участники по дню последнего решения через прежний формат."""
+    legacy = store.to_legacy_frame().dropna(subset=['Дата'])
+    last = legacy.groupby('Участник')['Дата'].max()
+    return last.dt.floor('D').value_counts().sort_index()
+
+
+def timed(func, repeat: int):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=100000)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=args.participants, zero_share=0.4)
+    store = RatingStore.from_pages(make_pages(season))
+    print(f"Строк: {len(store)}, участников: {len(store.participants)}")
+
+    started = time.perf_counter()
+    RatingMatrix.build(store)
+    print(f"Построение RatingMatrix: {(time.perf_counter() - started) * 1000:.0f} мс")
+
+    # Каждый повтор - новая матрица, чтобы не измерять закэшированный результат
+    matrices = [RatingMatrix.build(store) for _ in range(args.repeat)]
+    distribution_time, distribution = timed(lambda: matrices.pop().score_distribution, args.repeat)
+    naive_time, (histograms, quantiles) = timed(lambda: naive_distribution(store, distribution['bin_edges']), 1)
+    print(f"Распределение баллов: {distribution_time * 1000:.1f} мс, pd.cut + groupby: {naive_time * 1000:.0f} мс "
+          f"(в {naive_time / distribution_time:.0f} раз медленнее)")
+    same = all(
+        histograms.loc[lang].tolist() == distribution['histograms'][i]
+        and np.allclose(quantiles.loc[lang].to_numpy(), distribution['percentiles'][lang])
+        for i, lang in enumerate(distribution['languages']) if lang in distribution['percentiles']
+    )
+    print(f"Результаты совпадают: {same}")
+
+    matrices = [RatingMatrix.build(store) for _ in range(args.repeat)]
+    activity_time, activity = timed(lambda: matrices.pop().activity, args.repeat)
+    naive_time, expected = timed(lambda: naive_activity(store), 1)
+    print(f"Активность по дням: {activity_time * 1000:.1f} мс, прежний формат: {naive_time * 1000:.0f} мс "
+          f"(в {naive_time / activity_time:.0f} раз медленнее)")
+    daily = pd.Series(activity['day_counts'], index=pd.to_datetime(activity['days']))
+    print(f"Результаты совпадают: {daily[daily > 0].tolist() == expected.tolist()}")
+
+
+if __name__ == '__main__':
+    main()
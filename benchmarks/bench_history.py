@@ -0,0 +1,92 @@
+"""Бенчмарк истории обновлений: рост хранилища и скорость запросов траектории.
+
+Сезон обновляется snapshots раз: при каждом обновлении часть участников
+получает баллы, места пересчитываются. Сравнивается объем истории с
+дельта-кодированием и объем полных снимков, время добавления снимка,
+и запроса траектории участника (против чтения полных снимков).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_history [--participants N] [--snapshots N] [--churn доля]
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from core.config import MainConfig
+from core.parser import RatingStore, RatingHistory
+from benchmarks.fixtures import make_season, make_pages
+
+
+def next_snapshot(store: RatingStore, churn: float, rng: np.random.Generator) -> RatingStore:
+    """Следующее обновление: доля churn строк получает баллы, места пересчитываются."""
+    frame = store.frame.copy()
+    points = frame['points'].to_numpy().copy()
+    changed = rng.choice(len(frame), max(1, int(len(frame) * churn)), replace=False)
+    points[changed] += rng.integers(1, 50, len(changed)).astype(np.float32)
+    frame['points'] = points
+    frame['rank'] = frame.groupby('rating_type', observed=True)['points'] \
+        .rank(method='first', ascending=False).astype('Int32')
+    return RatingStore(frame)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=20000)
+    arg_parser.add_argument('--snapshots', type=int, default=300)
+    arg_parser.add_argument('--churn', type=float, default=0.01, help="доля строк, меняющихся за обновление")
+    arg_parser.add_argument('--queries', type=int, default=100)
+    args = arg_parser.parse_args()
+
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=args.participants, zero_share=0.4)
+    store = RatingStore.from_pages(make_pages(season))
+    rng = np.random.default_rng(42)
+    started_at = datetime(2025, 7, 1)
+    print(f"Строк в снимке: {len(store)}, снимков: {args.snapshots}, изменений за обновление: {args.churn:.1%}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        history = RatingHistory(directory / 'history')
+        full_path = directory / 'full.parquet'
+        full_size = 0
+        append_times = []
+        for snapshot in range(args.snapshots):
+            store = next_snapshot(store, args.churn, rng)
+            started = time.perf_counter()
+            history.append(store, started_at + timedelta(minutes=15 * snapshot))
+            append_times.append(time.perf_counter() - started)
+            store.write_snapshot(full_path, 'parquet')
+            full_size += full_path.stat().st_size
+
+        started = time.perf_counter()
+        RatingStore.read_snapshot(full_path, 'parquet')
+        full_read = time.perf_counter() - started
+
+        history_size = history.size_bytes()
+        print(f"\nОбъем: история {history_size / 2 ** 20:.1f} МБ, полные снимки parquet "
+              f"{full_size / 2 ** 20:.1f} МБ (в {full_size / history_size:.1f} раза больше)")
+        print(f"Добавление снимка: среднее {np.mean(append_times) * 1000:.0f} мс, "
+              f"максимум {np.max(append_times) * 1000:.0f} мс")
+
+        history = RatingHistory(directory / 'history')
+        names = random.Random(42).sample(list(store.participants), args.queries)
+        started = time.perf_counter()
+        history.trajectory(names[0])
+        print(f"Первый запрос (чтение метаданных всех снимков): {(time.perf_counter() - started) * 1000:.0f} мс")
+
+        for last in (10, 100, None):
+            started = time.perf_counter()
+            for name in names:
+                history.trajectory(name, last)
+            elapsed = (time.perf_counter() - started) / len(names)
+            window = last or args.snapshots
+            print(f"Траектория за {window:>4} снимков: {elapsed * 1000:7.1f} мс "
+                  f"(чтение {window} полных снимков: ~{full_read * window * 1000:.0f} мс)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Бенчмарк построения матрицы участник × тип рейтинга (RatingMatrix)
+против прежней группировки по участнику (groupby.agg) по данным в прежнем формате.
+
+Для каждого размера данных измеряется время построения и время запросов
+аналитики: количество участников по языкам, распределение по количеству
+языков и сводка участника для /user_stats.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_matrix [--rows 10000 100000 1000000] [--skip-legacy]
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from core.config import MainConfig
+from core.parser import RatingStore
+from core.analytics import RatingMatrix
+from benchmarks.fixtures import make_season, make_pages
+
+RATING_TYPES = ['Общий', *MainConfig.LANGUAGES]
+
+
+def make_store(participants: int) -> RatingStore:
+    season = make_season(RATING_TYPES, participants=participants, zero_share=0.4)
+    return RatingStore.from_pages(make_pages(season))
+
+
+def legacy_group_by_user(df: pd.DataFrame) -> pd.DataFrame:
+    """Прежний StatsCalculator.group_by_user: одна строка на участника через groupby.agg."""
+    agg = {'Дата': 'max', 'Задачи': 'first'}
+    agg.update({col: 'first' for col in df.columns if col.startswith(('Место_', 'Баллы_'))})
+    df = df.assign(**{
+        'Дата': pd.to_datetime(df['Дата'], errors='coerce'),
+        **{col: pd.to_numeric(df[col], errors='coerce') for col in df.columns if col.startswith('Баллы_')}
+    })
+    df = df.dropna(subset=['Дата'])
+    return df.groupby('Участник').agg(agg).reset_index()
+
+
+def timed(func, *args, repeat: int = 1):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    arg_parser.add_argument('--skip-legacy', action='store_true', help="не измерять прежнюю группировку")
+    arg_parser.add_argument('--queries', type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    rows_per_participant = len(make_store(1000)) / 1000
+    print(f"{'строк':>9} {'участников':>11} {'матрица, мс':>12} {'groupby.agg, мс':>18} "
+          f"{'по языкам, мс':>14} {'языков на участника, мс':>24} {'сводка, мкс':>12}")
+    for rows in args.rows:
+        store = make_store(max(1, round(rows / rows_per_participant)))
+        build_time, matrix = timed(RatingMatrix.build, store, repeat=3)
+        legacy_time = None
+        if not args.skip_legacy:
+            legacy = store.to_legacy_frame()
+            legacy_time, _ = timed(legacy_group_by_user, legacy)
+
+        counts_time, _ = timed(matrix.language_counts, repeat=5)
+        per_user_time, _ = timed(matrix.languages_per_user, repeat=5)
+        names = random.Random(42).choices(list(store.participants), k=args.queries)
+        started = time.perf_counter()
+        for name in names:
+            matrix.summary(name)
+        summary_time = (time.perf_counter() - started) / len(names)
+
+        legacy_text = f"{legacy_time * 1000:.0f}" if legacy_time is not None else "-"
+        print(f"{len(store):>9} {len(store.participants):>11} {build_time * 1000:>12.1f} {legacy_text:>18} "
+              f"{counts_time * 1000:>14.2f} {per_user_time * 1000:>24.2f} {summary_time * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Бенчмарк матрицы совместного использования языков: произведение булевой
+матрицы участник × язык (RatingMatrix.language_overlap) против попарных
+фильтров pandas по длинному формату.
+
+Время матрицы измеряется без построения RatingMatrix (оно выполняется один
+раз на версию данных и измеряется отдельно).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_overlap [--participants N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core.config import MainConfig
+from core.parser import RatingStore
+from core.analytics import RatingMatrix
+from benchmarks.fixtures import make_season, make_pages
+
+
+def naive_overlap(store: RatingStore, languages: list) -> np.ndarray:
+    """Для каждой пары языков - пересечение множеств участников с баллами."""
+    frame = store.frame
+    overlap = np.zeros((len(languages), len(languages)), dtype=np.int64)
+    for i, first in enumerate(languages):
+        for j, second in enumerate(languages):
+            first_users = frame[(frame['rating_type'] == first) & (frame['points'] > 0)]['participant']
+            second_users = frame[(frame['rating_type'] == second) & (frame['points'] > 0)]['participant']
+            overlap[i, j] = first_users[first_users.isin(second_users)].nunique()
+    return overlap
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=100000)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=args.participants, zero_share=0.4)
+    store = RatingStore.from_pages(make_pages(season))
+    print(f"Строк: {len(store)}, участников: {len(store.participants)}")
+
+    started = time.perf_counter()
+    matrix = RatingMatrix.build(store)
+    print(f"Построение RatingMatrix: {(time.perf_counter() - started) * 1000:.0f} мс")
+
+    times = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        languages, overlap = matrix.language_overlap()
+        times.append(time.perf_counter() - started)
+    print(f"Произведение матриц: {min(times) * 1000:.1f} мс")
+
+    started = time.perf_counter()
+    expected = naive_overlap(store, languages)
+    naive_time = time.perf_counter() - started
+    print(f"Попарные фильтры pandas ({len(languages) ** 2} пар): {naive_time * 1000:.0f} мс "
+          f"(в {naive_time / min(times):.0f} раз медленнее)")
+    print(f"Результаты совпадают: {np.array_equal(overlap, expected)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Микробенчмарк бэкендов разбора страниц рейтинга.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_parsers [--fixtures DIR] [--repeat N]
+
+DIR - каталог с сохраненными HTML-страницами рейтинга (*.html). Если не указан,
+используются синтетические страницы в разметке CodeRun.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from core.parser.page_parsers import PAGE_PARSERS, parse_page
+from benchmarks.fixtures import save_fixtures
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--fixtures', type=Path, help="каталог с HTML-страницами")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="количество проходов по страницам")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = sorted(args.fixtures.glob('*.html')) if args.fixtures else save_fixtures(Path(tmp))
+        pages = [path.read_text(encoding='utf-8') for path in paths]
+    if not pages:
+        raise SystemExit("Не найдено ни одной HTML-страницы")
+
+    reference = [parse_page(html, 'Общий', 'bs4') for html in pages]
+    print(f"Страниц: {len(pages)}, проходов: {args.repeat}")
+    print(f"{'бэкенд':<8} {'стр/с':>10} {'мс/стр':>8} {'ускорение':>10}  совпадение")
+
+    baseline = None
+    for name in PAGE_PARSERS:
+        try:
+            results = [parse_page(html, 'Общий', name) for html in pages]
+        except ImportError as e:
+            print(f"{name:<8} пропущен: {e}")
+            continue
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in pages:
+                parse_page(html, 'Общий', name)
+        elapsed = time.perf_counter() - started
+
+        per_second = len(pages) * args.repeat / elapsed
+        baseline = baseline or per_second
+        print(f"{name:<8} {per_second:>10.1f} {1000 / per_second:>8.2f} {per_second / baseline:>9.1f}x  "
+              f"{'да' if results == reference else 'НЕТ'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Бенчмарк колоночного хранилища рейтинга против DataFrame, собранного из словарей.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_rating_store [--participants N]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from core.config import MainConfig
+from core.parser import RatingStore
+from benchmarks.fixtures import make_season, make_pages
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=args.participants, zero_share=0.4)
+    pages_by_type = make_pages(season)
+    records = [row for pages in pages_by_type.values() for data in pages for row in data]
+    print(f"Строк: {len(records)}, участников: {args.participants}, типов рейтинга: {len(pages_by_type)}")
+
+    legacy, legacy_time = timed(pd.DataFrame, records)
+    store, store_time = timed(RatingStore.from_pages, pages_by_type)
+    view, view_time = timed(store.to_legacy_frame)
+    assert view.equals(legacy), "Прежний формат, восстановленный из хранилища, отличается"
+
+    legacy_memory = legacy.memory_usage(deep=True).sum()
+    store_memory = store.memory_usage()
+    print(f"{'':<28} {'время, с':>9} {'память, МБ':>11}")
+    print(f"{'DataFrame из словарей':<28} {legacy_time:>9.3f} {legacy_memory / 2**20:>11.1f}")
+    print(f"{'RatingStore.from_pages':<28} {store_time:>9.3f} {store_memory / 2**20:>11.1f}")
+    print(f"{'RatingStore.to_legacy_frame':<28} {view_time:>9.3f}")
+    print(f"Экономия памяти: {legacy_memory / store_memory:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Бенчмарк памяти и задержки при одновременных читателях данных.
+
+readers потоков одновременно выполняют запросы статистики (количество
+участников по языкам по данным в прежнем формате), пока отдельный поток
+публикует новые версии данных. Сравниваются два режима:
+    copy     - прежний путь: get_data() возвращал полную копию данных,
+               StatsCalculator.group_by_user копировал ее еще раз;
+    snapshot - читатели разделяют опубликованный снимок без копирования.
+Каждый режим запускается в отдельном процессе, пиковая память берется из
+resource.getrusage (ru_maxrss). Дополнительно проверяется, что каждый
+читатель видит неубывающие версии данных.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_readers [--participants N] [--readers N] [--requests N]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.config import MainConfig
+from core.parser import CodeRunRatingScraper, RatingStore
+from core.analytics.config import StatConfig
+from benchmarks.fixtures import make_season, make_pages
+
+
+def peak_rss_mb() -> float:
+    # На Linux ru_maxrss в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_language_counts(df) -> dict:
+    """Количество участников по языкам по данным в прежнем формате."""
+    return {
+        col.split('_')[1]: int((df[col] > 0).sum()) for col in df.columns
+        if col.startswith('Баллы_') and col.split('_')[1] in StatConfig.LANGUAGES
+    }
+
+
+def run_mode(mode: str, participants: int, readers: int, requests: int) -> dict:
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=participants, zero_share=0.4)
+    stores = [RatingStore.from_pages(make_pages(season)) for _ in range(2)]
+    scraper = CodeRunRatingScraper()
+    scraper.store = stores[0]
+    for store in stores:
+        store.to_legacy_frame()
+    baseline = peak_rss_mb()
+
+    def read(reader: int) -> dict:
+        latencies, versions = [], []
+        for _ in range(requests):
+            started = time.perf_counter()
+            snapshot = scraper.snapshot
+            df = snapshot.legacy_frame()
+            if mode == 'copy':
+                df = df.copy().copy()
+            legacy_language_counts(df)
+            latencies.append(time.perf_counter() - started)
+            versions.append(snapshot.version)
+        return {'latencies': latencies, 'monotonic': bool(np.all(np.diff(versions) >= 0))}
+
+    stop = threading.Event()
+
+    def publish():
+        index = 1
+        while not stop.wait(0.05):
+            scraper.store = stores[index % 2]
+            index += 1
+
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=readers) as executor:
+        results = list(executor.map(read, range(readers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    publisher.join()
+
+    latencies = np.concatenate([result['latencies'] for result in results]) * 1000
+    return {
+        'mode': mode,
+        'rows': len(stores[0]),
+        'seconds': elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'monotonic': all(result['monotonic'] for result in results),
+        'versions': scraper.snapshot.version,
+        'baseline_mb': baseline,
+        'peak_mb': peak_rss_mb(),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=20000)
+    arg_parser.add_argument('--readers', type=int, default=50)
+    arg_parser.add_argument('--requests', type=int, default=20)
+    arg_parser.add_argument('--mode', choices=['copy', 'snapshot'], help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.participants, args.readers, args.requests)))
+        return
+
+    print(f"Участников: {args.participants}, читателей: {args.readers}, запросов на читателя: {args.requests}")
+    print(f"{'режим':<9} {'строк':>8} {'время, с':>9} {'p50, мс':>9} {'p99, мс':>9} "
+          f"{'прирост памяти, МБ':>19} {'версии':>7}")
+    for mode in ('copy', 'snapshot'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_readers', '--participants', str(args.participants),
+             '--readers', str(args.readers), '--requests', str(args.requests), '--mode', mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<9} {result['rows']:>8} {result['seconds']:>9.2f} {result['p50_ms']:>9.0f} "
+              f"{result['p99_ms']:>9.0f} {result['peak_mb'] - result['baseline_mb']:>19.1f} "
+              f"{'монотонны' if result['monotonic'] else 'НАРУШЕНЫ':>7}")
+
+
+if __name__ == '__main__':
+    main()
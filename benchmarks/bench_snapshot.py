@@ -0,0 +1,53 @@
+"""Бенчмарк сохранения и загрузки данных: CSV (прежний путь) против бинарных снимков.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_snapshot [--participants N] [--repeat N]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from core.config import MainConfig
+from core.parser import CodeRunRatingScraper, RatingStore
+from benchmarks.fixtures import make_season, make_pages
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=20000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    season = make_season(['Общий', *MainConfig.LANGUAGES], participants=args.participants, zero_share=0.4)
+    scraper = CodeRunRatingScraper()
+    scraper.store = RatingStore.from_pages(make_pages(season))
+    print(f"Строк: {len(scraper.store)}, участников: {args.participants}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = Path(directory) / 'data'
+        print(f"{'формат':<10} {'запись, с':>10} {'чтение, с':>10} {'размер, МБ':>11} {'типы':>6}")
+        for file_format, extension in [('csv', '.csv'), ('feather', '.arrow'), ('parquet', '.parquet')]:
+            save_time = best_of(args.repeat, scraper.save, filename, file_format)
+            loaded = CodeRunRatingScraper()
+            load_time = best_of(args.repeat, loaded.load, filename, file_format)
+            size = (filename.parent / f"{filename.name}{extension}").stat().st_size
+
+            # Совпадение типов и значений как в хранилище, так и в прежнем формате
+            same = loaded.store.frame.equals(scraper.store.frame) and loaded.df.equals(scraper.df)
+            dtypes = 'да' if same else 'нет'
+            print(f"{file_format:<10} {save_time:>10.3f} {load_time:>10.3f} {size / 2**20:>11.1f} {dtypes:>6}")
+
+
+if __name__ == '__main__':
+    main()
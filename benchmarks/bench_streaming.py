@@ -0,0 +1,85 @@
+"""Бенчмарк пиковой памяти сбора: страницы в памяти (from_pages) против
+потоковой записи на диск (PageSpool).
+
+Каждый режим запускается в отдельном процессе, пиковая память процесса
+берется из resource.getrusage (ru_maxrss). Сбор имитируется генератором
+страниц: в режиме memory все страницы накапливаются, как в обычном
+обновлении, в режиме streaming каждая страница сразу дописывается в файл.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_streaming [--participants N]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from core.config import MainConfig
+from core.parser import RatingStore
+from core.parser.spool import PageSpool
+from benchmarks.fixtures import iter_season_pages
+
+
+def peak_rss_mb() -> float:
+    # На Linux ru_maxrss в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, participants: int) -> dict:
+    rating_types = ['Общий', *MainConfig.LANGUAGES]
+    pages = iter_season_pages(rating_types, participants=participants, zero_share=0.4)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+
+    if mode == 'memory':
+        pages_by_type = defaultdict(list)
+        for rating_type, page in pages:
+            pages_by_type[rating_type].append(page)
+        store = RatingStore.from_pages(dict(pages_by_type))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            spool = PageSpool(directory)
+            spool.reset()
+            for rating_type, page in pages:
+                spool.append(rating_type, page)
+            store = spool.to_store(rating_types)
+            spool.clear()
+
+    return {
+        'mode': mode,
+        'rows': len(store),
+        'seconds': time.perf_counter() - started,
+        'baseline_mb': baseline,
+        'peak_mb': peak_rss_mb(),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=100000)
+    arg_parser.add_argument('--mode', choices=['memory', 'streaming'], help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.participants)))
+        return
+
+    print(f"Участников: {args.participants}, типов рейтинга: {len(MainConfig.LANGUAGES) + 1}")
+    print(f"{'режим':<10} {'строк':>9} {'время, с':>9} {'пик, МБ':>9} {'прирост, МБ':>12}")
+    for mode in ('memory', 'streaming'):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_streaming',
+             '--participants', str(args.participants), '--mode', mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<10} {result['rows']:>9} {result['seconds']:>9.2f} {result['peak_mb']:>9.1f} "
+              f"{result['peak_mb'] - result['baseline_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Бенчмарк индекса поиска участников против линейного прохода по DataFrame.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_user_search [--participants N] [--queries N]
+"""
+import argparse
+import difflib
+import random
+import time
+
+import pandas as pd
+
+from core.analytics import UserSearchIndex
+from benchmarks.fixtures import make_nicknames
+
+
+def per_query_ms(func, queries) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+def mistype(name: str, rnd: random.Random) -> str:
+    pos = rnd.randrange(len(name))
+    return name[:pos] + name[pos + 1:] if rnd.random() < 0.5 else name[:pos] + 'x' + name[pos:]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--participants', type=int, default=50000)
+    arg_parser.add_argument('--queries', type=int, default=200)
+    args = arg_parser.parse_args()
+
+    rnd = random.Random(1)
+    names = make_nicknames(args.participants)
+    df = pd.DataFrame({'Участник': names})
+    sample = rnd.sample(names, args.queries)
+    exact = [name.upper() for name in sample]
+    prefixes = [name[:4] for name in sample]
+    typos = [mistype(name, rnd) for name in sample]
+
+    index = UserSearchIndex()
+    started = time.perf_counter()
+    index.rebuild(names)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"Участников: {len(names)}, запросов: {args.queries}, построение индекса: {build_ms:.0f} мс")
+
+    hits = sum(index.find_exact(query) is not None for query in exact)
+    found = sum(name in index.suggest(query) for name, query in zip(sample, typos))
+    print(f"Регистронезависимых совпадений: {hits}/{len(exact)}, "
+          f"ник найден по опечатке: {found}/{len(typos)}")
+
+    column = df['Участник']
+    fuzzy_queries = typos[:max(1, args.queries // 20)]
+    rows = [
+        ("без учета регистра",
+         per_query_ms(index.find_exact, exact),
+         per_query_ms(lambda q: df[column.str.casefold() == q.casefold()], exact)),
+        ("префикс",
+         per_query_ms(index.complete, prefixes),
+         per_query_ms(lambda q: df[column.str.casefold().str.startswith(q.casefold())].head(5), prefixes)),
+        ("похожие ники",
+         per_query_ms(index.suggest, fuzzy_queries),
+         per_query_ms(lambda q: difflib.get_close_matches(q, names, n=5), fuzzy_queries)),
+    ]
+    print(f"{'запрос':<20} {'индекс, мс':>11} {'линейно, мс':>12} {'ускорение':>10}")
+    for title, indexed, linear in rows:
+        print(f"{title:<20} {indexed:>11.4f} {linear:>12.3f} {linear / indexed:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Синтетические данные для бенчмарков: HTML-страницы рейтинга в разметке CodeRun
+и сезоны произвольного размера."""
+import random
+import pytz
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from core.parser.config import ParserConfig
+
+PAGE_SIZE = 50
+
+# Участник, задачи, баллы, дата последнего решения (ISO 8601)
+SeasonRow = Tuple[str, int, float, str]
+
+
+def make_season(
+    rating_types: List[str],
+    participants: int = 5000,
+    zero_share: float = 0.5,
+    seed: int = 42
+) -> Dict[str, List[SeasonRow]]:
+    """Генерирует сезон: отсортированные по баллам строки для каждого типа рейтинга."""
+    rnd = random.Random(seed)
+    users = [f"participant_{i:06d}" for i in range(participants)]
+    season = {}
+    for rating_type in rating_types:
+        rows = []
+        for user in users:
+            points = 0.0 if rnd.random() < zero_share else float(rnd.randint(1, 500))
+            date = f"2025-{rnd.randint(6, 8):02d}-{rnd.randint(1, 28):02d}T{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00+00:00"
+            rows.append((user, rnd.randint(0, 40), points, date))
+        rows.sort(key=lambda row: -row[2])
+        season[rating_type] = rows
+    return season
+
+
+def total_pages(rows: List[SeasonRow], page_size: int = PAGE_SIZE) -> int:
+    return max(1, (len(rows) + page_size - 1) // page_size)
+
+
+def render_page(rows: List[SeasonRow], page: int, page_size: int = PAGE_SIZE) -> str:
+    """Рендерит страницу рейтинга в разметке, повторяющей CodeRun."""
+    pages = total_pages(rows, page_size)
+    chunk = rows[(page - 1) * page_size: page * page_size]
+    body = []
+    for i, (user, tasks, points, date) in enumerate(chunk):
+        rank = (page - 1) * page_size + i + 1
+        points_text = f"{points:g}".replace('.', ',')
+        body.append(
+            f'<tr role="row" class="Table-Row RatingTable_row__x1">'
+            f'<td role="cell" class="Cell Cell_align_left">{rank}</td>'
+            f'<td role="cell" class="Cell Cell_type_user"><a class="Link UserLink" href="/users/{user}">'
+            f'<img class="Avatar" src="/avatar/{user}.png" alt=""><span class="UserLink-Name"> {user} </span></a></td>'
+            f'<td role="cell" class="Cell">{tasks}</td>'
+            f'<td role="cell" class="Cell Cell_type_points"><span>{points_text}</span></td>'
+            f'<td role="cell" class="Cell"><time datetime="{date}">{date[11:16]} {date[8:10]}.{date[5:7]}</time></td>'
+            f'</tr>'
+        )
+    shown = sorted({1, 2, 3, max(1, page - 1), page, min(pages, page + 1), pages})
+    links = ''.join(
+        f'<a class="Pagination-PagesItem{" Pagination-PagesItem_active" if p == page else ""}" href="?currentPage={p}">{p}</a>'
+        for p in shown
+    )
+    return (
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8"><title>Рейтинг</title>'
+        '<script>window.__DATA__ = {"season": "2025-summer"};</script>'
+        '<link rel="stylesheet" href="/static/app.css"></head><body><div id="root">'
+        '<header class="Header"><nav class="Menu"><a href="/">CodeRun</a> &middot; <a href="/rating">Рейтинг</a></nav></header>'
+        '<main class="Page"><div class="RatingTable_wrapper__a1">'
+        '<table class="Table RatingTable_rating-table__ixEUi" role="table"><thead><tr role="row">'
+        '<th class="Cell">Место</th><th class="Cell">Участник</th><th class="Cell">Задачи</th>'
+        '<th class="Cell">Баллы</th><th class="Cell">Последнее решение</th></tr></thead>'
+        f'<tbody>{"".join(body)}</tbody></table></div>'
+        f'<div class="Pagination"><div class="Pagination-Pages"><span class="Pagination-Dots">…</span>{links}</div></div>'
+        '</main><footer class="Footer">&copy; Яндекс</footer></div></body></html>'
+    )
+
+
+def save_fixtures(directory: Path, pages: int = 20, seed: int = 42) -> List[Path]:
+    """Сохраняет страницы синтетического рейтинга в каталог как HTML-файлы."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = make_season(['Общий'], participants=pages * PAGE_SIZE, zero_share=0.1, seed=seed)['Общий']
+    paths = []
+    for page in range(1, total_pages(rows) + 1):
+        path = directory / f"rating_page_{page:03d}.html"
+        path.write_text(render_page(rows, page), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def make_pages(
+    season: Dict[str, List[SeasonRow]],
+    page_size: int = PAGE_SIZE
+) -> Dict[str, List[List[Dict[str, Any]]]]:
+    """Преобразует сезон в записи парсера, сгруппированные по типам рейтинга и страницам,
+    как их возвращает CodeRunRatingScraper (до первого участника с 0 баллов включительно)."""
+    timezone = pytz.timezone(ParserConfig.TIME_ZONE)
+    pages_by_type = {}
+    for rating_type, rows in season.items():
+        records = []
+        for rank, (user, tasks, points, date) in enumerate(rows, start=1):
+            records.append({
+                'Участник': user,
+                'Задачи': tasks,
+                f'Место_{rating_type}': str(rank),
+                f'Баллы_{rating_type}': points,
+                'Дата': datetime.fromisoformat(date).astimezone(timezone)
+            })
+            if points == 0:
+                break
+        pages_by_type[rating_type] = [records[i:i + page_size] for i in range(0, len(records), page_size)]
+    return pages_by_type
+
+
+def make_nicknames(count: int, seed: int = 42) -> List[str]:
+    """Генерирует уникальные ники, похожие на ники участников CodeRun."""
+    rnd = random.Random(seed)
+    first = ['alex', 'ivan', 'maria', 'dmitry', 'olga', 'sergey', 'anna', 'pavel', 'elena', 'nikita',
+             'Leonid', 'Kate', 'Max', 'Artem', 'Yulia', 'Roman', 'Denis', 'Irina', 'Egor', 'Polina']
+    last = ['Ivanov', 'Petrova', 'smirnov', 'kuznetsova', 'Popov', 'sokolov', 'Lebedev', 'Kozlova',
+            'novikov', 'Morozov', 'Volkov', 'Mitrofanov', 'Fedorov', 'orlova', 'Belov']
+    names = set()
+    while len(names) < count:
+        style = rnd.random()
+        if style < 0.4:
+            name = f"{rnd.choice(last)}_{rnd.choice(first)}"
+        elif style < 0.7:
+            name = f"{rnd.choice(first)}{rnd.choice(last)}{rnd.randint(1, 9999)}"
+        else:
+            length = rnd.randint(5, 14)
+            name = ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz0123456789_') for _ in range(length))
+        names.add(name)
+    return sorted(names)
+
+
+def iter_season_pages(
+    rating_types: List[str],
+    participants: int = 5000,
+    zero_share: float = 0.5,
+    seed: int = 42,
+    page_size: int = PAGE_SIZE
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Генерирует записи парсера постранично, не держа сезон в памяти целиком
+    (в памяти находятся только баллы одного типа рейтинга).
+
+    Выдает пары (тип рейтинга, страница) в том же формате, что make_pages."""
+    rnd = random.Random(seed)
+    timezone = pytz.timezone(ParserConfig.TIME_ZONE)
+    for rating_type in rating_types:
+        points = sorted(
+            (0.0 if rnd.random() < zero_share else float(rnd.randint(1, 500)) for _ in range(participants)),
+            reverse=True
+        )
+        order = list(range(participants))
+        rnd.shuffle(order)
+        page = []
+        for rank, (user, user_points) in enumerate(zip(order, points), start=1):
+            date = datetime(2025, rnd.randint(6, 8), rnd.randint(1, 28), rnd.randint(0, 23), rnd.randint(0, 59),
+                            tzinfo=pytz.utc)
+            page.append({
+                'Участник': f"participant_{user:07d}",
+                'Задачи': rnd.randint(0, 40),
+                f'Место_{rating_type}': str(rank),
+                f'Баллы_{rating_type}': user_points,
+                'Дата': date.astimezone(timezone)
+            })
+            if len(page) == page_size or user_points == 0:
+                yield rating_type, page
+                page = []
+            if user_points == 0:
+                break
+        if page:
+            yield rating_type, page
@@ -1,2 +1,9 @@
 from .stats_calculator import StatsCalculator
 from .plot_builder import PlotBuilder
+from .rating_matrix import RatingMatrix
+from .user_index import UserIndex
+from .leaderboard import Leaderboard, LeaderboardIndex
+from .user_search import UserSearchIndex
+from .chart_cache import ChartCache
+from .renderer import ChartRenderer
+from .snapshot_diff import SnapshotDiff, MoversIndex
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple, Callable, Awaitable
+from .config import StatConfig
+
+logger = logging.getLogger(__name__)
+
+ChartKey = Tuple[str, str]  # (версия набора данных, тип графика)
+
+
+class ChartCache:
+    """Кэш отрисованных графиков (PNG), ключ - версия набора данных и тип графика.
+
+    Два уровня хранения:
+    - память: LRU на max_memory_items графиков;
+    - диск: файлы <версия>_<график>.png, при превышении max_disk_bytes
+      удаляются самые старые; чтение, запись и очистка выполняются
+      в пуле потоков, а не в event loop.
+    Дополнительно запоминается file_id Telegram после первой отправки,
+    чтобы повторно отправлять график по идентификатору без загрузки байтов.
+    Одновременные запросы одного и того же графика отрисовываются один раз.
+    """
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_memory_items: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None
+    ):
+        self.directory = Path(directory or StatConfig.CHART_CACHE_DIR)
+        self.max_memory_items = max_memory_items or StatConfig.CHART_CACHE_MEMORY_ITEMS
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None \
+                                else StatConfig.CHART_CACHE_DISK_BYTES
+        self._memory: "OrderedDict[ChartKey, bytes]" = OrderedDict()
+        self._file_ids: Dict[ChartKey, str] = {}
+        self._pending: Dict[ChartKey, asyncio.Future] = {}
+
+    def _path(self, key: ChartKey) -> Path:
+        version, chart = key
+        return self.directory / f"{version}_{chart}.png"
+
+    def _remember(self, key: ChartKey, data: bytes) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _write_disk(self, key: ChartKey, data: bytes) -> None:
+        if not self.max_disk_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path(key).with_suffix('.tmp')
+            tmp_path.write_bytes(data)
+            tmp_path.replace(self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить график {key} на диск: {str(e)}")
+
+    def _evict_disk(self) -> None:
+        files = []
+        for path in self.directory.glob('*.png'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # Уже удален параллельной очисткой
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(key=lambda item: item[0])
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= size
+            path.unlink(missing_ok=True)
+            logger.debug(f"График удален из дискового кэша: {path.name}")
+
+    def _read_disk(self, key: ChartKey) -> Optional[bytes]:
+        if not self.max_disk_bytes:
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _exists_disk(self, key: ChartKey) -> bool:
+        return bool(self.max_disk_bytes) and self._path(key).exists()
+
+    async def get(self, version: str, chart: str) -> Optional[bytes]:
+        """Возвращает PNG из памяти или с диска, если он есть в кэше.
+        Чтение с диска выполняется в пуле потоков, чтобы не блокировать event loop."""
+        key = (version, chart)
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            return data
+        data = await asyncio.get_running_loop().run_in_executor(None, self._read_disk, key)
+        if data is not None:
+            self._remember(key, data)
+        return data
+
+    async def put(self, version: str, chart: str, data: bytes) -> None:
+        """Сохраняет PNG в память и на диск (запись и очистка - в пуле потоков)."""
+        key = (version, chart)
+        self._remember(key, data)
+        if self.max_disk_bytes:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, data)
+
+    async def contains(self, version: str, chart: str) -> bool:
+        """Есть ли график в кэше (байты или file_id)."""
+        key = (version, chart)
+        if key in self._file_ids or key in self._memory:
+            return True
+        return await asyncio.get_running_loop().run_in_executor(None, self._exists_disk, key)
+
+    async def get_or_render(
+        self,
+        version: str,
+        chart: str,
+        render: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Возвращает PNG из кэша или отрисовывает его; одновременные
+        запросы одного графика ожидают одну и ту же отрисовку."""
+        data = await self.get(version, chart)
+        if data is not None:
+            return data
+
+        key = (version, chart)
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            logger.debug(f"Отрисовка графика {chart} для версии данных {version}")
+            data = await render()
+            await self.put(version, chart, data)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def get_file_id(self, version: str, chart: str) -> Optional[str]:
+        """Возвращает file_id Telegram для ранее отправленного графика."""
+        return self._file_ids.get((version, chart))
+
+    def set_file_id(self, version: str, chart: str, file_id: str) -> None:
+        """Запоминает file_id Telegram для графика, забывая file_id старых версий."""
+        self._file_ids = {key: value for key, value in self._file_ids.items() if key[0] == version}
+        self._file_ids[(version, chart)] = file_id
+
+    def forget_file_id(self, version: str, chart: str) -> None:
+        """Забывает file_id (например, если Telegram перестал его принимать)."""
+        self._file_ids.pop((version, chart), None)
@@ -3,7 +3,15 @@ from ..config import MainConfig
 class StatConfig:
     INCLUDE_GENERAL: bool = MainConfig.INCLUDE_GENERAL
     LANGUAGES = [*MainConfig.LANGUAGES]
-    COMMON_COLUMNS = {
-        'Задачи': 'first',
-        'Дата': 'max'
-    }
\ No newline at end of file
+
+    CHART_CACHE_DIR = MainConfig.STORAGE_DIR / "plots"
+    CHART_CACHE_MEMORY_ITEMS: int = 16
+    CHART_CACHE_DISK_BYTES: int = 50 * 1024 * 1024  # 50 MB, 0 - без дискового кэша
+    CHART_DPI: int = 100
+    CHART_RENDER_EXECUTOR: str = 'process'  # 'process' - пул процессов, 'thread' - один поток
+    CHART_RENDER_WORKERS: int = 2
+    CHART_RENDER_QUEUE: int = 8  # Сколько отрисовок может ждать свободного воркера
+    CHART_RENDER_QUEUE_TIMEOUT: float = 5.0  # Сколько ждать места в очереди, сек
+    MOVERS_TOP: int = 10  # Сколько лидеров роста показывать в каждом типе рейтинга
+    SCORE_BINS: int = 20  # Интервалов в гистограмме баллов
+    SCORE_PERCENTILES = [50, 90, 99]  # Процентили баллов по языкам
@@ -0,0 +1,9 @@
+class AnalyticsError(Exception):
+    """Базовый класс для всех ошибок аналитики"""
+    pass
+
+
+class RenderQueueFullError(AnalyticsError):
+    """Ошибка при переполнении очереди отрисовки графиков"""
+    def __init__(self, message: str = "Сервис графиков перегружен, попробуйте позже"):
+        super().__init__(message)
@@ -0,0 +1,115 @@
+import logging
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from typing import Optional, List, Dict, Tuple
+from core.parser import RatingStore
+from .rating_matrix import RatingMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    """Таблица лидеров одного типа рейтинга.
+
+    Участники с местом упорядочены по месту, баллы дополнительно хранятся
+    отсортированными по возрастанию, поэтому запросы по баллам выполняются
+    двоичным поиском (np.searchsorted) за O(log n), а страница таблицы -
+    срезом массивов.
+    """
+    def __init__(self, rating_type: str, names: np.ndarray, ranks: np.ndarray, points: np.ndarray):
+        self.rating_type = rating_type
+        self.names = names
+        self.ranks = ranks
+        self.points = points
+        self._sorted_points = np.sort(points)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def points_for_top(self, top: int) -> Optional[float]:
+        """Баллы участника на месте top - граница топа (None, если участников меньше)."""
+        if top < 1 or top > len(self):
+            return None
+        # Баллы top-го по величине результата
+        return float(self._sorted_points[len(self) - top])
+
+    def rank_for_points(self, points: float) -> int:
+        """Место, которое дали бы points баллов: участники с большими баллами + 1."""
+        return int(len(self) - np.searchsorted(self._sorted_points, points, side='right')) + 1
+
+    def percentile(self, points: float) -> float:
+        """Доля участников (в процентах) с меньшим количеством баллов."""
+        if not len(self):
+            return 0.0
+        return float(np.searchsorted(self._sorted_points, points, side='left')) / len(self) * 100
+
+    def page(self, page: int, page_size: int) -> pd.DataFrame:
+        """Страница таблицы (нумерация с 0): participant, rank, points."""
+        rows = slice(page * page_size, (page + 1) * page_size)
+        return pd.DataFrame({
+            'participant': self.names[rows],
+            'rank': self.ranks[rows],
+            'points': self.points[rows],
+        })
+
+    def pages(self, page_size: int) -> int:
+        return max(1, -(-len(self) // page_size))
+
+
+class LeaderboardIndex:
+    """Таблицы лидеров всех типов рейтинга одной версии данных.
+
+    Строятся по RatingMatrix один раз на версию данных (for_store).
+    """
+    _cache: "weakref.WeakKeyDictionary[RatingStore, LeaderboardIndex]" = weakref.WeakKeyDictionary()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, matrix: RatingMatrix):
+        self.matrix = matrix
+        names = np.asarray(matrix.participants, dtype=object)
+        self._boards: Dict[str, Leaderboard] = {}
+        for column, rating_type in enumerate(matrix.rating_types):
+            ranks = matrix.rank[:, column]
+            rows = np.flatnonzero(~np.isnan(ranks))
+            rows = rows[np.argsort(ranks[rows], kind='stable')]
+            self._boards[rating_type] = Leaderboard(
+                rating_type, names[rows], ranks[rows].astype(np.int64), matrix.points[rows, column]
+            )
+
+    @classmethod
+    def for_store(cls, store: RatingStore) -> 'LeaderboardIndex':
+        with cls._cache_lock:
+            index = cls._cache.get(store)
+        if index is None:
+            index = cls(RatingMatrix.for_store(store))
+            with cls._cache_lock:
+                index = cls._cache.setdefault(store, index)
+            logger.debug(f"Построены таблицы лидеров: {len(index.rating_types)} типов рейтинга")
+        return index
+
+    @property
+    def rating_types(self) -> List[str]:
+        return list(self._boards)
+
+    def get(self, rating_type: str) -> Optional[Leaderboard]:
+        return self._boards.get(rating_type)
+
+    def find_rating_type(self, query: str) -> Optional[str]:
+        """Тип рейтинга по запросу без учета регистра ('общий' - общий зачет)."""
+        folded = query.strip().casefold()
+        return next((rating_type for rating_type in self._boards if rating_type.casefold() == folded), None)
+
+    def standing(self, username: str, rating_type: str) -> Optional[Tuple[int, float, float]]:
+        """Место, баллы и процентиль участника в типе рейтинга (None, если места нет)."""
+        board = self.get(rating_type)
+        column = self.matrix.column(rating_type)
+        try:
+            row = self.matrix.participants.get_loc(username)
+        except KeyError:
+            return None
+        if board is None or not isinstance(row, (int, np.integer)) or np.isnan(self.matrix.rank[row, column]):
+            return None
+        points = float(self.matrix.points[row, column])
+        return int(self.matrix.rank[row, column]), points, board.percentile(points)
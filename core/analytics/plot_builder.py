@@ -1,34 +1,82 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
+from io import BytesIO
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from core.parser import RatingStore
 from .stats_calculator import StatsCalculator
 from .config import StatConfig
-from typing import Dict
+from typing import Dict, Any, List
 
 class PlotBuilder:
+    """Построение графиков.
+
+    Построение разделено на два шага: агрегация данных (chart_data, plot_*)
+    и отрисовка агрегатов (draw_*). Отрисовка использует только объектный API
+    matplotlib (Figure + FigureCanvasAgg) без глобального состояния pyplot,
+    поэтому ее можно безопасно выполнять параллельно в пуле процессов.
+    """
+    CHARTS: Dict[str, str] = {
+        'users_by_language_bar': 'draw_users_by_language_bar',
+        'users_by_language_pie': 'draw_users_by_language_pie',
+        'languages_per_user': 'draw_languages_per_user_distribution',
+        'language_overlap': 'draw_language_overlap_heatmap',
+        'score_distribution': 'draw_score_distribution',
+        'activity': 'draw_activity',
+    }
+
+    @staticmethod
+    def _new_figure(figsize: tuple) -> Figure:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig
+
     @staticmethod
-    def _get_language_counts(df: pd.DataFrame) -> Dict[str, int]:
-        """Вспомогательный метод для получения количества участников по языкам (исключая общий зачет)"""
-        language_counts = {}
-        for col in df.columns:
-            if col.startswith('Баллы_'):
-                language = col.split('_')[1]
-                if language in StatConfig.LANGUAGES and language != 'Общий':  # Исключаем общий зачет
-                    language_counts[language] = (df[col] > 0).sum()
-        return language_counts
+    def figure_to_png(fig: Figure) -> bytes:
+        """Сохраняет фигуру в PNG"""
+        buf = BytesIO()
+        fig.savefig(buf, format='png', dpi=StatConfig.CHART_DPI, bbox_inches='tight')
+        return buf.getvalue()
+
+    @classmethod
+    def chart_data(cls, chart: str, store: RatingStore) -> Dict[str, Any]:
+        """Агрегирует данные хранилища для графика (аргументы соответствующего draw_*)"""
+        if chart in ('users_by_language_bar', 'users_by_language_pie'):
+            return {'language_counts': StatsCalculator.language_counts(store)}
+        if chart == 'languages_per_user':
+            distribution, total = StatsCalculator.languages_per_user(store)
+            return {'language_distribution': distribution, 'total_participants': total}
+        if chart == 'language_overlap':
+            languages, overlap = StatsCalculator.language_overlap(store)
+            return {'languages': languages, 'overlap': overlap}
+        if chart == 'score_distribution':
+            return StatsCalculator.score_distribution(store)
+        if chart == 'activity':
+            return StatsCalculator.activity(store)
+        raise ValueError(f"Неизвестный тип графика: {chart}")
+
+    @classmethod
+    def render_png(cls, chart: str, data: Dict[str, Any]) -> bytes:
+        """Отрисовывает график по имени из CHARTS и агрегатам из chart_data, возвращает PNG"""
+        if chart not in cls.CHARTS:
+            raise ValueError(f"Неизвестный тип графика: {chart}")
+        return cls.figure_to_png(getattr(cls, cls.CHARTS[chart])(**data))
 
     @staticmethod
-    def plot_users_by_language_pie(df: pd.DataFrame) -> plt.Figure:
-        """Строит круговую диаграмму распределения участников по языкам программирования
-        (исключая общий зачет)"""
-        language_counts = PlotBuilder._get_language_counts(df)
+    def draw_users_by_language_pie(language_counts: Dict[str, int]) -> Figure:
+        """Отрисовывает круговую диаграмму распределения участников по языкам программирования"""
         language_counts = {lang: count for lang, count in language_counts.items() if count > 0}
         
         if not language_counts:
             raise ValueError("Нет данных для построения диаграммы - все участники имеют нулевые баллы по всем языкам")
         
         sorted_languages, sorted_counts = zip(*sorted(language_counts.items(), key=lambda x: x[1], reverse=True))
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig = PlotBuilder._new_figure(figsize=(10, 8))
+        ax = fig.subplots()
         colors = sns.color_palette('viridis', len(sorted_languages))
         
         explode = [0.03] * len(sorted_languages)
@@ -46,7 +94,8 @@ class PlotBuilder:
             wedgeprops={'edgecolor': 'white', 'linewidth': 1}
         )
         
-        plt.setp(autotexts, size=10, weight='bold', color='white')
+        for autotext in autotexts:
+            autotext.set(size=10, weight='bold', color='white')
         ax.set_title('Распределение участников по языкам программирования', 
                     pad=20, fontsize=14, fontweight='bold')
         
@@ -58,21 +107,20 @@ class PlotBuilder:
                 fontsize=10)
         
         ax.axis('equal')
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
-    
+
     @staticmethod
-    def plot_users_by_language_bar(df: pd.DataFrame) -> plt.Figure:
-        """Строит столбчатую диаграмму распределения участников по языкам программирования
-        (исключая общий зачет)"""
-        language_counts = PlotBuilder._get_language_counts(df)
+    def draw_users_by_language_bar(language_counts: Dict[str, int]) -> Figure:
+        """Отрисовывает столбчатую диаграмму распределения участников по языкам программирования"""
         language_counts = {lang: count for lang, count in language_counts.items() if count > 0}
         
         if not language_counts:
             raise ValueError("Нет данных для построения диаграммы - все участники имеют нулевые баллы по всем языкам")
         
         sorted_languages, sorted_counts = zip(*sorted(language_counts.items(), key=lambda x: x[1], reverse=True))
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig = PlotBuilder._new_figure(figsize=(12, 6))
+        ax = fig.subplots()
         
         ax = sns.barplot(x=list(sorted_languages), 
                         y=list(sorted_counts), 
@@ -91,31 +139,27 @@ class PlotBuilder:
         ax.set_xlabel('Языки программирования', fontsize=12)
         ax.set_ylabel('Количество участников', fontsize=12)
         ax.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
+        for label in ax.get_xticklabels():
+            label.set(rotation=45, ha='right')
+        fig.tight_layout()
         
         return fig
-    
+
     @staticmethod
-    def plot_languages_per_user_distribution(df: pd.DataFrame) -> plt.Figure:
-        """Строит столбчатую диаграмму распределения количества языков программирования,
-        на которых пишет один участник (исключая общий зачет)"""
-        language_columns = [col for col in df.columns 
-                        if col.startswith('Баллы_') and 
-                        col.split('_')[1] in StatConfig.LANGUAGES and
-                        col.split('_')[1] != 'Общий']  # Исключаем общий зачет
-        user_data = df.groupby('Участник')[language_columns].first()
-        user_language_counts = (user_data > 0).sum(axis=1)
-        language_distribution = user_language_counts.value_counts().sort_index()
-        
-        if language_distribution.empty:
+    def draw_languages_per_user_distribution(
+        language_distribution: Dict[int, int],
+        total_participants: int
+    ) -> Figure:
+        """Отрисовывает столбчатую диаграмму распределения количества языков программирования,
+        на которых пишет один участник"""
+        if not language_distribution:
             raise ValueError("Нет данных для построения диаграммы - ни один участник не имеет положительных баллов")
         
-        total_participants = len(user_data)
-        num_languages = language_distribution.index.tolist()
-        user_counts = language_distribution.values.tolist()
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
+        num_languages = sorted(language_distribution)
+        user_counts = [language_distribution[num] for num in num_languages]
+
+        fig = PlotBuilder._new_figure(figsize=(10, 6))
+        ax = fig.subplots()
         ax = sns.barplot(x=list(num_languages), 
                         y=list(user_counts), 
                         hue=list(num_languages),
@@ -147,5 +191,96 @@ class PlotBuilder:
         ax.set_ylabel('Количество участников', fontsize=12)
         ax.grid(axis='y', linestyle='--', alpha=0.7)
         
-        plt.tight_layout()
+        fig.tight_layout()
+        return fig
+
+    @staticmethod
+    def draw_language_overlap_heatmap(languages: List[str], overlap: List[List[int]]) -> Figure:
+        """Отрисовывает тепловую карту совместного использования языков: в ячейке -
+        количество участников с баллами в обоих языках, на диагонали - в одном языке"""
+        used = [i for i, lang in enumerate(languages) if overlap[i][i] > 0]
+        if not used:
+            raise ValueError("Нет данных для построения диаграммы - ни один участник не имеет положительных баллов")
+
+        labels = [languages[i] for i in used]
+        counts = [[overlap[i][j] for j in used] for i in used]
+        fig = PlotBuilder._new_figure(figsize=(12, 10))
+        ax = fig.subplots()
+        sns.heatmap(counts,
+                    annot=True,
+                    fmt='d',
+                    cmap='viridis',
+                    square=True,
+                    xticklabels=labels,
+                    yticklabels=labels,
+                    cbar_kws={'label': 'Количество участников'},
+                    ax=ax)
+
+        ax.set_title('Совместное использование языков программирования', pad=20, fontsize=14, fontweight='bold')
+        for label in ax.get_xticklabels():
+            label.set(rotation=45, ha='right')
+        fig.tight_layout()
+        return fig
+
+    @staticmethod
+    def draw_score_distribution(
+        languages: List[str],
+        bin_edges: List[float],
+        histograms: List[List[int]],
+        percentiles: Dict[str, List[float]]
+    ) -> Figure:
+        """Отрисовывает гистограммы баллов по языкам с отметками процентилей"""
+        used = [i for i, lang in enumerate(languages) if lang in percentiles]
+        if not used:
+            raise ValueError("Нет данных для построения диаграммы - ни один участник не имеет положительных баллов")
+
+        cols = min(4, len(used))
+        rows = -(-len(used) // cols)
+        fig = PlotBuilder._new_figure(figsize=(4 * cols, 3 * rows))
+        axes = np.atleast_1d(fig.subplots(rows, cols, sharex=True, squeeze=False)).ravel()
+        palette = sns.color_palette('husl', len(StatConfig.SCORE_PERCENTILES))
+        widths = np.diff(bin_edges)
+
+        for ax, i in zip(axes, used):
+            lang = languages[i]
+            ax.bar(bin_edges[:-1], histograms[i], width=widths, align='edge', color='steelblue', edgecolor='white')
+            for percentile, value, color in zip(StatConfig.SCORE_PERCENTILES, percentiles[lang], palette):
+                ax.axvline(value, color=color, linestyle='--', linewidth=1.2, label=f'p{percentile}: {value:.0f}')
+            ax.set_title(lang, fontsize=11, fontweight='bold')
+            ax.legend(fontsize=8)
+            ax.grid(axis='y', linestyle='--', alpha=0.7)
+        for ax in axes[len(used):]:
+            ax.set_visible(False)
+
+        fig.suptitle('Распределение баллов по языкам программирования', fontsize=14, fontweight='bold')
+        fig.supxlabel('Баллы', fontsize=12)
+        fig.supylabel('Количество участников', fontsize=12)
+        fig.tight_layout()
+        return fig
+
+    @staticmethod
+    def draw_activity(days: List[str], day_counts: List[int], hour_counts: List[int]) -> Figure:
+        """Отрисовывает активность участников по дням и по часам суток
+        (по дате последнего решения)"""
+        if not days:
+            raise ValueError("Нет данных для построения диаграммы - нет дат решений")
+
+        fig = PlotBuilder._new_figure(figsize=(12, 8))
+        day_ax, hour_ax = fig.subplots(2, 1)
+
+        day_ax.bar(pd.to_datetime(days), day_counts, width=0.9, color='steelblue')
+        day_ax.set_title('Последнее решение участников по дням', fontsize=12, fontweight='bold')
+        day_ax.set_ylabel('Количество участников', fontsize=11)
+        day_ax.grid(axis='y', linestyle='--', alpha=0.7)
+        for label in day_ax.get_xticklabels():
+            label.set(rotation=45, ha='right')
+
+        hour_ax.bar(range(24), hour_counts, color='seagreen')
+        hour_ax.set_title('Последнее решение участников по часам суток', fontsize=12, fontweight='bold')
+        hour_ax.set_xlabel('Час', fontsize=11)
+        hour_ax.set_ylabel('Количество участников', fontsize=11)
+        hour_ax.set_xticks(range(24))
+        hour_ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+        fig.tight_layout()
         return fig
@@ -0,0 +1,211 @@
+import logging
+import threading
+import weakref
+import warnings
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from typing import Optional, List, Dict, Any, Tuple
+from core.parser import RatingStore
+from .config import StatConfig
+
+logger = logging.getLogger(__name__)
+
+
+class RatingMatrix:
+    """Широкая таблица участник × тип рейтинга в массивах NumPy.
+
+    Строится один раз на версию данных (for_store) одним проходом по
+    длинному формату хранилища: коды участника и типа рейтинга сразу
+    задают ячейку матрицы. Для повторяющейся пары (участник, тип рейтинга)
+    берется первая строка. Строки без даты учитываются везде, кроме дат
+    (last_date, activity).
+        participants - pd.Index ников (номер строки матриц)
+        rating_types - типы рейтинга (номер столбца матриц)
+        rank         - float64 [участник, тип]: место, NaN - нет места
+        points       - float64 [участник, тип]: баллы, NaN - нет строки
+        tasks        - int64 [участник]: решено задач
+        last_date    - DatetimeIndex [участник]: дата последнего решения (NaT - нет дат)
+        present      - bool [участник]: есть ли у участника строки
+    """
+    _cache: "weakref.WeakKeyDictionary[RatingStore, RatingMatrix]" = weakref.WeakKeyDictionary()
+    _cache_lock = threading.Lock()
+
+    def __init__(
+        self,
+        participants: pd.Index,
+        rating_types: List[str],
+        rank: np.ndarray,
+        points: np.ndarray,
+        tasks: np.ndarray,
+        last_date: pd.DatetimeIndex,
+        present: np.ndarray
+    ):
+        self.participants = participants
+        self.rating_types = rating_types
+        self.rank = rank
+        self.points = points
+        self.tasks = tasks
+        self.last_date = last_date
+        self.present = present
+        self._columns = {rating_type: column for column, rating_type in enumerate(rating_types)}
+
+    @classmethod
+    def for_store(cls, store: RatingStore) -> 'RatingMatrix':
+        """Матрица версии данных: строится при первом обращении и живет, пока жива версия."""
+        with cls._cache_lock:
+            matrix = cls._cache.get(store)
+            if matrix is None:
+                matrix = cls.build(store)
+                cls._cache[store] = matrix
+        return matrix
+
+    @classmethod
+    def build(cls, store: RatingStore) -> 'RatingMatrix':
+        """Строит матрицу по хранилищу."""
+        frame = store.frame
+        participants = store.participants
+        rating_types = store.rating_types
+        shape = (len(participants), len(rating_types))
+
+        dates = frame['date']
+        participant_codes = frame['participant'].cat.codes.to_numpy()
+        type_codes = frame['rating_type'].cat.codes.to_numpy()
+
+        # Запись в обратном порядке: первая строка пары перезаписывает остальные
+        reverse = slice(None, None, -1)
+        rank = np.full(shape, np.nan)
+        rank[participant_codes[reverse], type_codes[reverse]] = \
+            frame['rank'].to_numpy(dtype=np.float64, na_value=np.nan)[reverse]
+        points = np.full(shape, np.nan)
+        points[participant_codes[reverse], type_codes[reverse]] = np.round(
+            frame['points'].to_numpy(dtype=np.float64), store.POINTS_DECIMALS
+        )[reverse]
+        tasks = np.zeros(shape[0], dtype=np.int64)
+        tasks[participant_codes[reverse]] = frame['tasks'].to_numpy(dtype=np.int64)[reverse]
+        present = np.zeros(shape[0], dtype=bool)
+        present[participant_codes] = True
+
+        unit = dates.dt.unit
+        last = np.full(shape[0], np.iinfo(np.int64).min, dtype=np.int64)
+        # Дата последнего решения - только по строкам с датой
+        dated = np.flatnonzero(dates.notna().to_numpy())
+        np.maximum.at(last, participant_codes[dated], dates.array.asi8[dated])
+        last_date = pd.DatetimeIndex(last.view(f'M8[{unit}]')).tz_localize('UTC').tz_convert(dates.dt.tz)
+
+        logger.debug(f"Построена матрица рейтинга: {shape[0]} участников × {shape[1]} типов")
+        return cls(participants, rating_types, rank, points, tasks, last_date, present)
+
+    def __len__(self) -> int:
+        return int(self.present.sum())
+
+    def column(self, rating_type: str) -> Optional[int]:
+        return self._columns.get(rating_type)
+
+    def language_columns(self) -> List[int]:
+        """Столбцы языков из StatConfig (без общего зачета) в порядке сбора."""
+        return [
+            column for column, rating_type in enumerate(self.rating_types)
+            if rating_type in StatConfig.LANGUAGES and rating_type != 'Общий'
+        ]
+
+    def language_counts(self) -> Dict[str, int]:
+        """Количество участников с положительными баллами по языкам (без общего зачета)."""
+        columns = self.language_columns()
+        counts = (self.points[:, columns] > 0).sum(axis=0)
+        return {self.rating_types[column]: int(count) for column, count in zip(columns, counts)}
+
+    def languages_per_user(self) -> Tuple[Dict[int, int], int]:
+        """Распределение участников по количеству языков с положительными баллами
+        и общее количество участников."""
+        per_user = (self.points[:, self.language_columns()] > 0).sum(axis=1)
+        distribution = np.bincount(per_user[self.present])
+        return {num: int(users) for num, users in enumerate(distribution) if users}, len(self)
+
+    def summary(self, username: str) -> Optional[Dict[str, Any]]:
+        """Сводка участника в формате UserIndex или None, если участника нет."""
+        try:
+            row = self.participants.get_loc(username)
+        except KeyError:
+            return None
+        if not isinstance(row, (int, np.integer)) or not self.present[row]:
+            return None
+        ratings = {}
+        for column in np.flatnonzero(~np.isnan(self.points[row])):
+            rank = self.rank[row, column]
+            ratings[self.rating_types[column]] = {
+                'place': None if np.isnan(rank) else int(rank),
+                'points': float(self.points[row, column])
+            }
+        return {
+            'username': username,
+            'tasks': int(self.tasks[row]),
+            'last_date': None if pd.isna(self.last_date[row]) else self.last_date[row],
+            'ratings': ratings
+        }
+
+    def language_overlap(self) -> Tuple[List[str], np.ndarray]:
+        """Матрица совместного использования языков: [i, j] - количество участников
+        с положительными баллами и в языке i, и в языке j (на диагонали - в языке i).
+
+        Считается одним произведением булевой матрицы участник × язык на себя
+        (B^T·B); float64 точно представляет целые счетчики.
+        """
+        columns = self.language_columns()
+        used = (self.points[:, columns] > 0).astype(np.float64)
+        overlap = (used.T @ used).round().astype(np.int64)
+        return [self.rating_types[column] for column in columns], overlap
+
+    @cached_property
+    def score_distribution(self) -> Dict[str, Any]:
+        """Распределение положительных баллов по языкам (считается один раз):
+            languages   - языки
+            bin_edges   - общие границы интервалов гистограммы
+            histograms  - [язык][интервал] количество участников
+            percentiles - {язык: баллы на процентилях StatConfig.SCORE_PERCENTILES}
+        """
+        columns = self.language_columns()
+        points = self.points[:, columns]
+        positive = points > 0
+        bins = StatConfig.SCORE_BINS
+        top = float(points[positive].max()) if positive.any() else 1.0
+        edges = np.linspace(0.0, top, bins + 1)
+
+        # Все гистограммы одним bincount: номер ячейки = столбец * bins + интервал
+        column_index = np.broadcast_to(np.arange(len(columns)), points.shape)[positive]
+        bin_index = np.clip(np.searchsorted(edges, points[positive], side='right') - 1, 0, bins - 1)
+        histograms = np.bincount(column_index * bins + bin_index, minlength=len(columns) * bins)
+        histograms = histograms.reshape(len(columns), bins)
+
+        with warnings.catch_warnings():
+            # Языки без участников с баллами дают NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            percentiles = np.nanpercentile(np.where(positive, points, np.nan), StatConfig.SCORE_PERCENTILES, axis=0)
+
+        languages = [self.rating_types[column] for column in columns]
+        return {
+            'languages': languages,
+            'bin_edges': edges.tolist(),
+            'histograms': histograms.tolist(),
+            'percentiles': {
+                lang: [float(value) for value in percentiles[:, i]]
+                for i, lang in enumerate(languages) if positive[:, i].any()
+            },
+        }
+
+    @cached_property
+    def activity(self) -> Dict[str, Any]:
+        """Активность участников по дате последнего решения (считается один раз):
+            days       - дни (ISO), без пропусков
+            day_counts - участников с последним решением в этот день
+            hour_counts - то же по часам суток (24 значения)
+        """
+        dates = self.last_date[self.present & self.last_date.notna()]
+        if not len(dates):
+            return {'days': [], 'day_counts': [], 'hour_counts': [0] * 24}
+        daily = pd.Series(1, index=dates).sort_index().resample('D').sum()
+        return {
+            'days': [day.date().isoformat() for day in daily.index],
+            'day_counts': daily.astype(int).tolist(),
+            'hour_counts': np.bincount(dates.hour, minlength=24).tolist(),
+        }
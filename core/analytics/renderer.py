@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any
+from .plot_builder import PlotBuilder
+from .exceptions import RenderQueueFullError
+from .config import StatConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ChartRenderer:
+    """Сервис отрисовки графиков вне цикла событий.
+
+    В воркеры передаются только агрегаты (PlotBuilder.chart_data), а не
+    набор данных целиком, обратно возвращаются байты PNG. Очередь ограничена:
+    одновременно выполняется и ждет не больше workers + max_queue отрисовок,
+    остальные запросы получают RenderQueueFullError после queue_timeout.
+    """
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        executor: Optional[str] = None
+    ):
+        self.workers = workers or StatConfig.CHART_RENDER_WORKERS
+        self.max_queue = max_queue if max_queue is not None else StatConfig.CHART_RENDER_QUEUE
+        self.queue_timeout = queue_timeout if queue_timeout is not None \
+                                else StatConfig.CHART_RENDER_QUEUE_TIMEOUT
+        self.executor_type = executor or StatConfig.CHART_RENDER_EXECUTOR
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            elif self.executor_type == 'thread':
+                # matplotlib не потокобезопасен, поэтому в режиме потоков - один поток
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='charts')
+            else:
+                raise ValueError(f"Неизвестный тип исполнителя графиков: {self.executor_type}")
+            logger.info(f"Запущен сервис графиков ({self.executor_type}, воркеров: {self.workers})")
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        return self._slots
+
+    async def render(self, chart: str, data: Dict[str, Any]) -> bytes:
+        """Отрисовывает график по агрегатам и возвращает PNG."""
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Очередь отрисовки переполнена, график {chart} отклонен")
+            raise RenderQueueFullError()
+
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._get_executor(), PlotBuilder.render_png, chart, data)
+            except BrokenProcessPool:
+                logger.error("Пул процессов графиков аварийно завершился, перезапуск")
+                self._executor = None
+                return await loop.run_in_executor(self._get_executor(), PlotBuilder.render_png, chart, data)
+        finally:
+            slots.release()
+
+    def close(self) -> None:
+        """Останавливает воркеры."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
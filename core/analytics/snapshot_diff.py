@@ -0,0 +1,191 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Optional, Tuple
+from core.parser import RatingStore
+from .config import StatConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotDiff:
+    """Сравнение двух версий данных по парам (участник, тип рейтинга).
+
+    Строится за один векторный проход: участники и типы рейтинга обоих
+    хранилищ переводятся в общие целочисленные коды, пары кодируются одним
+    ключом и сопоставляются через плотную таблицу позиций. Результат - frame:
+        participant   - ник
+        rating_type   - тип рейтинга
+        status        - 'new' (появился), 'dropped' (выбыл) или 'kept'
+        rank_before, rank_after     - места (NaN, если места нет)
+        points_before, points_after - баллы (NaN, если строки нет)
+        rank_delta    - на сколько мест поднялся (отрицательное - опустился)
+        points_delta  - изменение баллов
+    """
+    STATUSES = ['new', 'dropped', 'kept']
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._climbers: Optional[pd.DataFrame] = None
+
+    @staticmethod
+    def _first_positions(keys: np.ndarray, size: int) -> np.ndarray:
+        """Таблица ключ -> номер первой строки с этим ключом (-1, если ключа нет).
+
+        Ключи плотные (код участника * число типов + код типа), поэтому вместо
+        хэш-индекса используется массив: при записи в обратном порядке первое
+        вхождение ключа перезаписывает остальные.
+        """
+        table = np.full(size, -1, dtype=np.int32)
+        table[keys[::-1]] = np.arange(len(keys) - 1, -1, -1, dtype=np.int32)
+        return table
+
+    @staticmethod
+    def _codes(current: pd.Index, previous: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """Общие коды: категории current сохраняют свои коды, новые категории
+        previous получают коды после них. Возвращает (имена, коды категорий previous)."""
+        mapping = current.get_indexer(previous)
+        missing = mapping < 0
+        mapping[missing] = len(current) + np.arange(missing.sum())
+        names = np.concatenate([np.asarray(current, dtype=object), np.asarray(previous[missing], dtype=object)])
+        return names, mapping
+
+    @classmethod
+    def compute(cls, previous: RatingStore, current: RatingStore) -> 'SnapshotDiff':
+        """Сравнивает предыдущую и текущую версии данных."""
+        before, after = previous.frame, current.frame
+
+        names, participant_map = cls._codes(
+            after['participant'].cat.categories, before['participant'].cat.categories
+        )
+        rating_types, type_map = cls._codes(
+            pd.Index(after['rating_type'].cat.categories), pd.Index(before['rating_type'].cat.categories)
+        )
+        type_count = len(rating_types)
+        after_keys = (after['participant'].cat.codes.to_numpy().astype(np.int64) * type_count
+                      + after['rating_type'].cat.codes.to_numpy())
+        before_keys = (participant_map[before['participant'].cat.codes.to_numpy()].astype(np.int64) * type_count
+                       + type_map[before['rating_type'].cat.codes.to_numpy()])
+
+        # Повторы пары (участник, тип рейтинга) не учитываются: берется первая строка
+        size = len(names) * type_count
+        before_first = cls._first_positions(before_keys, size)
+        after_first = cls._first_positions(after_keys, size)
+        after_rows = np.flatnonzero(after_first[after_keys] == np.arange(len(after_keys)))
+        after_keys = after_keys[after_rows]
+        matched = before_first[after_keys]
+        before_unique = np.flatnonzero(before_first >= 0)
+        dropped = after_first[before_unique] < 0
+
+        found = matched >= 0
+        before_match = np.where(found, matched, 0)
+        rank_before_all = before['rank'].to_numpy(dtype=np.float64, na_value=np.nan)
+        points_before_all = before['points'].to_numpy(dtype=np.float64)
+        rank_before = np.where(found, rank_before_all[before_match], np.nan)
+        points_before = np.where(found, points_before_all[before_match], np.nan)
+        rank_after = after['rank'].to_numpy(dtype=np.float64, na_value=np.nan)[after_rows]
+        points_after = after['points'].to_numpy(dtype=np.float64)[after_rows]
+
+        dropped_keys = before_unique[dropped]
+        dropped_rows = before_first[dropped_keys]
+        nan = np.full(len(dropped_keys), np.nan)
+        status = np.concatenate([np.where(found, 2, 0), np.ones(len(dropped_keys), dtype=np.int64)])
+        keys = np.concatenate([after_keys, dropped_keys])
+        rank_before = np.concatenate([rank_before, rank_before_all[dropped_rows]])
+        rank_after = np.concatenate([rank_after, nan])
+        points_before = np.concatenate([points_before, points_before_all[dropped_rows]])
+        points_after = np.concatenate([points_after, nan])
+        participants, types = np.divmod(keys, type_count)
+
+        frame = pd.DataFrame({
+            'participant': pd.Categorical.from_codes(participants, categories=names),
+            'rating_type': pd.Categorical.from_codes(types, categories=rating_types),
+            'status': pd.Categorical.from_codes(status, categories=cls.STATUSES),
+            'rank_before': rank_before,
+            'rank_after': rank_after,
+            'points_before': np.round(points_before, RatingStore.POINTS_DECIMALS),
+            'points_after': np.round(points_after, RatingStore.POINTS_DECIMALS),
+            'rank_delta': rank_before - rank_after,
+            'points_delta': np.round(points_after - points_before, RatingStore.POINTS_DECIMALS),
+        })
+        return cls(frame)
+
+    def summary(self) -> pd.DataFrame:
+        """Сводка по типам рейтинга: новые, выбывшие, поднявшиеся, опустившиеся
+        участники и сумма набранных баллов."""
+        frame = self.frame
+        status = frame['status'].to_numpy()
+        grouped = pd.DataFrame({
+            'rating_type': frame['rating_type'],
+            'new': status == 'new',
+            'dropped': status == 'dropped',
+            'climbed': frame['rank_delta'].to_numpy() > 0,
+            'fell': frame['rank_delta'].to_numpy() < 0,
+            'points_gained': frame['points_delta'].clip(lower=0).fillna(0).to_numpy(),
+        }).groupby('rating_type', observed=False, sort=False).sum()
+        return grouped.astype({'new': int, 'dropped': int, 'climbed': int, 'fell': int})
+
+    @property
+    def climbers(self) -> pd.DataFrame:
+        """Поднявшиеся участники, отсортированные внутри типа рейтинга по числу мест
+        (при равенстве - по набранным баллам); считается один раз."""
+        if self._climbers is None:
+            frame = self.frame[self.frame['rank_delta'].to_numpy() > 0]
+            self._climbers = frame.sort_values(
+                ['rating_type', 'rank_delta', 'points_delta'], ascending=[True, False, False], kind='stable'
+            ).groupby('rating_type', observed=True, sort=False).head(StatConfig.MOVERS_TOP)
+        return self._climbers
+
+    def top_climbers(self, rating_type: str, top: Optional[int] = None) -> pd.DataFrame:
+        """Участники, поднявшиеся выше всех в типе рейтинга."""
+        climbers = self.climbers
+        return climbers[climbers['rating_type'] == rating_type].head(top or StatConfig.MOVERS_TOP)
+
+    def new_participants(self, rating_type: str) -> pd.DataFrame:
+        """Участники, появившиеся в типе рейтинга, по местам."""
+        frame = self.frame
+        rows = frame[(frame['rating_type'] == rating_type) & (frame['status'] == 'new')]
+        return rows.sort_values('rank_after')
+
+
+class MoversIndex:
+    """Изменения между двумя последними версиями данных (для /movers).
+
+    update() вызывается после каждого обновления или загрузки данных:
+    сравнение с предыдущей версией считается один раз и хранится до
+    следующего обновления. Если данные не изменились, остается прежнее
+    сравнение.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store: Optional[RatingStore] = None
+        self._timestamp: Optional[datetime] = None
+        self._diff: Optional[SnapshotDiff] = None
+        self._period: Tuple[Optional[datetime], Optional[datetime]] = (None, None)
+
+    @property
+    def diff(self) -> Optional[SnapshotDiff]:
+        return self._diff
+
+    @property
+    def period(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Время предыдущей и текущей версий, между которыми посчитаны изменения."""
+        return self._period
+
+    def update(self, store: RatingStore, timestamp: Optional[datetime] = None) -> Optional[SnapshotDiff]:
+        """Принимает новую версию данных и сравнивает ее с предыдущей."""
+        with self._lock:
+            previous, previous_timestamp = self._store, self._timestamp
+            if previous is store or (previous is not None and previous.fingerprint == store.fingerprint):
+                return self._diff
+            self._store, self._timestamp = store, timestamp
+            if previous is None or previous.empty or store.empty:
+                return self._diff
+
+            diff = SnapshotDiff.compute(previous, store)
+            self._diff = diff
+            self._period = (previous_timestamp, timestamp)
+        logger.info(f"Изменения рейтинга посчитаны: {len(diff.frame)} строк")
+        return diff
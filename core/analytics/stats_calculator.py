@@ -1,40 +1,32 @@
-import pandas as pd
-from typing import Dict
-from .config import StatConfig
+from typing import Dict, Tuple, List, Any
+from core.parser import RatingStore
+from .rating_matrix import RatingMatrix
 
 class StatsCalculator:
     @staticmethod
-    def _get_language_columns(prefix: str) -> Dict[str, str]:
-        """Возвращает словарь с колонками для конкретного префикса
-        
-        Args:
-            prefix: Префикс для колонок (например, 'Место_' или 'Баллы_')
-            
-        Returns:
-            Словарь в формате {название_колонки: метод_агрегации}
-        """
-        columns = {f'{prefix}{lang}': 'first' for lang in StatConfig.LANGUAGES}
-        if StatConfig.INCLUDE_GENERAL:
-            columns[f'{prefix}Общий'] = 'first'
-        return columns
+    def language_counts(store: RatingStore) -> Dict[str, int]:
+        """Количество участников с положительными баллами по языкам (исключая общий зачет)"""
+        return RatingMatrix.for_store(store).language_counts()
 
-    @classmethod
-    def _build_agg_config(cls) -> Dict[str, str]:
-        """Генерирует конфигурацию для агрегации данных"""
-        config = {}
-        config['Дата'] = 'max'
-        config.update(cls._get_language_columns('Место_'))
-        config.update(cls._get_language_columns('Баллы_'))
-        config.update(StatConfig.COMMON_COLUMNS)
-        return config
+    @staticmethod
+    def languages_per_user(store: RatingStore) -> Tuple[Dict[int, int], int]:
+        """Распределение участников по количеству языков с положительными баллами
+        (исключая общий зачет) и общее количество участников"""
+        return RatingMatrix.for_store(store).languages_per_user()
+
+    @staticmethod
+    def language_overlap(store: RatingStore) -> Tuple[List[str], List[List[int]]]:
+        """Языки и матрица совместного использования языков участниками
+        (исключая общий зачет)"""
+        languages, overlap = RatingMatrix.for_store(store).language_overlap()
+        return languages, overlap.tolist()
 
-    @classmethod
-    def group_by_user(cls, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df.loc[:, 'Дата'] = pd.to_datetime(df['Дата'], errors='coerce')
-        df = df.dropna(subset=['Дата'])
-        for col in df.columns:
-            if col.startswith('Баллы_'):
-                df.loc[:, col] = pd.to_numeric(df[col], errors='coerce')
-        
-        return df.groupby('Участник').agg(cls._build_agg_config()).reset_index()
\ No newline at end of file
+    @staticmethod
+    def score_distribution(store: RatingStore) -> Dict[str, Any]:
+        """Гистограммы и процентили положительных баллов по языкам (исключая общий зачет)"""
+        return RatingMatrix.for_store(store).score_distribution
+
+    @staticmethod
+    def activity(store: RatingStore) -> Dict[str, Any]:
+        """Количество участников по дню и часу последнего решения"""
+        return RatingMatrix.for_store(store).activity
@@ -0,0 +1,48 @@
+import logging
+from typing import Optional, Dict, Any
+from core.parser import RatingStore
+from .rating_matrix import RatingMatrix
+from .config import StatConfig
+
+logger = logging.getLogger(__name__)
+
+
+class UserIndex:
+    """Индекс сводной статистики участников.
+
+    Читает матрицу участник × тип рейтинга (RatingMatrix), построенную один
+    раз после каждого обновления или загрузки данных; сводка участника
+    собирается из строки матрицы при запросе.
+    Сводка участника:
+        {
+            'username': str,
+            'tasks': int,
+            'last_date': pd.Timestamp,
+            'ratings': {тип рейтинга: {'place': int | None, 'points': float}}
+        }
+    """
+    def __init__(self):
+        self._matrix: Optional[RatingMatrix] = None
+
+    def __len__(self) -> int:
+        return len(self._matrix) if self._matrix is not None else 0
+
+    def __contains__(self, username: str) -> bool:
+        return self.get(username) is not None
+
+    def rebuild(self, store: RatingStore) -> None:
+        """Перестраивает индекс по хранилищу и атомарно заменяет старый."""
+        self._matrix = RatingMatrix.for_store(store)
+        logger.info(f"Индекс участников перестроен: {len(self._matrix)} участников")
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """Возвращает сводку участника или None, если участник не найден."""
+        matrix = self._matrix
+        return matrix.summary(username) if matrix is not None else None
+
+    @staticmethod
+    def ordered_ratings(summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Рейтинги участника в порядке StatConfig: языки, затем общий зачет."""
+        order = [*StatConfig.LANGUAGES, 'Общий']
+        ratings = summary['ratings']
+        return {rating_type: ratings[rating_type] for rating_type in order if rating_type in ratings}
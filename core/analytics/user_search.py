@@ -0,0 +1,112 @@
+import bisect
+import logging
+import numpy as np
+from typing import Optional, List, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class UserSearchIndex:
+    """Индекс поиска участников по нику.
+
+    Поддерживает:
+    - точный поиск без учета регистра (словарь по casefold);
+    - автодополнение по префиксу (бинарный поиск в отсортированном списке);
+    - подсказки "возможно, вы имели в виду" по сходству триграмм
+      (инвертированный индекс триграмм, подсчет совпадений через numpy.bincount).
+    """
+    MIN_SIMILARITY: float = 0.3
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._by_folded: Dict[str, List[str]] = {}
+        self._sorted_folded: List[str] = []
+        self._sorted_ids: List[int] = []
+        self._postings: Dict[str, np.ndarray] = {}
+        self._gram_counts = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _trigrams(folded: str) -> set:
+        padded = f"  {folded} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def rebuild(self, names: Iterable[str]) -> None:
+        """Перестраивает индекс по списку ников и атомарно заменяет старый."""
+        names = list(dict.fromkeys(names))
+        folded = [name.casefold() for name in names]
+
+        by_folded: Dict[str, List[str]] = {}
+        for name, key in zip(names, folded):
+            by_folded.setdefault(key, []).append(name)
+
+        order = sorted(range(len(names)), key=folded.__getitem__)
+
+        postings: Dict[str, List[int]] = {}
+        gram_counts = np.zeros(len(names), dtype=np.int32)
+        for name_id, key in enumerate(folded):
+            grams = self._trigrams(key)
+            gram_counts[name_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(name_id)
+
+        self._names = names
+        self._by_folded = by_folded
+        self._sorted_folded = [folded[i] for i in order]
+        self._sorted_ids = order
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._gram_counts = gram_counts
+        logger.info(f"Индекс поиска участников перестроен: {len(names)} ников, "
+                    f"{len(postings)} триграмм")
+
+    def find_exact(self, query: str) -> Optional[str]:
+        """Находит ник без учета регистра. При нескольких совпадениях
+        предпочитается точное совпадение регистра."""
+        matches = self._by_folded.get(query.casefold())
+        if not matches:
+            return None
+        return query if query in matches else matches[0]
+
+    def complete(self, prefix: str, limit: int = 5) -> List[str]:
+        """Возвращает до limit ников, начинающихся с prefix (без учета регистра)."""
+        folded = prefix.casefold()
+        if not folded:
+            return []
+        start = bisect.bisect_left(self._sorted_folded, folded)
+        result = []
+        for pos in range(start, min(start + limit, len(self._sorted_folded))):
+            if not self._sorted_folded[pos].startswith(folded):
+                break
+            result.append(self._names[self._sorted_ids[pos]])
+        return result
+
+    def suggest(self, query: str, limit: int = 5, min_similarity: float = None) -> List[str]:
+        """Возвращает до limit ников, похожих на query по сходству Жаккара триграмм."""
+        min_similarity = self.MIN_SIMILARITY if min_similarity is None else min_similarity
+        grams = self._trigrams(query.casefold())
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not postings:
+            return []
+
+        shared = np.bincount(np.concatenate(postings), minlength=len(self._names))
+        candidates = np.flatnonzero(shared)
+        similarity = shared[candidates] / (len(grams) + self._gram_counts[candidates] - shared[candidates])
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        if len(candidates) > limit:
+            top = np.argpartition(-similarity, limit - 1)[:limit]
+            candidates, similarity = candidates[top], similarity[top]
+        order = np.lexsort((candidates, -similarity))
+        return [self._names[i] for i in candidates[order]]
+
+    def did_you_mean(self, query: str, limit: int = 5) -> List[str]:
+        """Подсказки для ненайденного ника: сначала автодополнение, затем похожие ники."""
+        result = self.complete(query, limit)
+        for name in self.suggest(query, limit):
+            if len(result) >= limit:
+                break
+            if name not in result:
+                result.append(name)
+        return result
@@ -1,21 +1,36 @@
+import asyncio
 import logging
 import pandas as pd
-from io import BytesIO
 from aiogram.filters import Command
-from aiogram import Dispatcher, Router, types
-from matplotlib import pyplot as plt
-from core.analytics import StatsCalculator, PlotBuilder
-from core.parser import CodeRunRatingScraper
+from aiogram import Bot, Dispatcher, Router, F, types
+from aiogram.exceptions import TelegramBadRequest
+from core.analytics import PlotBuilder, UserIndex, UserSearchIndex, ChartCache, ChartRenderer, MoversIndex, \
+    LeaderboardIndex, StatsCalculator, RatingMatrix
+from core.analytics.config import StatConfig
+from core.analytics.exceptions import RenderQueueFullError
+from core.parser import CodeRunRatingScraper, RatingStore, RatingHistory, RefreshScheduler
 from core.parser.exceptions import *
+from core.config import MainConfig
 from .texts.commands import CommandTexts
-from .keyboards import help_keyboard
+from .keyboards import help_keyboard, top_page_keyboard
 from .texts.info import InfoText
-from .utils import format_date
+from .utils import format_date, format_age
 from .config import BotConfig
+from .subscriptions import SubscriptionStore
+from .notifications import NotificationQueue
 
 logger = logging.getLogger(__name__)
 
 scraper = CodeRunRatingScraper()
+user_index = UserIndex()
+user_search = UserSearchIndex()
+chart_cache = ChartCache()
+chart_renderer = ChartRenderer()
+history = RatingHistory() if BotConfig.HISTORY_ENABLED else None
+movers = MoversIndex()
+subscriptions = SubscriptionStore()
+notifier = NotificationQueue(on_forbidden=subscriptions.remove_chat)
+background_tasks = set()
 router = Router()
 
 def get_user_info(message: types.Message) -> str:
@@ -24,15 +39,206 @@ def get_user_info(message: types.Message) -> str:
     return f"(@{user.username}) [id:{user.id}]"
 
 
-async def on_startup(dispatcher: Dispatcher):
+async def render_chart(store: RatingStore, chart: str) -> bytes:
+    """Агрегирует данные для графика и отрисовывает его в сервисе графиков."""
+    return await chart_renderer.render(chart, PlotBuilder.chart_data(chart, store))
+
+
+async def get_chart(store: RatingStore, chart: str) -> bytes:
+    """Возвращает PNG графика из кэша или строит его."""
+    return await chart_cache.get_or_render(
+        store.fingerprint, chart, lambda: render_chart(store, chart)
+    )
+
+
+async def send_chart(message: types.Message, store: RatingStore, chart: str, caption: str):
+    """Отправляет график: по file_id, если он уже отправлялся, иначе байтами."""
+    version = store.fingerprint
+    file_id = chart_cache.get_file_id(version, chart)
+    if file_id:
+        try:
+            await message.answer_photo(photo=file_id, caption=caption)
+            return
+        except TelegramBadRequest as e:
+            logger.warning(f"Не удалось отправить график {chart} по file_id: {str(e)}")
+            chart_cache.forget_file_id(version, chart)
+
+    image_bytes = await get_chart(store, chart)
+    photo = types.BufferedInputFile(image_bytes, filename=f"{chart}.png")
+    sent = await message.answer_photo(photo=photo, caption=caption)
+    if sent.photo:
+        chart_cache.set_file_id(version, chart, sent.photo[-1].file_id)
+
+
+async def warm_chart_cache(store: RatingStore):
+    """Заранее строит все графики для новой версии данных."""
+    for chart in PlotBuilder.CHARTS:
+        if store is not scraper.store:
+            return
+        try:
+            await get_chart(store, chart)
+        except Exception as e:
+            logger.warning(f"Не удалось заранее построить график {chart}: {str(e)}")
+    logger.info(f"Кэш графиков прогрет для версии данных {store.fingerprint}")
+
+
+def format_subscription_notice(changes: pd.DataFrame) -> str:
+    """Уведомление подписчику: изменения мест участников, на которых он подписан."""
+    previous, current = movers.period
+    lines = [f"🔔 Изменения мест {format_date(previous)} → {format_date(current)}"]
+    for participant, rows in changes.groupby('participant', sort=False):
+        lines.append(f"\n👤 {participant}")
+        rows = rows.assign(general=rows['rating_type'] != 'Общий').sort_values(['general', 'rank_after'])
+        for row in rows.itertuples(index=False):
+            before = None if pd.isna(row.rank_before) else int(row.rank_before)
+            after = None if pd.isna(row.rank_after) else int(row.rank_after)
+            lines.append(f"{row.rating_type}: {before or '–'} → {after or '–'} место"
+                         f"{format_rank_change(before, after)}")
+    return "\n".join(lines)
+
+
+def compute_changes(store: RatingStore):
+    """Сравнивает новую версию данных с предыдущей и находит изменения для подписчиков.
+
+    Returns:
+        {chat_id: изменения} или None, если новой версии сравнения нет
+    """
+    previous = movers.diff
+    diff = movers.update(store, scraper.last_update)
+    if diff is None or diff is previous:
+        return None
+    return subscriptions.changes(diff)
+
+
+async def update_movers(store: RatingStore):
+    """Сравнивает новую версию данных с предыдущей (/movers) и рассылает уведомления подписчикам."""
+    try:
+        changes = await asyncio.get_running_loop().run_in_executor(None, compute_changes, store)
+    except Exception as e:
+        logger.error(f"Не удалось посчитать изменения рейтинга: {str(e)}", exc_info=True)
+        return
+    if changes:
+        queued = sum(notifier.put(chat_id, format_subscription_notice(rows)) for chat_id, rows in changes.items())
+        logger.info(f"Уведомления об изменении мест поставлены в очередь: {queued} из {len(changes)}")
+
+
+def build_indexes(store: RatingStore) -> UserSearchIndex:
+    """Строит производные индексы новой версии данных (выполняется в пуле потоков).
+
+    Матрица рейтинга и таблицы лидеров кэшируются по версии данных,
+    индекс поиска возвращается для подмены в цикле событий.
+    """
+    RatingMatrix.for_store(store)
+    LeaderboardIndex.for_store(store)
+    search = UserSearchIndex()
+    search.rebuild(store.participants)
+    return search
+
+
+def swap_indexes(store: RatingStore, search: UserSearchIndex):
+    """Подменяет индексы участников построенными для store."""
+    global user_search
+    user_index.rebuild(store)
+    user_search = search
+
+
+async def refresh_indexes(store: RatingStore):
+    """Строит индексы в пуле потоков, подменяет их и прогревает кэш графиков."""
+    try:
+        search = await asyncio.get_running_loop().run_in_executor(None, build_indexes, store)
+    except Exception as e:
+        logger.error(f"Не удалось перестроить индексы участников: {str(e)}", exc_info=True)
+        return
+    if store is not scraper.store:
+        logger.debug("Индексы построены для устаревшей версии данных, подмена пропущена")
+        return
+    swap_indexes(store, search)
+    await warm_chart_cache(store)
+
+
+def on_data_updated(store: RatingStore):
+    """Перестраивает производные индексы после обновления или загрузки данных."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.debug("Нет запущенного цикла событий, индексы строятся синхронно")
+        swap_indexes(store, build_indexes(store))
+        movers.update(store, scraper.last_update)
+        return
+    for coroutine in (update_movers(store), refresh_indexes(store)):
+        task = loop.create_task(coroutine)
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+
+def save_data():
+    """Сохраняет данные в основном и дополнительных форматах."""
+    for file_format in dict.fromkeys([BotConfig.DATA_FORMAT, *BotConfig.EXPORT_FORMATS]):
+        scraper.save(BotConfig.PATH_TO_DATA, file_format)
+
+
+def save_history():
+    """Добавляет текущие данные в историю обновлений."""
+    snapshot = scraper.snapshot
+    if history is None or snapshot.empty:
+        return
+    try:
+        history.append(snapshot.store, snapshot.timestamp)
+    except Exception as e:
+        logger.error(f"Не удалось сохранить снимок истории: {str(e)}", exc_info=True)
+
+
+async def on_data_refreshed():
+    """Сохраняет данные после фонового обновления, не блокируя цикл событий."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, save_data)
+    await loop.run_in_executor(None, save_history)
+
+
+refresh_scheduler = RefreshScheduler(scraper, on_refresh=on_data_refreshed)
+
+
+def load_data():
+    """Загружает сохраненные данные: сначала бинарный снимок,
+    затем дополнительные форматы (данные прежних версий)."""
+    for file_format in dict.fromkeys([BotConfig.DATA_FORMAT, *BotConfig.EXPORT_FORMATS]):
+        try:
+            scraper.load(BotConfig.PATH_TO_DATA, file_format)
+            return
+        except (FileNotFoundError, ImportError) as e:
+            logger.warning(f"Не удалось загрузить данные в формате {file_format}: {str(e)}")
+    logger.warning("Файл с данными не найден, будет создан при первом обновлении")
+
+
+def data_age_text() -> str:
+    """Строка о свежести данных для ответов бота."""
+    text = f"🕒 Данные обновлены: {format_age(scraper.data_age)}"
+    if scraper.stale_ratings:
+        text += f"\n⚠️ Не удалось обновить: {', '.join(scraper.stale_ratings)} (показаны прежние данные)"
+    return text
+
+
+async def on_startup(dispatcher: Dispatcher, bot: Bot):
     try:
         logger.info("Попытка загрузки данных при старте бота")
-        scraper.load(BotConfig.PATH_TO_DATA)
-    except FileNotFoundError:
-        logger.warning("Файл с данными не найден, будет создан при первом обновлении")
+        load_data()
+        save_history()
     except Exception as e:
         logger.error(f"Ошибка при загрузке данных: {e}", exc_info=True)
         raise
+    refresh_scheduler.start()
+    notifier.start(bot)
+
+
+async def on_shutdown(dispatcher: Dispatcher):
+    try:
+        logger.info("Освобождение ресурсов парсера при остановке бота")
+        await refresh_scheduler.stop()
+        await notifier.stop()
+        await scraper.close()
+        chart_renderer.close()
+    except Exception as e:
+        logger.error(f"Ошибка при остановке парсера: {e}", exc_info=True)
 
 
 @router.message(Command("start"))
@@ -70,26 +276,20 @@ async def cmd_update(message: types.Message):
     try:
         user_info = get_user_info(message)
         logger.info(f"Обработка команды /update от пользователя {user_info}")
-        if scraper._is_updating:
-            logger.warning(f"Попытка обновления во время уже выполняющегося обновления ({user_info})")
-            await message.answer("🔄 Парсинг уже в процессе, пожалуйста подождите...")
-            return
-            
-        progress_msg = await message.answer("⏳ Парсим данные...")
-        logger.debug(f"Начато обновление данных по запросу {user_info}")
-        
-        await scraper.update()
-        scraper.save(BotConfig.PATH_TO_DATA)
-        
+        # Сбор идет в фоне, команда лишь просит обновить данные пораньше
         formatted_date = format_date(scraper.last_update)
-        logger.info(f"Данные успешно обновлены ({formatted_date}) по запросу {user_info}")
-        
-        await message.answer(f"✅ Данные обновлены ({formatted_date})")
-        await progress_msg.delete()
+        if not refresh_scheduler.request_refresh():
+            logger.info(f"Данные актуальны ({formatted_date}), обновление по запросу {user_info} не требуется")
+            await message.answer(f"✅ Данные актуальны ({formatted_date})")
+        elif scraper.is_updating:
+            logger.info(f"Обновление уже выполняется (запрос от {user_info})")
+            await message.answer("🔄 Обновление уже выполняется, новые данные появятся автоматически\n"
+                                 f"{data_age_text()}")
+        else:
+            logger.info(f"Запланировано внеочередное обновление по запросу {user_info}")
+            await message.answer("🔄 Обновление запущено в фоне, новые данные появятся через несколько минут\n"
+                                 f"{data_age_text()}")
         
-    except DataCollectionError as e:
-        logger.error(f"Ошибка сбора данных: {str(e)}", exc_info=True)
-        await message.answer(f"❌ Ошибка при обновлении данных: {str(e)}")
     except Exception as e:
         logger.critical(f"Неизвестная ошибка при обновлении: {str(e)}", exc_info=True)
         await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
@@ -114,44 +314,36 @@ async def cmd_lang_distr(message: types.Message):
     try:
         user_info = get_user_info(message)
         logger.info(f"Обработка команды /user_by_lang от пользователя {user_info}")
-        df = scraper.get_data()
-        
-        if df.empty:
+
+        # Одна версия данных на весь запрос, даже если во время построения пройдет обновление
+        store = scraper.snapshot.store
+        if store.empty:
             logger.warning(f"Нет данных для построения графиков (запрос от {user_info})")
             await message.answer("Нет данных для построения графиков\nВыполните /update")
             return
 
-        progress_msg = await message.answer("⏳ Строим графики...")
+        charts = ['users_by_language_bar', 'users_by_language_pie']
+        progress_msg = None
+        if not all([await chart_cache.contains(store.fingerprint, chart) for chart in charts]):
+            progress_msg = await message.answer("⏳ Строим графики...")
         logger.debug(f"Начато построение графиков распределения по языкам для {user_info}")
-        
-        fig_bar = PlotBuilder.plot_users_by_language_bar(df)
-        fig_pie = PlotBuilder.plot_users_by_language_pie(df)
-        logger.debug(f"Графики успешно построены для {user_info}")
-
-        def fig_to_bytes(fig: plt.Figure) -> bytes:
-            buf = BytesIO()
-            fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            buf.seek(0)
-            plt.close(fig)
-            return buf.getvalue()
-
-        bar_bytes = fig_to_bytes(fig_bar)
-        pie_bytes = fig_to_bytes(fig_pie)        
-        bar_photo = types.BufferedInputFile(bar_bytes, filename="lang_bar.png")
-        pie_photo = types.BufferedInputFile(pie_bytes, filename="lang_pie.png")
-
-        await message.answer_photo(
-            photo=bar_photo,
-            caption="📊 Распределение участников по языкам (столбчатая диаграмма)"
-        )        
-        await message.answer_photo(
-            photo=pie_photo,
-            caption="🍰 Распределение участников по языкам (круговая диаграмма)"
+
+        await send_chart(
+            message, store, 'users_by_language_bar',
+            caption="📊 Распределение участников по языкам (столбчатая диаграмма)\n" + data_age_text()
+        )
+        await send_chart(
+            message, store, 'users_by_language_pie',
+            caption="🍰 Распределение участников по языкам (круговая диаграмма)\n" + data_age_text()
         )
         
-        await progress_msg.delete()
+        if progress_msg:
+            await progress_msg.delete()
         logger.info(f"Графики успешно отправлены пользователю {user_info}")
 
+    except RenderQueueFullError as e:
+        logger.warning(f"Очередь графиков переполнена (запрос от {get_user_info(message)})")
+        await message.answer(f"⏳ {str(e)}")
     except ValueError as e:
         logger.error(f"Ошибка значения при построении графиков: {str(e)}", exc_info=True)
         await message.answer(f"❌ Ошибка: {str(e)}")
@@ -166,37 +358,171 @@ async def cmd_user_langs_distr(message: types.Message):
     try:
         user_info = get_user_info(message)
         logger.info(f"Обработка команды /langcnt_by_user от пользователя {user_info}")
-        df = scraper.get_data()
-        
-        if df.empty:
+
+        # Одна версия данных на весь запрос, даже если во время построения пройдет обновление
+        store = scraper.snapshot.store
+        if store.empty:
             logger.warning(f"Нет данных для построения графиков (запрос от {user_info})")
             await message.answer("Нет данных для построения графиков\nВыполните /update")
             return
 
-        progress_msg = await message.answer("⏳ Строим диаграмму...")
+        progress_msg = None
+        if not await chart_cache.contains(store.fingerprint, 'languages_per_user'):
+            progress_msg = await message.answer("⏳ Строим диаграмму...")
         logger.debug(f"Начато построение диаграммы распределения языков для {user_info}")
         
-        fig = PlotBuilder.plot_languages_per_user_distribution(df)
-        logger.debug(f"Диаграмма успешно построена для {user_info}")
-
-        def fig_to_bytes(fig: plt.Figure) -> bytes:
-            buf = BytesIO()
-            fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            buf.seek(0)
-            plt.close(fig)
-            return buf.getvalue()
-        
-        image_bytes = fig_to_bytes(fig)
-        photo = types.BufferedInputFile(image_bytes, filename="user_langs_distr.png")
-        
-        await message.answer_photo(
-            photo=photo,
-            caption="📊 Распределение участников по количеству используемых языков"
+        await send_chart(
+            message, store, 'languages_per_user',
+            caption="📊 Распределение участников по количеству используемых языков\n" + data_age_text()
         )
         
-        await progress_msg.delete()
+        if progress_msg:
+            await progress_msg.delete()
         logger.info(f"Диаграмма успешно отправлена пользователю {user_info}")
     
+    except RenderQueueFullError as e:
+        logger.warning(f"Очередь графиков переполнена (запрос от {get_user_info(message)})")
+        await message.answer(f"⏳ {str(e)}")
+    except ValueError as e:
+        logger.error(f"Ошибка значения при построении диаграммы: {str(e)}", exc_info=True)
+        await message.answer(f"❌ Ошибка: {str(e)}")
+    except Exception as e:
+        logger.error(f"Неизвестная ошибка при построении диаграммы: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+@router.message(Command("lang_overlap"))
+async def cmd_lang_overlap(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /lang_overlap от пользователя {user_info}")
+
+        store = scraper.snapshot.store
+        if store.empty:
+            logger.warning(f"Нет данных для построения графиков (запрос от {user_info})")
+            await message.answer("Нет данных для построения графиков\nВыполните /update")
+            return
+
+        progress_msg = None
+        if not await chart_cache.contains(store.fingerprint, 'language_overlap'):
+            progress_msg = await message.answer("⏳ Строим тепловую карту...")
+        logger.debug(f"Начато построение карты совместного использования языков для {user_info}")
+
+        await send_chart(
+            message, store, 'language_overlap',
+            caption="🧩 Сколько участников набрали баллы в обоих языках\n" + data_age_text()
+        )
+
+        if progress_msg:
+            await progress_msg.delete()
+        logger.info(f"Тепловая карта успешно отправлена пользователю {user_info}")
+
+    except RenderQueueFullError as e:
+        logger.warning(f"Очередь графиков переполнена (запрос от {get_user_info(message)})")
+        await message.answer(f"⏳ {str(e)}")
+    except ValueError as e:
+        logger.error(f"Ошибка значения при построении диаграммы: {str(e)}", exc_info=True)
+        await message.answer(f"❌ Ошибка: {str(e)}")
+    except Exception as e:
+        logger.error(f"Неизвестная ошибка при построении диаграммы: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+def format_score_percentiles(store: RatingStore) -> str:
+    """Процентили баллов по языкам для подписи к гистограммам"""
+    percentiles = StatsCalculator.score_distribution(store)['percentiles']
+    header = " / ".join(f"p{percentile}" for percentile in StatConfig.SCORE_PERCENTILES)
+    lines = [f"📐 Баллы по языкам ({header}):"]
+    for lang, values in percentiles.items():
+        lines.append(f"• {lang}: " + " / ".join(f"{value:.0f}" for value in values))
+    return "\n".join(lines)
+
+
+def format_activity_summary(store: RatingStore) -> str:
+    """Самые активные день и час для подписи к графикам активности"""
+    activity = StatsCalculator.activity(store)
+    if not activity['days']:
+        return "📅 Нет дат последнего решения участников"
+    busiest_day = max(range(len(activity['days'])), key=activity['day_counts'].__getitem__)
+    busiest_hour = max(range(24), key=activity['hour_counts'].__getitem__)
+    day = pd.Timestamp(activity['days'][busiest_day])
+    return (
+        "📅 Дата последнего решения участников\n"
+        f"Самый активный день: {day.strftime('%d.%m.%Y')} ({activity['day_counts'][busiest_day]} участников)\n"
+        f"Самый активный час: {busiest_hour:02d}:00 ({activity['hour_counts'][busiest_hour]} участников)"
+    )
+
+
+@router.message(Command("score_distr"))
+async def cmd_score_distr(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /score_distr от пользователя {user_info}")
+
+        store = scraper.snapshot.store
+        if store.empty:
+            logger.warning(f"Нет данных для построения графиков (запрос от {user_info})")
+            await message.answer("Нет данных для построения графиков\nВыполните /update")
+            return
+
+        progress_msg = None
+        if not await chart_cache.contains(store.fingerprint, 'score_distribution'):
+            progress_msg = await message.answer("⏳ Строим гистограммы...")
+        logger.debug(f"Начато построение распределения баллов для {user_info}")
+
+        await send_chart(
+            message, store, 'score_distribution',
+            caption=format_score_percentiles(store) + "\n" + data_age_text()
+        )
+
+        if progress_msg:
+            await progress_msg.delete()
+        logger.info(f"Распределение баллов успешно отправлено пользователю {user_info}")
+
+    except RenderQueueFullError as e:
+        logger.warning(f"Очередь графиков переполнена (запрос от {get_user_info(message)})")
+        await message.answer(f"⏳ {str(e)}")
+    except ValueError as e:
+        logger.error(f"Ошибка значения при построении диаграммы: {str(e)}", exc_info=True)
+        await message.answer(f"❌ Ошибка: {str(e)}")
+    except Exception as e:
+        logger.error(f"Неизвестная ошибка при построении диаграммы: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+@router.message(Command("activity"))
+async def cmd_activity(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /activity от пользователя {user_info}")
+
+        store = scraper.snapshot.store
+        if store.empty:
+            logger.warning(f"Нет данных для построения графиков (запрос от {user_info})")
+            await message.answer("Нет данных для построения графиков\nВыполните /update")
+            return
+        if not StatsCalculator.activity(store)['days']:
+            logger.warning(f"Нет дат решений для графиков активности (запрос от {user_info})")
+            await message.answer("Нет дат последнего решения участников для построения графиков активности")
+            return
+
+        progress_msg = None
+        if not await chart_cache.contains(store.fingerprint, 'activity'):
+            progress_msg = await message.answer("⏳ Строим графики активности...")
+        logger.debug(f"Начато построение графиков активности для {user_info}")
+
+        await send_chart(
+            message, store, 'activity',
+            caption=format_activity_summary(store) + "\n" + data_age_text()
+        )
+
+        if progress_msg:
+            await progress_msg.delete()
+        logger.info(f"Графики активности успешно отправлены пользователю {user_info}")
+
+    except RenderQueueFullError as e:
+        logger.warning(f"Очередь графиков переполнена (запрос от {get_user_info(message)})")
+        await message.answer(f"⏳ {str(e)}")
     except ValueError as e:
         logger.error(f"Ошибка значения при построении диаграммы: {str(e)}", exc_info=True)
         await message.answer(f"❌ Ошибка: {str(e)}")
@@ -213,43 +539,42 @@ async def cmd_user_stats(message: types.Message):
         username = message.text.split(maxsplit=1)[1].strip()
         logger.debug(f"Запрошена статистика для пользователя: {username} (запрос от {user_info})")
         
-        df = scraper.get_data()
-        
-        if df.empty:
+        if scraper.store.empty:
             logger.warning(f"Нет данных для анализа (запрос от {user_info})")
             await message.answer("Нет данных для анализа\nВыполните /update")
             return
 
-        user_stats = StatsCalculator.group_by_user(df)
-        user_data = user_stats[user_stats['Участник'] == username]
+        leaderboards = LeaderboardIndex.for_store(scraper.snapshot.store)
+        resolved = user_search.find_exact(username)
+        user_data = user_index.get(resolved) if resolved else None
 
-        if user_data.empty:
+        if user_data is None:
             logger.warning(f"Пользователь {username} не найден (запрос от {user_info})")
-            await message.answer(f"Пользователь {username} не найден")
+            suggestions = user_search.did_you_mean(username)
+            text = f"Пользователь {username} не найден"
+            if suggestions:
+                text += "\nВозможно, вы имели в виду:\n" + "\n".join(
+                    f"/user_stats {name}" for name in suggestions
+                )
+            await message.answer(text)
             return
+        username = resolved
 
         # Основные данные
-        tasks = user_data['Задачи'].values[0]
-        last_update = format_date(user_data['Дата'].iloc[0])
-        total_points = user_data['Баллы_Общий'].values[0]
-        total_place = user_data['Место_Общий'].values[0]
+        ratings = UserIndex.ordered_ratings(user_data)
+        total_rating = ratings.get('Общий', {})
+        tasks = user_data['tasks']
+        last_update = format_date(user_data['last_date'])
+        total_points = total_rating.get('points')
+        total_place = total_rating.get('place')
         logger.debug(f"Получены основные данные для {username} (запрос от {user_info})")
 
         # Собираем информацию по языкам
-        languages = []
-        for col in user_data.columns:
-            if col.startswith('Баллы_'):
-                lang = col.split('_')[1]
-                points = user_data[col].values[0]
-                place_str = user_data[f'Место_{lang}'].values[0]
-                
-                if pd.notna(points) and place_str.isdigit():
-                    place = int(place_str)
-                    languages.append({
-                        'lang': lang,
-                        'points': points,
-                        'place': place
-                    })
+        languages = [
+            {'lang': lang, 'points': rating['points'], 'place': rating['place']}
+            for lang, rating in ratings.items()
+            if rating['place'] is not None
+        ]
         logger.debug(f"Получены данные по языкам для {username} (запрос от {user_info})")
 
         # Сортируем языки по баллам (по убыванию)
@@ -275,15 +600,17 @@ async def cmd_user_stats(message: types.Message):
             f"👤 *{username}*",
             f"✅ Решено задач: {tasks}",
             f"🕒 Последнее решение: {last_update}",
+            data_age_text(),
             "\n---\n",
             "🔹 *Общий зачёт:*"
         ]
 
         # Добавляем общую статистику
-        try:
-            total_place_int = int(total_place)
-            top100_row = user_stats[user_stats['Место_Общий'] == '100']
-            top100_points = top100_row['Баллы_Общий'].values[0] if not top100_row.empty else 0
+        if total_place is None:
+            response.append("📍 Нет данных по общему зачёту")
+        else:
+            general_board = leaderboards.get('Общий')
+            top100_points = (general_board.points_for_top(100) if general_board else None) or 0.0
             points_diff = abs(total_points - top100_points)
             
             if total_points >= top100_points:
@@ -292,8 +619,9 @@ async def cmd_user_stats(message: types.Message):
             else:
                 response.append(f"📍 {total_place} место ({total_points} баллов)")
                 response.append(f"📊 -{points_diff} баллов до топ-100")
-        except (ValueError, IndexError):
-            response.append(f"📍 {total_place} место ({total_points} баллов)")
+            standing = leaderboards.standing(username, 'Общий')
+            if standing is not None:
+                response.append(f"📈 Больше баллов, чем у {standing[2]:.1f}% участников")
         logger.debug(f"Сформирована общая статистика для {username} (запрос от {user_info})")
 
         # Добавляем языки программирования
@@ -312,27 +640,14 @@ async def cmd_user_stats(message: types.Message):
             response.append("\n🔹 Нет данных по языкам программирования")
         logger.debug(f"Сформирована статистика по языкам для {username} (запрос от {user_info})")
 
-        # Добавляем информацию о привилегиях
-        has_fast_track = total_place_int <= 100 if 'total_place_int' in locals() else False
-        has_merch = total_place_int <= 100 if 'total_place_int' in locals() else False
-        has_certificate = total_place_int <= 300 if 'total_place_int' in locals() else False
-        
-        if not has_fast_track:
-            has_fast_track = any(lang['place'] <= 10 for lang in languages)
-        if not has_merch:
-            has_merch = any(lang['place'] <= 10 for lang in languages)
-        if not has_certificate:
-            has_certificate = any(lang['place'] <= 20 for lang in languages)
-
-        response.extend([
-            "\n---\n",
-            "🎁 *Текущие привилегии:*",
-            "✅ Фаст-трек" if has_fast_track else "❌ Фаст-трек",
-            "✅ Мерч CodeRun" if has_merch else "❌ Мерч CodeRun",
-            "✅ Сертификат" if has_certificate else "❌ Сертификат",
-            "\n---\n",
-            InfoText.about_reward
-        ])
+        # Добавляем информацию о привилегиях: топ общего зачета или топ любого языка
+        response.extend(["\n---\n", "🎁 *Текущие привилегии:*"])
+        for reward, (general_top, language_top) in BotConfig.REWARDS.items():
+            earned = (total_place is not None and total_place <= general_top) or any(
+                lang['place'] <= language_top for lang in languages if lang['lang'] != 'Общий'
+            )
+            response.append(f"✅ {reward}" if earned else f"❌ {reward}")
+        response.extend(["\n---\n", InfoText.about_reward])
         logger.debug(f"Сформирована информация о привилегиях для {username} (запрос от {user_info})")
 
         await message.answer("\n".join(response), parse_mode="Markdown")
@@ -346,10 +661,365 @@ async def cmd_user_stats(message: types.Message):
         await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
 
 
+async def get_leaderboard(message: types.Message, query: str, command: str):
+    """Таблица лидеров типа рейтинга по запросу или None (с ответом пользователю)."""
+    store = scraper.snapshot.store
+    if store.empty:
+        await message.answer("Нет данных для анализа\nВыполните /update")
+        return None
+    leaderboards = LeaderboardIndex.for_store(store)
+    rating_type = leaderboards.find_rating_type(query)
+    if rating_type is None:
+        await message.answer(f"Неизвестный язык: {query}\n"
+                             f"Доступно: {', '.join(leaderboards.rating_types)}\n"
+                             f"Пример: /{command} python")
+        return None
+    return leaderboards.get(rating_type)
+
+
+@router.message(Command("threshold"))
+async def cmd_threshold(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /threshold от пользователя {user_info}")
+        args = message.text.split()[1:]
+        if len(args) < 2:
+            raise IndexError
+        by_points = len(args) > 2 and args[2].lower().startswith(('балл', 'б'))
+        value = float(args[1].replace(',', '.')) if by_points else int(args[1])
+        if not by_points and value < 1:
+            raise ValueError(f"Размер топа должен быть не меньше 1: {value}")
+        logger.debug(f"Запрошена граница {args[0]} {value} (баллы: {by_points}, запрос от {user_info})")
+
+        board = await get_leaderboard(message, args[0], "threshold")
+        if board is None:
+            return
+
+        if by_points:
+            rank = board.rank_for_points(value)
+            response = (f"🎯 {value:g} баллов в {board.rating_type} — {rank} место из {len(board)}\n"
+                        f"📈 Больше баллов, чем у {board.percentile(value):.1f}% участников")
+        else:
+            points = board.points_for_top(value)
+            if points is None:
+                response = f"В {board.rating_type} всего {len(board)} участников с местом"
+            else:
+                leader = board.page(value - 1, 1).iloc[0]
+                response = (f"🎯 Граница топ-{value} в {board.rating_type}: {points:g} баллов\n"
+                            f"📍 Сейчас на {value} месте: {leader['participant']}")
+        await message.answer(f"{response}\n{data_age_text()}")
+        logger.info(f"Граница рейтинга успешно отправлена пользователю {user_info}")
+
+    except (IndexError, ValueError):
+        logger.warning(f"Неверные аргументы команды /threshold (запрос от {get_user_info(message)})")
+        await message.answer("Укажите язык и размер топа или баллы:\n"
+                             "/threshold <язык> <N> - сколько баллов нужно для топ-N\n"
+                             "/threshold <язык> <S> баллов - какое место дадут S баллов")
+    except Exception as e:
+        logger.error(f"Ошибка при обработке /threshold: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+def format_top_page(board, page: int) -> str:
+    """Страница таблицы лидеров для /top."""
+    rows = board.page(page, BotConfig.TOP_PAGE_SIZE)
+    lines = [f"🏆 {board.rating_type}: места {page * BotConfig.TOP_PAGE_SIZE + 1}–"
+             f"{page * BotConfig.TOP_PAGE_SIZE + len(rows)} из {len(board)}\n"]
+    lines.extend(f"{row.rank}. {row.participant} — {row.points:g}" for row in rows.itertuples(index=False))
+    return "\n".join(lines)
+
+
+@router.message(Command("top"))
+async def cmd_top(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /top от пользователя {user_info}")
+        args = message.text.split()[1:]
+        query = args[0] if args else 'Общий'
+        board = await get_leaderboard(message, query, "top")
+        if board is None:
+            return
+
+        pages = board.pages(BotConfig.TOP_PAGE_SIZE)
+        page = min(max(int(args[1]) - 1, 0), pages - 1) if len(args) > 1 else 0
+        await message.answer(format_top_page(board, page),
+                             reply_markup=top_page_keyboard(board.rating_type, page, pages))
+        logger.info(f"Таблица лидеров {board.rating_type} (страница {page + 1}) отправлена пользователю {user_info}")
+
+    except ValueError:
+        await message.answer("Укажите язык и номер страницы:\n/top <язык> [страница]")
+    except Exception as e:
+        logger.error(f"Ошибка при обработке /top: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+@router.callback_query(F.data.startswith("top:"))
+async def cb_top_page(callback: types.CallbackQuery):
+    try:
+        _, rating_type, page = callback.data.rsplit(":", 2)
+        store = scraper.snapshot.store
+        board = LeaderboardIndex.for_store(store).get(rating_type) if not store.empty else None
+        if board is None:
+            await callback.answer("Нет данных для этого рейтинга")
+            return
+
+        pages = board.pages(BotConfig.TOP_PAGE_SIZE)
+        page = min(max(int(page), 0), pages - 1)
+        await callback.message.edit_text(format_top_page(board, page),
+                                         reply_markup=top_page_keyboard(rating_type, page, pages))
+        await callback.answer()
+    except TelegramBadRequest:
+        # Сообщение не изменилось (повторное нажатие)
+        await callback.answer()
+    except Exception as e:
+        logger.error(f"Ошибка при переключении страницы /top: {str(e)}", exc_info=True)
+        await callback.answer("⚠️ Неизвестная ошибка")
+
+
+def format_rank_change(previous, current) -> str:
+    """Стрелка изменения места: ⬆️ - поднялся, ⬇️ - опустился."""
+    if previous is None or current is None or previous == current:
+        return ""
+    return f" ⬆️{previous - current}" if current < previous else f" ⬇️{current - previous}"
+
+
+@router.message(Command("user_history"))
+async def cmd_user_history(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /user_history от пользователя {user_info}")
+        args = message.text.split()[1:]
+        if not args:
+            raise IndexError
+        snapshots = BotConfig.HISTORY_SNAPSHOTS
+        if len(args) > 1 and args[-1].isdigit():
+            snapshots = max(1, min(int(args.pop()), BotConfig.HISTORY_MAX_SNAPSHOTS))
+        username = " ".join(args)
+        logger.debug(f"Запрошена история пользователя {username} за {snapshots} обновлений (запрос от {user_info})")
+
+        if history is None or len(history) == 0:
+            logger.warning(f"История обновлений пуста (запрос от {user_info})")
+            await message.answer("История обновлений пока пуста, она пополняется после каждого обновления данных")
+            return
+
+        username = user_search.find_exact(username) or username
+        loop = asyncio.get_running_loop()
+        trajectory = await loop.run_in_executor(None, history.trajectory, username, snapshots)
+
+        if trajectory.empty:
+            logger.warning(f"Нет истории для пользователя {username} (запрос от {user_info})")
+            suggestions = user_search.did_you_mean(username)
+            text = f"Нет истории для пользователя {username}"
+            if suggestions:
+                text += "\nВозможно, вы имели в виду:\n" + "\n".join(
+                    f"/user_history {name}" for name in suggestions
+                )
+            await message.answer(text)
+            return
+
+        versions = trajectory['version'].nunique()
+        response = [f"📈 *{username}* — история за {versions} обновл."]
+
+        # Общий зачёт: место и баллы после каждого обновления
+        general = trajectory[trajectory['rating_type'] == 'Общий']
+        if not general.empty:
+            response.append("\n🔹 *Общий зачёт:*")
+            previous = None
+            for row in general.itertuples(index=False):
+                rank = None if pd.isna(row.rank) else int(row.rank)
+                response.append(f"{format_date(row.timestamp)} — {rank or '–'} место "
+                                f"({row.points:g} баллов){format_rank_change(previous, rank)}")
+                previous = rank
+
+        # Языки: изменение места и баллов от первого обновления к последнему
+        languages = []
+        for lang, rows in trajectory[trajectory['rating_type'] != 'Общий'].groupby('rating_type', sort=False):
+            first, last = rows.iloc[0], rows.iloc[-1]
+            if last['points'] <= 0:
+                continue
+            first_rank = None if pd.isna(first['rank']) else int(first['rank'])
+            last_rank = None if pd.isna(last['rank']) else int(last['rank'])
+            languages.append((last['points'], f"🔸 {lang}: {first_rank or '–'} → {last_rank or '–'} место"
+                              f"{format_rank_change(first_rank, last_rank)}, "
+                              f"{first['points']:g} → {last['points']:g} баллов"))
+        if languages:
+            response.append("\n🔹 *Языки программирования:*")
+            response.extend(text for _, text in sorted(languages, key=lambda item: item[0], reverse=True))
+
+        await message.answer("\n".join(response), parse_mode="Markdown")
+        logger.info(f"История {username} успешно отправлена пользователю {user_info}")
+
+    except IndexError:
+        logger.warning(f"Не указан ник пользователя для команды /user_history (запрос от {get_user_info(message)})")
+        await message.answer("Укажите ник пользователя:\n/user_history <ник> [количество обновлений]")
+    except Exception as e:
+        logger.error(f"Ошибка при обработке /user_history: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+def format_mover(row) -> str:
+    """Строка участника для /movers: место до и после и набранные баллы."""
+    points = f", +{row.points_delta:g} баллов" if row.points_delta > 0 else ""
+    return f"{row.participant}: {int(row.rank_before)} → {int(row.rank_after)} место (⬆️{int(row.rank_delta)}{points})"
+
+
+@router.message(Command("movers"))
+async def cmd_movers(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /movers от пользователя {user_info}")
+        args = message.text.split()[1:]
+        lang = None
+        if args:
+            # Как в /top и /threshold: без учета регистра, 'общий' - общий зачет
+            leaderboards = LeaderboardIndex.for_store(scraper.snapshot.store)
+            lang = leaderboards.find_rating_type(args[0])
+            if lang is None:
+                logger.warning(f"Неизвестный язык {args[0]} в /movers (запрос от {user_info})")
+                await message.answer(f"Неизвестный язык: {args[0]}\n"
+                                     f"Доступно: {', '.join(leaderboards.rating_types)}\n"
+                                     f"Пример: /movers python")
+                return
+
+        diff = movers.diff
+        if diff is None:
+            logger.warning(f"Изменений рейтинга пока нет (запрос от {user_info})")
+            await message.answer("Изменений пока нет, они появятся после следующего обновления данных")
+            return
+
+        previous, current = movers.period
+        response = [f"🚀 Изменения рейтинга {format_date(previous)} → {format_date(current)}"]
+        summary = diff.summary()
+
+        if lang is None:
+            if 'Общий' in summary.index:
+                general = summary.loc['Общий']
+                response.append(f"\n🔹 Общий зачёт: новых {int(general['new'])}, выбыло {int(general['dropped'])}, "
+                                f"поднялись {int(general['climbed'])}, опустились {int(general['fell'])}")
+                response.extend(format_mover(row) for row in diff.top_climbers('Общий').itertuples(index=False))
+
+            best = []
+            for language in MainConfig.LANGUAGES:
+                top = diff.top_climbers(language, 1)
+                if not top.empty:
+                    row = next(top.itertuples(index=False))
+                    best.append((row.rank_delta, f"🔸 {language}: {format_mover(row)}"))
+            if best:
+                response.append("\n🔹 Лучший подъём по языкам:")
+                response.extend(text for _, text in sorted(best, key=lambda item: item[0], reverse=True))
+        else:
+            climbers = diff.top_climbers(lang)
+            response.append(f"\n🔹 {lang}:")
+            if climbers.empty:
+                response.append("Никто не поднялся")
+            response.extend(format_mover(row) for row in climbers.itertuples(index=False))
+
+            new = diff.new_participants(lang)
+            if not new.empty:
+                response.append(f"\n🆕 Новые участники ({len(new)}):")
+                response.extend(
+                    f"{row.participant}: {int(row.rank_after) if pd.notna(row.rank_after) else '–'} место, "
+                    f"{row.points_after:g} баллов"
+                    for row in new.head(BotConfig.MOVERS_NEW_TOP).itertuples(index=False)
+                )
+
+        await message.answer("\n".join(response))
+        logger.info(f"Изменения рейтинга успешно отправлены пользователю {user_info}")
+
+    except Exception as e:
+        logger.error(f"Ошибка при обработке /movers: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+async def resolve_participant(message: types.Message, username: str, command: str):
+    """Ник участника в данных или None (с подсказками похожих ников)."""
+    resolved = user_search.find_exact(username)
+    if resolved is None:
+        suggestions = user_search.did_you_mean(username)
+        text = f"Пользователь {username} не найден"
+        if suggestions:
+            text += "\nВозможно, вы имели в виду:\n" + "\n".join(f"/{command} {name}" for name in suggestions)
+        await message.answer(text)
+    return resolved
+
+
+def resolve_subscription(chat_id: int, query: str) -> str:
+    """Ник из подписок чата для /unsubscribe: как в /subscribe, без учета регистра.
+
+    Участник мог выбыть из данных, поэтому сначала ищется среди подписок чата.
+    """
+    names = subscriptions.for_chat(chat_id)
+    if query in names:
+        return query
+    folded = query.casefold()
+    matched = next((name for name in names if name.casefold() == folded), None)
+    return matched or user_search.find_exact(query) or query
+
+
+@router.message(Command("subscribe"))
+async def cmd_subscribe(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /subscribe от пользователя {user_info}")
+        args = message.text.split(maxsplit=1)
+        chat_id = message.chat.id
+
+        if len(args) < 2:
+            names = subscriptions.for_chat(chat_id)
+            if not names:
+                await message.answer("Подписок нет\nПодписаться на изменения мест участника:\n/subscribe <ник>")
+            else:
+                await message.answer("🔔 Ваши подписки:\n" + "\n".join(names) +
+                                     "\n\nОтписаться: /unsubscribe <ник>")
+            return
+
+        username = await resolve_participant(message, args[1].strip(), "subscribe")
+        if username is None:
+            logger.warning(f"Пользователь {args[1].strip()} для подписки не найден (запрос от {user_info})")
+            return
+
+        if subscriptions.add(chat_id, username):
+            logger.info(f"Чат {chat_id} подписан на {username} (запрос от {user_info})")
+            await message.answer(f"🔔 Вы подписаны на {username}\n"
+                                 f"После каждого обновления данных придет уведомление, если его место изменится")
+        else:
+            await message.answer(f"Вы уже подписаны на {username}")
+
+    except ValueError as e:
+        logger.warning(f"Подписка отклонена: {str(e)} (запрос от {get_user_info(message)})")
+        await message.answer(f"❌ {str(e)}")
+    except Exception as e:
+        logger.error(f"Ошибка при обработке /subscribe: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
+@router.message(Command("unsubscribe"))
+async def cmd_unsubscribe(message: types.Message):
+    try:
+        user_info = get_user_info(message)
+        logger.info(f"Обработка команды /unsubscribe от пользователя {user_info}")
+        query = message.text.split(maxsplit=1)[1].strip()
+        username = resolve_subscription(message.chat.id, query)
+        if subscriptions.remove(message.chat.id, username):
+            logger.info(f"Чат {message.chat.id} отписан от {username} (запрос от {user_info})")
+            await message.answer(f"🔕 Вы отписаны от {username}")
+        else:
+            await message.answer(f"Вы не подписаны на {username}\nВаши подписки: /subscribe")
+
+    except IndexError:
+        logger.warning(f"Не указан ник пользователя для команды /unsubscribe (запрос от {get_user_info(message)})")
+        await message.answer("Укажите ник пользователя:\n/unsubscribe <ник>")
+    except Exception as e:
+        logger.error(f"Ошибка при обработке /unsubscribe: {str(e)}", exc_info=True)
+        await message.answer(f"⚠️ Неизвестная ошибка: {str(e)}")
+
+
 def register_commands(dp):
     try:
         logger.info("Регистрация команд бота")
+        scraper.add_update_listener(on_data_updated)
         dp.startup.register(on_startup)
+        dp.shutdown.register(on_shutdown)
         dp.include_router(router)
         logger.debug("Команды успешно зарегистрированы")
     except Exception as e:
@@ -1,4 +1,5 @@
 import os
+from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 from ..config import MainConfig
 
@@ -7,5 +8,22 @@ load_dotenv()
 class BotConfig:
     BOT_TOKEN: str = os.getenv("BOT_TOKEN")
     PATH_TO_DATA: str = MainConfig.STORAGE_DIR / "data" / "data"
-    DATA_FORMAT: str = "csv"
+    DATA_FORMAT: str = "feather"  # Бинарный снимок: сохраняет типы и быстро загружается при старте
+    EXPORT_FORMATS: List[str] = ["csv"]  # Дополнительные форматы сохранения (для просмотра данных)
+    HISTORY_ENABLED: bool = True  # Сохранять каждое обновление в историю (/user_history)
+    HISTORY_SNAPSHOTS: int = 10  # Сколько последних обновлений показывает /user_history
+    HISTORY_MAX_SNAPSHOTS: int = 50
+    MOVERS_NEW_TOP: int = 10  # Сколько новых участников показывает /movers <язык>
+    SUBSCRIPTIONS_PATH: str = MainConfig.STORAGE_DIR / "data" / "subscriptions.json"
+    SUBSCRIPTIONS_PER_CHAT: int = 20
+    NOTIFY_MESSAGES_PER_SECOND: float = 25  # Telegram: не больше ~30 сообщений в секунду всего
+    NOTIFY_CHAT_INTERVAL: float = 1.0  # Telegram: не чаще одного сообщения в секунду в чат
+    NOTIFY_QUEUE_SIZE: int = 10000
+    TOP_PAGE_SIZE: int = 20  # Участников на странице /top
+    # Привилегии: (топ общего зачета, топ любого языка), достаточно одного из условий
+    REWARDS: Dict[str, Tuple[int, int]] = {
+        'Фаст-трек': (100, 10),
+        'Мерч CodeRun': (100, 10),
+        'Сертификат': (300, 20),
+    }
     DATETIME_FORMAT: str = MainConfig.DATETIME_FORMAT
\ No newline at end of file
@@ -1,4 +1,4 @@
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
+from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 
 def get_help_keyboard():
     builder = ReplyKeyboardBuilder()
@@ -8,4 +8,15 @@ def get_help_keyboard():
     builder.button(text="/contact")
     return builder.as_markup(resize_keyboard=True)
 
-help_keyboard = get_help_keyboard()
\ No newline at end of file
+help_keyboard = get_help_keyboard()
+
+
+def top_page_keyboard(rating_type: str, page: int, pages: int):
+    """Кнопки переключения страниц /top (данные кнопки: top:<тип рейтинга>:<страница>)."""
+    builder = InlineKeyboardBuilder()
+    if page > 0:
+        builder.button(text="⬅️", callback_data=f"top:{rating_type}:{page - 1}")
+    builder.button(text=f"{page + 1}/{pages}", callback_data=f"top:{rating_type}:{page}")
+    if page < pages - 1:
+        builder.button(text="➡️", callback_data=f"top:{rating_type}:{page + 1}")
+    return builder.as_markup()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Optional, Tuple, Callable
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError, TelegramBadRequest
+from core.parser.rate_limit import HostRateLimiter
+from .config import BotConfig
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationQueue:
+    """Очередь исходящих уведомлений с ограничением частоты отправки.
+
+    Уведомления отправляет одна фоновая задача с учетом ограничений Telegram:
+    не больше messages_per_second сообщений в секунду всего и не чаще одного
+    сообщения в chat_interval секунд в один чат. При ответе RetryAfter
+    отправка приостанавливается на указанное время и сообщение повторяется.
+    Если бот заблокирован пользователем, вызывается on_forbidden(chat_id).
+    """
+    GLOBAL_KEY: str = '*'
+
+    def __init__(
+        self,
+        messages_per_second: Optional[float] = None,
+        chat_interval: Optional[float] = None,
+        max_size: Optional[int] = None,
+        on_forbidden: Optional[Callable[[int], None]] = None
+    ):
+        self._global = HostRateLimiter(messages_per_second or BotConfig.NOTIFY_MESSAGES_PER_SECOND)
+        self._chats = HostRateLimiter(1.0 / (chat_interval or BotConfig.NOTIFY_CHAT_INTERVAL))
+        self.max_size = max_size or BotConfig.NOTIFY_QUEUE_SIZE
+        self.on_forbidden = on_forbidden
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._bot: Optional[Bot] = None
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        return self._queue
+
+    def __len__(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self, bot: Bot) -> None:
+        """Запускает фоновую отправку уведомлений."""
+        self._bot = bot
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Очередь уведомлений запущена")
+
+    async def stop(self) -> None:
+        """Останавливает отправку; неотправленные уведомления отбрасываются."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            logger.info(f"Очередь уведомлений остановлена, не отправлено: {len(self)}")
+
+    def put(self, chat_id: int, text: str) -> bool:
+        """Ставит уведомление в очередь. Returns: False, если очередь переполнена."""
+        try:
+            self._get_queue().put_nowait((chat_id, text))
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Очередь уведомлений переполнена, уведомление для чата {chat_id} отброшено")
+            return False
+
+    async def _send(self, item: Tuple[int, str]) -> None:
+        chat_id, text = item
+        while True:
+            await self._global.acquire(self.GLOBAL_KEY)
+            await self._chats.acquire(str(chat_id))
+            try:
+                await self._bot.send_message(chat_id, text)
+                return
+            except TelegramRetryAfter as e:
+                logger.warning(f"Ограничение частоты Telegram, пауза {e.retry_after} с")
+                await asyncio.sleep(e.retry_after)
+            except TelegramForbiddenError:
+                logger.info(f"Бот заблокирован в чате {chat_id}, подписки чата удалены")
+                if self.on_forbidden is not None:
+                    self.on_forbidden(chat_id)
+                return
+            except TelegramBadRequest as e:
+                logger.warning(f"Не удалось отправить уведомление в чат {chat_id}: {str(e)}")
+                return
+
+    async def _run(self) -> None:
+        queue = self._get_queue()
+        while True:
+            item = await queue.get()
+            try:
+                await self._send(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при отправке уведомления: {str(e)}", exc_info=True)
+            finally:
+                queue.task_done()
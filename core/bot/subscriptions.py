@@ -0,0 +1,142 @@
+import json
+import logging
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Optional, List, Dict, Set
+from core.analytics import SnapshotDiff
+from .config import BotConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionStore:
+    """Подписки чатов на изменения мест участников (/subscribe).
+
+    Хранятся в JSON-файле {chat_id: [ники]} и перезаписываются целиком
+    (через временный файл) при каждом изменении. Изменения для подписчиков
+    ищутся одним соединением таблицы подписок со сравнением версий данных
+    (SnapshotDiff), а не отдельным запросом на каждую подписку.
+
+    Подписки меняются командами в цикле событий, а читаются и при поиске
+    изменений в пуле потоков, поэтому доступ к ним защищен блокировкой.
+    """
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or BotConfig.SUBSCRIPTIONS_PATH)
+        self._chats: Dict[int, List[str]] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(map(len, self._chats.values()))
+
+    def load(self) -> None:
+        """Читает подписки с диска."""
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            chats = {int(chat_id): list(names) for chat_id, names in data.items() if names}
+        except FileNotFoundError:
+            chats = {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать подписки: {str(e)}")
+            chats = {}
+        with self._lock:
+            self._chats = chats
+            self._frame = None
+        if chats:
+            logger.info(f"Загружено подписок: {len(self)} (чатов: {len(chats)})")
+
+    def _save(self) -> None:
+        """Сохраняет подписки на диск (вызывается под блокировкой)."""
+        self._frame = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+            tmp_path.write_text(
+                json.dumps({str(chat_id): names for chat_id, names in self._chats.items()}, ensure_ascii=False),
+                encoding='utf-8'
+            )
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить подписки: {str(e)}")
+
+    def for_chat(self, chat_id: int) -> List[str]:
+        with self._lock:
+            return list(self._chats.get(chat_id, []))
+
+    def add(self, chat_id: int, participant: str) -> bool:
+        """Подписывает чат на участника.
+
+        Returns:
+            False, если подписка уже есть
+
+        Raises:
+            ValueError: Если у чата уже максимум подписок
+        """
+        with self._lock:
+            names = self._chats.get(chat_id, [])
+            if participant in names:
+                return False
+            if len(names) >= BotConfig.SUBSCRIPTIONS_PER_CHAT:
+                raise ValueError(f"Можно подписаться не больше чем на {BotConfig.SUBSCRIPTIONS_PER_CHAT} участников")
+            self._chats[chat_id] = [*names, participant]
+            self._save()
+        return True
+
+    def remove(self, chat_id: int, participant: str) -> bool:
+        """Отписывает чат от участника. Returns: False, если подписки не было."""
+        with self._lock:
+            names = self._chats.get(chat_id, [])
+            if participant not in names:
+                return False
+            names = [name for name in names if name != participant]
+            if names:
+                self._chats[chat_id] = names
+            else:
+                del self._chats[chat_id]
+            self._save()
+        return True
+
+    def remove_chat(self, chat_id: int) -> None:
+        """Удаляет все подписки чата (например, если бот заблокирован)."""
+        with self._lock:
+            if self._chats.pop(chat_id, None) is not None:
+                self._save()
+
+    @property
+    def participants(self) -> Set[str]:
+        with self._lock:
+            return {name for names in self._chats.values() for name in names}
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Таблица подписок (chat_id, participant): согласованный снимок на момент вызова."""
+        with self._lock:
+            if self._frame is None:
+                self._frame = pd.DataFrame(
+                    [(chat_id, name) for chat_id, names in self._chats.items() for name in names],
+                    columns=['chat_id', 'participant']
+                )
+            return self._frame
+
+    def changes(self, diff: SnapshotDiff) -> Dict[int, pd.DataFrame]:
+        """Изменения мест участников, на которых подписаны чаты.
+
+        Returns:
+            {chat_id: строки SnapshotDiff.frame с изменившимся местом}
+        """
+        subscriptions = self.frame
+        if subscriptions.empty:
+            return {}
+        frame = diff.frame
+        changed = frame[
+            frame['participant'].isin(subscriptions['participant'])
+            & (frame['rank_before'].fillna(0).to_numpy() != frame['rank_after'].fillna(0).to_numpy())
+        ]
+        if changed.empty:
+            return {}
+        changed = changed.astype({'participant': object, 'rating_type': object})
+        joined = subscriptions.merge(changed, on='participant', how='inner')
+        return {chat_id: rows for chat_id, rows in joined.groupby('chat_id', sort=False)}
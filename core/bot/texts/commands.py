@@ -3,7 +3,16 @@ class CommandTexts:
         "🔄 /update - обновить данные рейтинга\n"
         "📊 /user_by_lang - распределение по языкам\n"
         "🧮 /langcnt_by_user - сколько языков используют участники\n"
+        "🧩 /lang_overlap - сколько участников пишут на парах языков\n"
+        "📐 /score_distr - распределение баллов и процентили по языкам\n"
+        "📅 /activity - активность участников по дням и часам\n"
         "👤 /user_stats <ник> - Показывает статистику по конкретному пользователю\n"
+        "📈 /user_history <ник> [N] - изменение мест и баллов за последние N обновлений\n"
+        "🎯 /threshold <язык> <N> - сколько баллов нужно для топ-N (или /threshold <язык> <S> баллов)\n"
+        "🏆 /top [язык] [страница] - таблица лидеров\n"
+        "🚀 /movers [язык] - кто поднялся выше всех с прошлого обновления\n"
+        "🔔 /subscribe <ник> - уведомления об изменении мест участника\n"
+        "🔕 /unsubscribe <ник> - отписаться от уведомлений\n"
         "🆘 /help - подробная справка по командам"
     )
 
@@ -32,4 +32,26 @@ def format_date(dt) -> str:
             return f"Неподдерживаемый тип даты: {type(dt)}"
             
     except Exception as e:
-        return f"Ошибка форматирования: {str(e)}"
\ No newline at end of file
+        return f"Ошибка форматирования: {str(e)}"
+
+def format_age(seconds) -> str:
+    """Форматирует возраст данных в секундах в строку вида "5 мин назад".
+    
+    Args:
+        seconds: Возраст в секундах или None, если данных нет
+        
+    Returns:
+        Строка с возрастом данных
+    """
+    if seconds is None:
+        return "нет данных"
+
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "только что"
+    if minutes < 60:
+        return f"{minutes} мин назад"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours} ч {minutes} мин назад" if minutes else f"{hours} ч назад"
+    return f"{hours // 24} дн назад"
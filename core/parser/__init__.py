@@ -1,2 +1,6 @@
 from . import exceptions
-from .scrapers import CodeRunRatingScraper
\ No newline at end of file
+from .scrapers import CodeRunRatingScraper
+from .store import RatingStore
+from .snapshot import DatasetSnapshot
+from .scheduler import RefreshScheduler
+from .history import RatingHistory
\ No newline at end of file
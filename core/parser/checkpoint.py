@@ -0,0 +1,101 @@
+import json
+import pickle
+import shutil
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Set, Tuple
+from .config import ParserConfig
+
+logger = logging.getLogger(__name__)
+
+# Разобранная страница: строки, флаг 0 баллов, общее количество страниц
+ParsedPage = Tuple[List[Dict[str, Any]], bool, int]
+
+
+class ScrapeCheckpoint:
+    """Контрольные точки сбора данных на диске.
+
+    Каждая разобранная страница сохраняется в отдельный файл
+    <тип рейтинга>_<страница>.pkl сразу после загрузки. Если сбор прервался
+    (ошибка или перезапуск бота), следующий сбор, начатый не позднее max_age
+    секунд после начала прерванного, берет уже загруженные страницы с диска.
+    После успешного обновления данных контрольные точки удаляются.
+    """
+    RUN_FILE: str = 'run.json'
+
+    def __init__(self, directory: Optional[Path] = None, max_age: Optional[float] = None):
+        self.directory = Path(directory or ParserConfig.CHECKPOINT_DIR)
+        self.max_age = max_age if max_age is not None else ParserConfig.CHECKPOINT_MAX_AGE
+        self._keys: Set[Tuple[str, int]] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _path(self, rating_type: str, page: int) -> Path:
+        return self.directory / f"{rating_type}_{page}.pkl"
+
+    def _run_started(self) -> Optional[datetime]:
+        try:
+            run = json.loads((self.directory / self.RUN_FILE).read_text(encoding='utf-8'))
+            return datetime.fromisoformat(run['started_at'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def begin(self) -> int:
+        """Начинает сбор: продолжает недавний прерванный сбор или начинает новый.
+
+        Returns:
+            Количество страниц, восстановленных из контрольных точек
+        """
+        started = self._run_started()
+        if started is not None and (datetime.now() - started).total_seconds() < self.max_age:
+            keys = set()
+            for path in self.directory.glob('*.pkl'):
+                rating_type, _, page = path.stem.rpartition('_')
+                if rating_type and page.isdigit():
+                    keys.add((rating_type, int(page)))
+            self._keys = keys
+            if keys:
+                logger.info(f"Продолжение прерванного сбора от {started:%H:%M:%S}: "
+                            f"восстановлено страниц: {len(keys)}")
+            return len(keys)
+
+        self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / self.RUN_FILE).write_text(
+            json.dumps({'started_at': datetime.now().isoformat()}), encoding='utf-8'
+        )
+        return 0
+
+    def __contains__(self, key: Tuple[str, int]) -> bool:
+        return key in self._keys
+
+    def get(self, rating_type: str, page: int) -> Optional[ParsedPage]:
+        """Возвращает сохраненную страницу или None."""
+        if (rating_type, page) not in self._keys:
+            return None
+        try:
+            with open(self._path(rating_type, page), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Не удалось прочитать контрольную точку {rating_type}/{page}: {str(e)}")
+            self._keys.discard((rating_type, page))
+            return None
+
+    def put(self, rating_type: str, page: int, parsed: ParsedPage) -> None:
+        """Сохраняет разобранную страницу (через временный файл)."""
+        path = self._path(rating_type, page)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(parsed, file, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(path)
+            self._keys.add((rating_type, page))
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить контрольную точку {rating_type}/{page}: {str(e)}")
+
+    def clear(self) -> None:
+        """Удаляет все контрольные точки."""
+        self._keys = set()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -7,7 +7,50 @@ class ParserConfig:
     REQUEST_TIMEOUT: int = 10
     DELAY_BETWEEN_REQUESTS: float = 0.5
     MAX_RETRIES: int = 3
+    RETRY_BASE_DELAY: float = 0.5  # Базовая пауза экспоненциальной задержки (сек)
+    RETRY_MAX_DELAY: float = 30  # Максимальная пауза между повторами (сек)
+    RETRY_AFTER_MAX: float = 120  # Максимальная пауза по заголовку Retry-After (сек)
+    CIRCUIT_BREAKER_THRESHOLD: int = 5  # Ошибок подряд, после которых хост считается недоступным
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30  # Пауза перед новой попыткой обращения к хосту (сек)
+    PARTIAL_UPDATE: bool = True  # При ошибке сбора типа рейтинга оставлять его прежние данные
+
+    CONCURRENT_UPDATE: bool = True
+    MAX_CONCURRENT_REQUESTS: int = 6
+    REQUESTS_PER_SECOND_PER_HOST: float = 5.0
+
+    PARSER_BACKEND: str = 'stream'  # 'stream', 'lxml' или 'bs4'
+    PARSE_EXECUTOR: str = 'process'  # 'process', 'thread' или None (в цикле событий)
+    PARSE_WORKERS: int = 2
+
+    INCREMENTAL_UPDATE: bool = True
+    INCREMENTAL_UNCHANGED_PAGES: int = 3  # Сколько неизменных страниц подряд завершают сбор
+    INCREMENTAL_FULL_REFRESH_INTERVAL: int = 60 * 60  # Полное обновление не реже раза в час (сек)
+
+    MIN_UPDATE_INTERVAL: float = 60  # Не собирать данные чаще раза в минуту (сек), 0 - без ограничения
+    REFRESH_INTERVAL: float = 15 * 60  # Период фонового обновления (сек)
+    REFRESH_JITTER: float = 60  # Случайная добавка к периоду, чтобы не попадать в такт с другими клиентами (сек)
     
+    CONNECTION_LIMIT: int = MAX_CONCURRENT_REQUESTS * 2  # Всего соединений в пуле
+    CONNECTION_LIMIT_PER_HOST: int = MAX_CONCURRENT_REQUESTS
+    KEEPALIVE_TIMEOUT: float = 30  # Сколько держать простаивающее соединение открытым (сек)
+    DNS_CACHE_TTL: int = 5 * 60  # Время жизни кэша DNS (сек)
+
+    HTTP_CACHE_ENABLED: bool = True  # Условные запросы по ETag/Last-Modified
+    HTTP_CACHE_DIR = MainConfig.STORAGE_DIR / "http_cache"
+
+    CHECKPOINT_ENABLED: bool = True  # Сохранять загруженные страницы для продолжения прерванного сбора
+    CHECKPOINT_DIR = MainConfig.STORAGE_DIR / "checkpoints"
+    CHECKPOINT_MAX_AGE: float = 30 * 60  # Продолжать прерванный сбор, если он начат не раньше (сек)
+
+    STREAMING_UPDATE: bool = False  # Записывать страницы на диск по мере сбора (ограничивает память)
+    SPOOL_DIR = MainConfig.STORAGE_DIR / "spool"
+    SPOOL_BATCH_ROWS: int = 5000  # Строк в одном батче файла потоковой записи
+
+    HISTORY_DIR = MainConfig.STORAGE_DIR / "history"
+    HISTORY_COMPRESSION: str = 'zstd'  # Сжатие файлов изменений истории
+    HISTORY_ROW_GROUP_SIZE: int = 4096  # Строк в группе: меньше - быстрее чтение одного участника
+    HISTORY_KEYFRAME_INTERVAL: int = 48  # Каждый N-й снимок истории записывается полностью
+
     HEADERS: Dict[str, str] = {
         "User-Agent": "CodeRun_stat_bot"
             "(+https://github.com/LeonidMitrofanov/YandexCodeRun_bot)"
@@ -16,7 +59,7 @@ class ParserConfig:
     INCLUDE_GENERAL: bool = MainConfig.INCLUDE_GENERAL
     DEFAULT_LANGUAGES: List[str] = MainConfig.LANGUAGES
     
-    DEFAULT_FILE_FORMAT: str = 'csv'  # 'csv' или 'excel'
+    DEFAULT_FILE_FORMAT: str = 'csv'  # 'csv', 'excel', 'feather' или 'parquet'
     DEFAULT_FILENAME: str = 'yandex_coderun_rating'
     
     TIME_ZONE: str = 'Europe/Moscow'
@@ -3,12 +3,6 @@ class ScraperError(Exception):
     pass
 
 
-class UpdateInProgressError(ScraperError):
-    """Ошибка при попытке запустить обновление во время выполнения другого обновления"""
-    def __init__(self):
-        super().__init__("Обновление уже выполняется, пожалуйста подождите")
-
-
 class DataCollectionError(ScraperError):
     """Ошибка при сборе данных"""
     def __init__(self, language: str = None, message: str = None):
@@ -40,4 +34,11 @@ class EmptyDataError(ScraperError):
 class NetworkError(ScraperError):
     """Ошибка сетевого взаимодействия"""
     def __init__(self, message: str = "Ошибка сети"):
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class CircuitOpenError(NetworkError):
+    """Ошибка при обращении к хосту, временно признанному недоступным"""
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Хост {host} временно недоступен, повтор через {retry_in:.0f} с")
@@ -0,0 +1,334 @@
+import json
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+from .config import ParserConfig
+from .store import RatingStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as parquet
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+
+class RatingHistory:
+    """История обновлений рейтинга с дельта-кодированием.
+
+    Каждое обновление - снимок с номером версии и временем. На диске
+    хранятся только строки (участник, тип рейтинга), изменившиеся с
+    предыдущего снимка:
+    - delta_<версия>.parquet - изменения, отсортированные по id участника
+      и сжатые zstd; сортировка позволяет читать строки одного участника,
+      пропуская остальные группы строк. Строка бывает трех видов:
+        полная  - изменились баллы, задачи или дата (или строка новая):
+                  записаны все значения;
+        сдвиг   - изменилось только место (участника обогнали или он обогнал
+                  других): записана только разница мест rank_shift;
+        removed - участник выбыл из рейтинга;
+    - participants.txt - ники участников, номер строки - id участника;
+    - head.arrow - полное текущее состояние, с ним сравнивается новый снимок;
+    - manifest.json - список снимков.
+
+    Каждый keyframe_interval-й снимок записывается полностью, поэтому
+    траектория участника читает не больше keyframe_interval снимков до начала
+    запрошенного окна. Файлы отсортированы по (участник, тип рейтинга), и
+    статистика min/max id в метаданных групп строк служит разреженным
+    индексом: из каждого снимка читается одна группа строк участника.
+    """
+    MANIFEST_FILE: str = 'manifest.json'
+    PARTICIPANTS_FILE: str = 'participants.txt'
+    HEAD_FILE: str = 'head.arrow'
+    KEYS: List[str] = ['participant', 'rating_type']
+    VALUES: List[str] = ['points', 'tasks', 'date']
+    FOOTER_CACHE_SIZE: int = 512  # Сколько метаданных файлов изменений держать в памяти
+
+    def __init__(self, directory: Optional[Path] = None, keyframe_interval: Optional[int] = None):
+        if pa is None:
+            raise ImportError("Для истории обновлений необходимо установить пакет pyarrow")
+        self.directory = Path(directory or ParserConfig.HISTORY_DIR)
+        self.keyframe_interval = keyframe_interval or ParserConfig.HISTORY_KEYFRAME_INTERVAL
+        self.schema = pa.schema([
+            ('participant', pa.int32()),
+            ('rating_type', pa.string()),
+            ('rank', pa.int32()),
+            ('rank_shift', pa.int32()),
+            ('points', pa.float32()),
+            ('tasks', pa.int16()),
+            ('date', pa.timestamp('us', tz=ParserConfig.TIME_ZONE)),
+            ('removed', pa.bool_()),
+        ])
+        self._lock = threading.Lock()
+        self._manifest: Optional[List[Dict[str, Any]]] = None
+        self._participants: Optional[pd.Index] = None
+        self._footers: OrderedDict = OrderedDict()
+
+    def _delta_path(self, version: int) -> Path:
+        return self.directory / f"delta_{version:06d}.parquet"
+
+    def _load_manifest(self) -> List[Dict[str, Any]]:
+        if self._manifest is None:
+            try:
+                self._manifest = json.loads((self.directory / self.MANIFEST_FILE).read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                self._manifest = []
+        return self._manifest
+
+    def _write_manifest(self, manifest: List[Dict[str, Any]]) -> None:
+        path = self.directory / self.MANIFEST_FILE
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(path)
+
+    def _load_participants(self) -> pd.Index:
+        if self._participants is None:
+            try:
+                names = (self.directory / self.PARTICIPANTS_FILE).read_text(encoding='utf-8').split('\n')[:-1]
+            except FileNotFoundError:
+                names = []
+            self._participants = pd.Index(names, dtype=object)
+        return self._participants
+
+    def _participant_ids(self, names: pd.Index) -> np.ndarray:
+        """id участников; новые ники дописываются в participants.txt."""
+        participants = self._load_participants()
+        ids = participants.get_indexer(names)
+        new = names[ids < 0]
+        if len(new):
+            with open(self.directory / self.PARTICIPANTS_FILE, 'a', encoding='utf-8') as file:
+                file.write(''.join(f"{name}\n" for name in new))
+            ids[ids < 0] = np.arange(len(participants), len(participants) + len(new))
+            self._participants = participants.append(pd.Index(new, dtype=object))
+        return ids.astype(np.int32)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_manifest())
+
+    @property
+    def snapshots(self) -> List[Tuple[int, datetime]]:
+        """Версии и время снимков в порядке добавления."""
+        with self._lock:
+            return [(entry['version'], datetime.fromisoformat(entry['timestamp']))
+                    for entry in self._load_manifest()]
+
+    def size_bytes(self) -> int:
+        """Объем истории на диске в байтах."""
+        return sum(path.stat().st_size for path in self.directory.glob('*') if path.is_file())
+
+    def _plain(self, store: RatingStore) -> pd.DataFrame:
+        """Строки хранилища с id участника и типом рейтинга в виде строки."""
+        frame = store.frame
+        participant = frame['participant'].cat
+        ids = self._participant_ids(participant.categories)
+        return pd.DataFrame({
+            'participant': ids[participant.codes.to_numpy()],
+            'rating_type': np.asarray(frame['rating_type'], dtype=object),
+            'rank': frame['rank'].array,
+            'points': frame['points'].to_numpy(),
+            'tasks': frame['tasks'].astype('Int16').array,
+            'date': frame['date'].dt.as_unit('us').array,
+        })
+
+    @classmethod
+    def _delta(cls, previous: Optional[pd.DataFrame], current: pd.DataFrame) -> pd.DataFrame:
+        """Изменения current относительно previous (None - полный снимок)."""
+        if previous is None:
+            return current.assign(rank_shift=pd.array([pd.NA] * len(current), dtype='Int32'), removed=False)
+
+        merged = current.merge(previous, on=cls.KEYS, how='outer', suffixes=('', '_prev'), indicator=True)
+        state = merged.pop('_merge')
+        both = (state == 'both').to_numpy()
+        removed = (state == 'right_only').to_numpy()
+
+        def differs(column: str) -> np.ndarray:
+            new, old = merged[column], merged[f'{column}_prev']
+            return (new.ne(old) & ~(new.isna() & old.isna())).fillna(True).to_numpy(dtype=bool) & both
+
+        rank_changed = differs('rank')
+        values_changed = (state == 'left_only').to_numpy().copy()
+        for column in cls.VALUES:
+            values_changed |= differs(column)
+        # Переход места в NA или из NA записывается полной строкой
+        values_changed |= rank_changed & (merged['rank'].isna() | merged['rank_prev'].isna()).to_numpy()
+        shifted = rank_changed & ~values_changed
+
+        selected = values_changed | shifted | removed
+        delta = merged.loc[selected, cls.KEYS + ['rank'] + cls.VALUES].copy()
+        is_shift = shifted[selected]
+        delta['rank_shift'] = (merged['rank'] - merged['rank_prev'])[selected]
+        delta.loc[~is_shift, 'rank_shift'] = pd.NA
+        for column in ['rank', *cls.VALUES]:
+            delta.loc[is_shift, column] = None
+        delta['removed'] = removed[selected]
+        return delta
+
+    def _read_head(self, version: int) -> Optional[pd.DataFrame]:
+        """Текущее состояние, если оно соответствует последней версии манифеста."""
+        path = self.directory / self.HEAD_FILE
+        try:
+            store, metadata = RatingStore.read_snapshot(path)
+        except FileNotFoundError:
+            return None
+        if metadata.get('version') != str(version):
+            logger.warning(f"Состояние истории не соответствует версии {version}, "
+                           f"следующий снимок будет записан полностью")
+            return None
+        return self._plain(store)
+
+    def append(self, store: RatingStore, timestamp: Optional[datetime] = None) -> Optional[int]:
+        """Добавляет снимок; записываются только изменения.
+
+        Returns:
+            Номер версии снимка или None, если данные не изменились
+        """
+        if store.empty:
+            raise ValueError("Нельзя добавить в историю пустые данные")
+        timestamp = timestamp or datetime.now()
+
+        with self._lock:
+            manifest = list(self._load_manifest())
+            if manifest and manifest[-1]['fingerprint'] == store.fingerprint:
+                logger.info("Данные не изменились с последнего снимка истории")
+                return None
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            version = manifest[-1]['version'] + 1 if manifest else 1
+            since_keyframe = next(
+                (i for i, entry in enumerate(reversed(manifest)) if entry['full']), len(manifest)
+            ) + 1
+            previous = None
+            if manifest and since_keyframe < self.keyframe_interval:
+                previous = self._read_head(manifest[-1]['version'])
+            current = self._plain(store)
+            delta = self._delta(previous, current).sort_values(self.KEYS, ignore_index=True)
+
+            path = self._delta_path(version)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            table = pa.Table.from_pandas(delta, schema=self.schema, preserve_index=False)
+            parquet.write_table(
+                table, tmp_path,
+                compression=ParserConfig.HISTORY_COMPRESSION,
+                row_group_size=ParserConfig.HISTORY_ROW_GROUP_SIZE,
+                use_dictionary=['rating_type']
+            )
+            tmp_path.replace(path)
+            store.write_snapshot(self.directory / self.HEAD_FILE, metadata={'version': str(version)})
+
+            shifted = int(delta['rank_shift'].notna().sum())
+            manifest.append({
+                'version': version,
+                'timestamp': timestamp.isoformat(),
+                'fingerprint': store.fingerprint,
+                'full': previous is None,
+                'rows': len(delta),
+                'shifted': shifted,
+                'removed': int(delta['removed'].sum()),
+            })
+            self._write_manifest(manifest)
+            self._manifest = manifest
+
+        logger.info(f"Снимок истории {version}{' (полный)' if previous is None else ''}: "
+                    f"записано строк {len(delta)} из {len(current)}, из них сдвигов мест {shifted} "
+                    f"({path.stat().st_size / 1024:.1f} КБ)")
+        return version
+
+    def _footer(self, version: int) -> Tuple[Any, np.ndarray, np.ndarray]:
+        """Метаданные файла изменений и границы id участников в его группах строк."""
+        with self._lock:
+            footer = self._footers.get(version)
+            if footer is not None:
+                self._footers.move_to_end(version)
+                return footer
+        metadata = parquet.read_metadata(self._delta_path(version))
+        bounds = []
+        for group in range(metadata.num_row_groups):
+            stat = metadata.row_group(group).column(0).statistics
+            # Без статистики группа читается при любом запросе
+            bounds.append((stat.min, stat.max) if stat is not None and stat.has_min_max
+                          else (np.iinfo(np.int32).min, np.iinfo(np.int32).max))
+        bounds = np.array(bounds, dtype=np.int64).reshape(-1, 2)
+        footer = (metadata, bounds[:, 0], bounds[:, 1])
+        with self._lock:
+            self._footers[version] = footer
+            if len(self._footers) > self.FOOTER_CACHE_SIZE:
+                self._footers.popitem(last=False)
+        return footer
+
+    def _read_participant(self, version: int, participant_id: int) -> List[Dict[str, Any]]:
+        """Изменения участника в снимке: читаются только группы строк с его id."""
+        metadata, mins, maxs = self._footer(version)
+        first = int(np.searchsorted(maxs, participant_id))
+        last = first
+        while last < len(mins) and mins[last] <= participant_id:
+            last += 1
+        if first == last:
+            return []
+        table = parquet.ParquetFile(self._delta_path(version), metadata=metadata).read_row_groups(
+            range(first, last), columns=['participant', 'rating_type', 'rank', 'rank_shift', 'points', 'removed']
+        )
+        return table.filter(pc.equal(table['participant'], participant_id)).to_pylist()
+
+    def trajectory(self, participant: str, last: Optional[int] = None) -> pd.DataFrame:
+        """Места и баллы участника по снимкам истории.
+
+        Читаются снимки окна и снимки от последнего полного до начала окна
+        (не больше keyframe_interval), из каждого - только группы строк участника.
+
+        Args:
+            participant: Ник участника
+            last: Количество последних снимков (по умолчанию все)
+
+        Returns:
+            DataFrame с колонками version, timestamp, rating_type, rank, points:
+            строка на каждый снимок и тип рейтинга, в котором участник присутствовал
+        """
+        columns = ['version', 'timestamp', 'rating_type', 'rank', 'points']
+        with self._lock:
+            manifest = list(self._load_manifest())
+            participant_id = self._load_participants().get_indexer([participant])[0]
+        if participant_id < 0 or not manifest:
+            return pd.DataFrame(columns=columns)
+
+        first = len(manifest) - min(last or len(manifest), len(manifest))
+        start = max(position for position in range(first + 1) if manifest[position]['full'])
+
+        state: Dict[str, List[Any]] = {}
+        rows = []
+        for position, entry in enumerate(manifest[start:], start=start):
+            if entry['full']:
+                state = {}
+            for row in self._read_participant(entry['version'], participant_id):
+                rating_type = row['rating_type']
+                if row['removed']:
+                    state.pop(rating_type, None)
+                elif row['rank_shift'] is not None:
+                    if rating_type in state:
+                        state[rating_type][0] += row['rank_shift']
+                else:
+                    state[rating_type] = [row['rank'], row['points']]
+            if position >= first:
+                timestamp = datetime.fromisoformat(entry['timestamp'])
+                rows.extend(
+                    (entry['version'], timestamp, rating_type, rank, points)
+                    for rating_type, (rank, points) in state.items()
+                )
+        return pd.DataFrame(rows, columns=columns)
+
+    def clear(self) -> None:
+        """Удаляет всю историю."""
+        with self._lock:
+            for path in self.directory.glob('*'):
+                if path.is_file():
+                    path.unlink()
+            self._manifest = []
+            self._participants = pd.Index([], dtype=object)
+            self._footers.clear()
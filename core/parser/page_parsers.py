@@ -0,0 +1,329 @@
+import pytz
+import logging
+import pandas as pd
+from bs4 import BeautifulSoup
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Optional, List, Dict, Any, Tuple, Type
+from .config import ParserConfig
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+# Сырая строка таблицы: место, участник, задачи, баллы,
+# атрибут datetime тега <time> (None, если тега нет) и текст ячейки даты
+RawRow = Tuple[str, str, str, str, Optional[str], str]
+
+
+class PageParser:
+    """Базовый класс бэкенда разбора страницы рейтинга.
+
+    Бэкенд только извлекает сырые строки таблицы и тексты ссылок пагинации,
+    а преобразование в записи выполняется общим кодом (parse_page),
+    поэтому все бэкенды возвращают одинаковые записи.
+    """
+    name: str = ''
+    TABLE_CLASS: str = 'RatingTable_rating-table__ixEUi'
+    PAGINATION_CLASS: str = 'Pagination-Pages'
+    PAGINATION_ITEM_CLASS: str = 'Pagination-PagesItem'
+    CELL_CLASS: str = 'Cell'
+
+    def extract(self, html: str) -> Tuple[Optional[List[RawRow]], List[str]]:
+        """Возвращает строки таблицы (None, если таблица не найдена)
+        и тексты ссылок пагинации."""
+        raise NotImplementedError
+
+
+class SoupPageParser(PageParser):
+    """Эталонный бэкенд на BeautifulSoup с html.parser."""
+    name = 'bs4'
+
+    def extract(self, html: str) -> Tuple[Optional[List[RawRow]], List[str]]:
+        soup = BeautifulSoup(html, 'html.parser')
+
+        page_links = []
+        pagination = soup.find('div', class_=self.PAGINATION_CLASS)
+        if pagination:
+            page_links = [link.text for link in pagination.find_all('a', class_=self.PAGINATION_ITEM_CLASS)]
+
+        table = soup.find('table', class_=self.TABLE_CLASS)
+        if not table:
+            return None, page_links
+
+        rows = []
+        for row in table.select('tbody tr[role="row"]'):
+            cells = row.find_all(['td', 'th'], class_=self.CELL_CLASS)
+            if len(cells) < 5:
+                continue
+            time_tag = cells[4].find('time')
+            rows.append((
+                cells[0].get_text(strip=True),
+                cells[1].get_text(strip=True),
+                cells[2].get_text(strip=True),
+                cells[3].get_text(strip=True),
+                time_tag['datetime'] if time_tag else None,
+                cells[4].get_text(strip=True)
+            ))
+        return rows, page_links
+
+
+class _RatingTableExtractor(HTMLParser):
+    """Потоковый разбор HTML: материализует только строки таблицы рейтинга
+    и ссылки пагинации, остальная разметка пропускается."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows: Optional[List[RawRow]] = None
+        self.page_links: List[str] = []
+        self._text: List[str] = []
+        # Таблица рейтинга
+        self._table_depth = 0
+        self._table_done = False
+        self._tbody_depth = 0
+        self._row: Optional[List[List[str]]] = None
+        self._row_time: Optional[str] = None
+        self._row_depth = 0
+        self._cell: Optional[List[str]] = None
+        self._cell_depth = 0
+        self._cell_time: Optional[str] = None
+        # Пагинация
+        self._pagination_depth = 0
+        self._pagination_done = False
+        self._link: Optional[List[str]] = None
+        self._link_depth = 0
+
+    @staticmethod
+    def _has_class(attrs: List[Tuple[str, Optional[str]]], class_name: str) -> bool:
+        for key, value in attrs:
+            if key == 'class' and value and class_name in value.split():
+                return True
+        return False
+
+    def _flush_text(self) -> None:
+        if not self._text:
+            return
+        text = ''.join(self._text)
+        self._text = []
+        if self._link is not None:
+            self._link.append(text)
+        if self._cell is not None:
+            stripped = text.strip()
+            if stripped:
+                self._cell.append(stripped)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+
+        if tag == 'div':
+            if self._pagination_depth:
+                self._pagination_depth += 1
+            elif not self._pagination_done and self._has_class(attrs, PageParser.PAGINATION_CLASS):
+                self._pagination_depth = 1
+        elif tag == 'a' and self._pagination_depth:
+            if self._link is not None:
+                self._link_depth += 1
+            elif self._has_class(attrs, PageParser.PAGINATION_ITEM_CLASS):
+                self._link = []
+                self._link_depth = 1
+
+        if tag == 'table':
+            if self._table_depth:
+                self._table_depth += 1
+            elif not self._table_done and self._has_class(attrs, PageParser.TABLE_CLASS):
+                self._table_depth = 1
+                self.rows = []
+            return
+        if not self._table_depth:
+            return
+
+        if tag == 'tbody':
+            self._tbody_depth += 1
+        elif tag == 'tr':
+            if self._row is not None:
+                self._row_depth += 1
+            elif self._tbody_depth and ('role', 'row') in attrs:
+                self._row = []
+                self._row_depth = 1
+        elif tag in ('td', 'th') and self._row is not None:
+            if self._cell is not None:
+                self._cell_depth += 1
+            elif self._has_class(attrs, PageParser.CELL_CLASS):
+                self._cell = []
+                self._cell_depth = 1
+                self._cell_time = None
+        elif tag == 'time' and self._cell is not None and self._cell_time is None:
+            self._cell_time = dict(attrs).get('datetime', '')
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+
+        if tag == 'div' and self._pagination_depth:
+            self._pagination_depth -= 1
+            if not self._pagination_depth:
+                self._pagination_done = True
+        elif tag == 'a' and self._link is not None:
+            self._link_depth -= 1
+            if not self._link_depth:
+                self.page_links.append(''.join(self._link))
+                self._link = None
+
+        if not self._table_depth:
+            return
+        if tag == 'table':
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._table_done = True
+        elif tag == 'tbody' and self._tbody_depth:
+            self._tbody_depth -= 1
+        elif tag in ('td', 'th') and self._cell is not None:
+            self._cell_depth -= 1
+            if not self._cell_depth:
+                self._row.append(self._cell)
+                if len(self._row) == 5:
+                    self._row_time = self._cell_time
+                self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self._row_depth -= 1
+            if not self._row_depth:
+                cells = [''.join(cell) for cell in self._row]
+                if len(cells) >= 5:
+                    self.rows.append((cells[0], cells[1], cells[2], cells[3], self._row_time, cells[4]))
+                self._row = None
+                self._row_time = None
+
+    def handle_data(self, data):
+        if self._link is not None or self._cell is not None:
+            self._text.append(data)
+
+
+class StreamPageParser(PageParser):
+    """Потоковый бэкенд на html.parser из стандартной библиотеки без построения дерева."""
+    name = 'stream'
+
+    def extract(self, html: str) -> Tuple[Optional[List[RawRow]], List[str]]:
+        extractor = _RatingTableExtractor()
+        extractor.feed(html)
+        extractor.close()
+        return extractor.rows, extractor.page_links
+
+
+class LxmlPageParser(PageParser):
+    """Бэкенд на lxml (требует установленного пакета lxml)."""
+    name = 'lxml'
+
+    @staticmethod
+    def _class_xpath(class_name: str) -> str:
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+    def __init__(self):
+        if lxml is None:
+            raise ImportError("Для бэкенда 'lxml' необходимо установить пакет lxml")
+        self._pagination_xpath = f"(//div[{self._class_xpath(self.PAGINATION_CLASS)}])[1]"
+        self._links_xpath = f".//a[{self._class_xpath(self.PAGINATION_ITEM_CLASS)}]"
+        self._table_xpath = f"(//table[{self._class_xpath(self.TABLE_CLASS)}])[1]"
+        self._cells_xpath = f".//*[self::td or self::th][{self._class_xpath(self.CELL_CLASS)}]"
+
+    @staticmethod
+    def _text(element, strip: bool = True) -> str:
+        if strip:
+            return ''.join(text.strip() for text in element.xpath('.//text()'))
+        return ''.join(element.xpath('.//text()'))
+
+    def extract(self, html: str) -> Tuple[Optional[List[RawRow]], List[str]]:
+        root = lxml.html.fromstring(html)
+
+        page_links = []
+        for pagination in root.xpath(self._pagination_xpath):
+            page_links = [self._text(link, strip=False) for link in pagination.xpath(self._links_xpath)]
+
+        tables = root.xpath(self._table_xpath)
+        if not tables:
+            return None, page_links
+
+        rows = []
+        for row in tables[0].xpath('.//tbody//tr[@role="row"]'):
+            cells = row.xpath(self._cells_xpath)
+            if len(cells) < 5:
+                continue
+            time_tags = cells[4].xpath('.//time')
+            rows.append((
+                self._text(cells[0]),
+                self._text(cells[1]),
+                self._text(cells[2]),
+                self._text(cells[3]),
+                time_tags[0].attrib['datetime'] if time_tags else None,
+                self._text(cells[4])
+            ))
+        return rows, page_links
+
+
+PAGE_PARSERS: Dict[str, Type[PageParser]] = {
+    parser.name: parser for parser in (SoupPageParser, StreamPageParser, LxmlPageParser)
+}
+_parser_instances: Dict[str, PageParser] = {}
+
+
+def get_page_parser(name: str) -> PageParser:
+    """Возвращает экземпляр бэкенда разбора по имени."""
+    if name not in PAGE_PARSERS:
+        raise ValueError(f"Неизвестный бэкенд разбора страниц: {name}")
+    if name not in _parser_instances:
+        _parser_instances[name] = PAGE_PARSERS[name]()
+    return _parser_instances[name]
+
+
+def get_total_pages(page_links: List[str]) -> int:
+    """Определяет общее количество страниц с рейтингом по ссылкам пагинации."""
+    if page_links:
+        return max(int(text) for text in page_links if text.isdigit())
+    return 1
+
+
+def build_records(raw_rows: List[RawRow], rating_type: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """Преобразует сырые строки таблицы в записи + флаг обнаружения 0 баллов.
+    Применяется одинаково как к языкам, так и к общему зачету."""
+    data = []
+    found_zero = False
+
+    for rank, user, tasks, points_text, time_attr, date_str in raw_rows:
+        try:
+            points_value = float(points_text.replace(',', '.'))
+            if points_value == 0:
+                found_zero = True
+                logger.debug(f"Найден участник с 0 баллов: {user}")
+        except ValueError:
+            points_value = 0.0
+
+        if time_attr is not None:
+            dt = datetime.fromisoformat(time_attr)
+            dt = dt.astimezone(pytz.timezone(ParserConfig.TIME_ZONE))
+            date = dt
+        else:
+            date = pd.to_datetime(date_str, errors='coerce') or pd.NaT
+
+        data.append({
+            'Участник': user,
+            'Задачи': int(tasks) if tasks.isdigit() else 0,
+            f'Место_{rating_type}': rank,
+            f'Баллы_{rating_type}': points_value,
+            'Дата': date
+        })
+        if found_zero:
+            break
+    logger.debug(f"Обработано {len(data)} строк для {rating_type}")
+    return data, found_zero
+
+
+def parse_page(html: str, rating_type: str, backend: str) -> Tuple[List[Dict[str, Any]], bool, int]:
+    """Разбирает HTML страницы: строки рейтинга, флаг 0 баллов и число страниц."""
+    raw_rows, page_links = get_page_parser(backend).extract(html)
+    if raw_rows is None:
+        logger.warning(f"Не найдена таблица рейтинга для {rating_type}")
+        page_data, found_zero = [], False
+    else:
+        page_data, found_zero = build_records(raw_rows, rating_type)
+    return page_data, found_zero, get_total_pages(page_links)
@@ -0,0 +1,25 @@
+import asyncio
+from typing import Dict
+
+
+class HostRateLimiter:
+    """Ограничивает частоту запросов к каждому хосту.
+
+    Каждый вызов acquire резервирует ближайший свободный слот для хоста,
+    поэтому конкурентные запросы к одному хосту равномерно распределяются
+    во времени, а запросы к разным хостам не мешают друг другу.
+    """
+    def __init__(self, requests_per_second: float):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second должен быть больше нуля")
+        self.min_interval = 1.0 / requests_per_second
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, host: str) -> None:
+        """Ожидает, пока для хоста не освободится слот на запрос."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
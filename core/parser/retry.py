@@ -0,0 +1,112 @@
+import time
+import random
+import asyncio
+import logging
+import aiohttp
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict
+from .config import ParserConfig
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Политика повторных запросов.
+
+    - экспоненциальная задержка с полным разбросом (full jitter):
+      случайная пауза от 0 до min(max_delay, base_delay * 2^попытка);
+    - при ответах 429/503 учитывается заголовок Retry-After
+      (не больше retry_after_max секунд);
+    - постоянные ошибки (4xx, кроме 408/425/429) не повторяются.
+    """
+    RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+    RETRY_AFTER_STATUSES = frozenset({429, 503})
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        retry_after_max: Optional[float] = None
+    ):
+        self.max_retries = max_retries or ParserConfig.MAX_RETRIES
+        self.base_delay = base_delay if base_delay is not None else ParserConfig.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else ParserConfig.RETRY_MAX_DELAY
+        self.retry_after_max = retry_after_max if retry_after_max is not None \
+                                else ParserConfig.RETRY_AFTER_MAX
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Можно ли повторить запрос после ошибки."""
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in self.RETRYABLE_STATUSES
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError))
+
+    def retry_after(self, error: BaseException) -> Optional[float]:
+        """Задержка из заголовка Retry-After (секунды или HTTP-дата), если он есть."""
+        if not isinstance(error, aiohttp.ClientResponseError) \
+                or error.status not in self.RETRY_AFTER_STATUSES or not error.headers:
+            return None
+        value = error.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                moment = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            seconds = (moment - datetime.now(timezone.utc)).total_seconds()
+        return min(max(seconds, 0.0), self.retry_after_max)
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Пауза перед повтором номер attempt + 1 (attempt начинается с 0)."""
+        retry_after = self.retry_after(error) if error is not None else None
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Автомат защиты для каждого хоста.
+
+    После failure_threshold временных ошибок подряд хост считается недоступным:
+    запросы к нему сразу завершаются CircuitOpenError в течение reset_timeout
+    секунд. Затем запросы снова пропускаются; первая же ошибка снова
+    размыкает автомат, успешный ответ сбрасывает счетчик.
+    """
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.failure_threshold = failure_threshold or ParserConfig.CIRCUIT_BREAKER_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None \
+                                else ParserConfig.CIRCUIT_BREAKER_RESET_TIMEOUT
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+
+    def check(self, host: str) -> None:
+        """Проверяет, можно ли обращаться к хосту; иначе CircuitOpenError."""
+        opened_at = self._opened_at.get(host)
+        if opened_at is None:
+            return
+        remaining = opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpenError(host, remaining)
+
+    def record_success(self, host: str) -> None:
+        if self._opened_at.pop(host, None) is not None:
+            logger.info(f"Хост {host} снова доступен")
+        self._failures.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        if failures >= self.failure_threshold:
+            if host not in self._opened_at:
+                logger.warning(f"Хост {host} недоступен после {failures} ошибок подряд, "
+                               f"запросы приостановлены на {self.reset_timeout:.0f} с")
+            self._opened_at[host] = time.monotonic()
@@ -0,0 +1,119 @@
+import random
+import asyncio
+import logging
+from typing import Optional, Callable, Awaitable
+from .config import ParserConfig
+from .scrapers import CodeRunRatingScraper
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Фоновое периодическое обновление данных (stale-while-revalidate).
+
+    Новое хранилище собирается в стороне и подменяется в парсере целиком
+    только после успешного сбора, поэтому читатели всегда видят последний
+    полный набор данных. При ошибке сбора остаются прежние данные.
+    request_refresh() позволяет запросить внеочередное обновление, не дожидаясь его.
+    """
+    def __init__(
+        self,
+        scraper: CodeRunRatingScraper,
+        interval: Optional[float] = None,
+        jitter: Optional[float] = None,
+        on_refresh: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        """
+        Args:
+            scraper: Парсер, данные которого обновляются
+            interval: Период обновления (в секундах)
+            jitter: Максимальная случайная добавка к периоду (в секундах)
+            on_refresh: Корутина, вызываемая после каждого успешного обновления
+        """
+        self.scraper = scraper
+        self.interval = interval or ParserConfig.REFRESH_INTERVAL
+        self.jitter = jitter if jitter is not None else ParserConfig.REFRESH_JITTER
+        self.on_refresh = on_refresh
+        # Событие создается в работающем цикле событий (_get_wake)
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_wake(self) -> asyncio.Event:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        return self._wake
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Запускает фоновый цикл обновления."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Фоновое обновление запущено: период {self.interval:.0f} с, разброс {self.jitter:.0f} с")
+
+    async def stop(self) -> None:
+        """Останавливает фоновый цикл обновления."""
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Фоновое обновление остановлено")
+
+    def request_refresh(self) -> bool:
+        """Запрашивает внеочередное обновление, не дожидаясь его.
+
+        Returns:
+            True, если обновление запланировано или уже выполняется,
+            False, если данные свежее минимального интервала обновления
+        """
+        if self.scraper.is_updating:
+            return True
+        age = self.scraper.data_age
+        if age is not None and age < self.scraper.min_update_interval:
+            return False
+        self._get_wake().set()
+        return True
+
+    def _next_delay(self, after_failure: bool) -> float:
+        delay = self.interval + random.uniform(0, self.jitter)
+        age = self.scraper.data_age
+        if after_failure:
+            # После ошибки следующая попытка - через полный период, а не сразу
+            return delay
+        if age is None:
+            return 0.0
+        return max(0.0, delay - age)
+
+    async def _run(self) -> None:
+        failed = False
+        while True:
+            delay = self._next_delay(failed)
+            logger.debug(f"Следующее фоновое обновление через {delay:.0f} с")
+            try:
+                await asyncio.wait_for(self._get_wake().wait(), timeout=delay)
+                logger.info("Внеочередное обновление по запросу")
+            except asyncio.TimeoutError:
+                pass
+            self._get_wake().clear()
+
+            try:
+                refreshed = await self.scraper.update()
+                failed = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Фоновое обновление не удалось, используются прежние данные: {str(e)}")
+                failed = True
+                continue
+
+            if refreshed and self.on_refresh is not None:
+                try:
+                    await self.on_refresh()
+                except Exception as e:
+                    logger.error(f"Ошибка обработки обновленных данных: {str(e)}", exc_info=True)
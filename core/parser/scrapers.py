@@ -1,13 +1,24 @@
-import pytz
+import os
+import hashlib
+import itertools
 import asyncio
-import aiohttp
 import logging
 import pandas as pd
-from bs4 import BeautifulSoup
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from pathlib import Path
+from urllib.parse import urlparse
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Awaitable, Callable, Union
 from .exceptions import *
 from .config import ParserConfig
+from .rate_limit import HostRateLimiter
+from .transport import HttpTransport
+from .retry import RetryPolicy, CircuitBreaker
+from .checkpoint import ScrapeCheckpoint
+from .spool import PageSpool
+from .page_parsers import parse_page, get_page_parser
+from .store import RatingStore
+from .snapshot import DatasetSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +28,17 @@ class CodeRunRatingScraper:
         languages: Optional[List[str]] = None,
         delay: Optional[float] = None,
         max_retries: Optional[int] = None,
-        include_general: bool = None
+        include_general: bool = None,
+        concurrent: bool = None,
+        max_concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        incremental: bool = None,
+        parser_backend: Optional[str] = None,
+        parse_executor: Optional[str] = ParserConfig.PARSE_EXECUTOR,
+        parse_workers: Optional[int] = None,
+        min_update_interval: Optional[float] = None,
+        partial_update: bool = None,
+        streaming: bool = None
     ):
         """
         Парсер рейтинга CodeRun.
@@ -27,98 +48,176 @@ class CodeRunRatingScraper:
             delay: Задержка между запросами (в секундах)
             max_retries: Максимальное количество попыток повторного запроса
             include_general: Включать ли общий зачет в парсинг
+            concurrent: Собирать ли рейтинги и страницы конкурентно
+            max_concurrency: Глобальный лимит одновременных запросов
+            requests_per_second: Лимит запросов в секунду к одному хосту
+            incremental: Перезагружать ли только изменившиеся страницы
+            parser_backend: Бэкенд разбора HTML ('stream', 'lxml' или 'bs4')
+            parse_executor: Где разбирать страницы: 'process', 'thread'
+                или None (в цикле событий)
+            parse_workers: Количество воркеров для разбора страниц
+            min_update_interval: Минимальный интервал между обновлениями (в секундах);
+                более частые вызовы update() не запускают сбор
+            partial_update: При ошибке сбора типа рейтинга сохранять остальные
+                и оставлять его прежние данные
+            streaming: Записывать страницы на диск по мере сбора, не накапливая
+                их в памяти (инкрементальное обновление в этом режиме не используется)
         """
         self.languages = languages or ParserConfig.DEFAULT_LANGUAGES
         self.delay = delay or ParserConfig.DELAY_BETWEEN_REQUESTS
         self.max_retries = max_retries or ParserConfig.MAX_RETRIES
         self.include_general = include_general if include_general is not None \
                                 else ParserConfig.INCLUDE_GENERAL
-        self.df = pd.DataFrame()
+        self.concurrent = concurrent if concurrent is not None \
+                                else ParserConfig.CONCURRENT_UPDATE
+        self.max_concurrency = max_concurrency or ParserConfig.MAX_CONCURRENT_REQUESTS
+        # Примитивы asyncio создаются в работающем цикле событий (_get_semaphore)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter = HostRateLimiter(
+            requests_per_second or ParserConfig.REQUESTS_PER_SECOND_PER_HOST
+        )
+        self.incremental = incremental if incremental is not None \
+                                else ParserConfig.INCREMENTAL_UPDATE
+        self.parser_backend = parser_backend or ParserConfig.PARSER_BACKEND
+        get_page_parser(self.parser_backend)
+        if parse_executor not in (None, 'process', 'thread'):
+            raise ValueError(f"Неподдерживаемый тип пула для разбора: {parse_executor}")
+        self.parse_executor = parse_executor
+        self.parse_workers = parse_workers or ParserConfig.PARSE_WORKERS
+        self._executor: Optional[Executor] = None
+        self._versions = itertools.count(1)
+        self._snapshot = DatasetSnapshot(0, None, RatingStore())
+        self._pages: Dict[str, List[List[Dict[str, Any]]]] = {}
+        self._page_hashes: Dict[str, List[str]] = {}
         self._last_update: Optional[datetime] = None
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._lock = asyncio.Lock()
-        self._is_updating = False
+        self._last_full_update: Optional[datetime] = None
+        self._transport = HttpTransport()
+        self._retry_policy = RetryPolicy(self.max_retries)
+        self._circuit_breaker = CircuitBreaker()
+        self.min_update_interval = min_update_interval if min_update_interval is not None \
+                                else ParserConfig.MIN_UPDATE_INTERVAL
+        self._update_task: Optional[asyncio.Task] = None
+        self.partial_update = partial_update if partial_update is not None \
+                                else ParserConfig.PARTIAL_UPDATE
+        self._stale_ratings: List[str] = []
+        self.streaming = streaming if streaming is not None \
+                                else ParserConfig.STREAMING_UPDATE
+        self._checkpoint = ScrapeCheckpoint() if ParserConfig.CHECKPOINT_ENABLED else None
+        self._update_listeners: List[Callable[[RatingStore], None]] = []
+
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        """Текущая версия набора данных (читатели разделяют ее без копирования)."""
+        return self._snapshot
+
+    @property
+    def store(self) -> RatingStore:
+        """Данные текущей версии."""
+        return self._snapshot.store
+
+    @store.setter
+    def store(self, store: RatingStore) -> None:
+        self._publish(store)
+
+    def _publish(self, store: RatingStore, timestamp: Optional[datetime] = None) -> DatasetSnapshot:
+        """Публикует новую версию данных (атомарная замена ссылки на снимок)."""
+        snapshot = DatasetSnapshot(next(self._versions), timestamp or datetime.now(), store)
+        self._snapshot = snapshot
+        logger.debug(f"Опубликована версия данных {snapshot.version} ({len(store)} строк)")
+        return snapshot
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Данные рейтинга в прежнем формате (строятся один раз на версию данных)."""
+        return self.store.to_legacy_frame()
+
+    @property
+    def stale_ratings(self) -> List[str]:
+        """Типы рейтинга, которые не удалось обновить при последнем обновлении."""
+        return list(self._stale_ratings)
+
+    @property
+    def transport_stats(self) -> Dict[str, int]:
+        """Счетчики HTTP-транспорта за последнее обновление."""
+        return self._transport.stats()
+
+    @property
+    def is_updating(self) -> bool:
+        """Выполняется ли сейчас обновление данных."""
+        return self._update_task is not None and not self._update_task.done()
 
     @property
     def last_update(self) -> Optional[datetime]:
         """Возвращает время последнего успешного обновления данных."""
         return self._last_update
 
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Создает или возвращает существующую сессию."""
-        if self._session is None or self._session.closed:
-            logger.debug("Создание новой HTTP-сессии")
-            self._session = aiohttp.ClientSession(
-                headers=ParserConfig.HEADERS,
-                timeout=aiohttp.ClientTimeout(total=ParserConfig.REQUEST_TIMEOUT)
-            )
-        return self._session
-
-    async def close(self) -> None:
-        """Закрывает HTTP-сессию."""
-        if self._session and not self._session.closed:
-            logger.debug("Закрытие HTTP-сессии")
-            await self._session.close()
-
-    def _get_total_pages(self, soup: BeautifulSoup) -> int:
-        """Определяет общее количество страниц с рейтингом."""
-        pagination = soup.find('div', class_='Pagination-Pages')
-        if pagination:
-            page_links = pagination.find_all('a', class_='Pagination-PagesItem')
-            if page_links:
-                return max(int(link.text) for link in page_links if link.text.isdigit())
-        return 1
-
-    def _parse_table(self, soup: BeautifulSoup, rating_type: str) -> tuple:
-        """Парсит таблицу рейтинга и возвращает данные + флаг обнаружения 0 баллов.
-        Применяется одинаково как к языкам, так и к общему зачету."""
-        table = soup.find('table', class_='RatingTable_rating-table__ixEUi')
-        if not table:
-            logger.warning(f"Не найдена таблица рейтинга для {rating_type}")
-            return [], False
-
-        rows = table.select('tbody tr[role="row"]')
-        data = []
-        found_zero = False
-        
-        for row in rows:
-            cells = row.find_all(['td', 'th'], class_='Cell')
-            if len(cells) < 5:
-                continue
+    @property
+    def data_age(self) -> Optional[float]:
+        """Возраст данных в секундах (None, если данных еще нет)."""
+        if self._last_update is None:
+            return None
+        return (datetime.now() - self._last_update).total_seconds()
 
-            rank = cells[0].get_text(strip=True)
-            user = cells[1].get_text(strip=True)
-            tasks = cells[2].get_text(strip=True)
-            points_text = cells[3].get_text(strip=True)
+    def add_update_listener(self, listener: Callable[[RatingStore], None]) -> None:
+        """Регистрирует обработчик, вызываемый с новым хранилищем
+        после каждого успешного обновления или загрузки данных."""
+        self._update_listeners.append(listener)
 
+    def _notify_update(self) -> None:
+        """Оповещает обработчики об обновлении данных."""
+        for listener in self._update_listeners:
             try:
-                points_value = float(points_text.replace(',', '.'))
-                if points_value == 0:
-                    found_zero = True
-                    logger.debug(f"Найден участник с 0 баллов: {user}")
-            except ValueError:
-                points_value = 0.0
-
-            time_tag = cells[4].find('time')
-            if time_tag:
-                dt = datetime.fromisoformat(time_tag['datetime'])
-                dt = dt.astimezone(pytz.timezone(ParserConfig.TIME_ZONE))
-                date = dt
+                listener(self.store)
+            except Exception as e:
+                logger.error(f"Ошибка в обработчике обновления данных: {str(e)}", exc_info=True)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Создает или возвращает пул для разбора страниц."""
+        if self.parse_executor and self._executor is None:
+            logger.debug(f"Создание пула для разбора страниц ({self.parse_executor}, "
+                         f"воркеров: {self.parse_workers})")
+            if self.parse_executor == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.parse_workers)
             else:
-                date_str = cells[4].get_text(strip=True)
-                date = pd.to_datetime(date_str, errors='coerce') or pd.NaT
-
-            data.append({
-                'Участник': user,
-                'Задачи': int(tasks) if tasks.isdigit() else 0,
-                f'Место_{rating_type}': rank,
-                f'Баллы_{rating_type}': points_value,
-                'Дата': date
-            })
-            if found_zero:
-                break
-        logger.debug(f"Обработано {len(data)} строк для {rating_type}")
-        return data, found_zero
+                self._executor = ThreadPoolExecutor(max_workers=self.parse_workers,
+                                                    thread_name_prefix='page-parser')
+        return self._executor
+
+    async def close(self) -> None:
+        """Прерывает текущее обновление, закрывает HTTP-сессию и пул разбора страниц."""
+        if self.is_updating:
+            logger.debug("Отмена выполняющегося обновления")
+            self._update_task.cancel()
+        await self._transport.close()
+        if self._executor is not None:
+            logger.debug("Остановка пула разбора страниц")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_rating_types(self) -> List[str]:
+        """Возвращает типы рейтинга в порядке сбора."""
+        rating_types = ['Общий'] if self.include_general else []
+        return rating_types + list(self.languages)
+
+    async def _parse_page(self, html: str, rating_type: str) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Разбирает HTML страницы: строки рейтинга, флаг 0 баллов и число страниц.
+        Если задан пул, разбор выполняется в нем и не блокирует цикл событий."""
+        executor = self._get_executor()
+        if executor is None:
+            return parse_page(html, rating_type, self.parser_backend)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, parse_page, html, rating_type, self.parser_backend)
+
+    @staticmethod
+    def _page_hash(page_data: List[Dict[str, Any]]) -> str:
+        """Возвращает хэш содержимого разобранной страницы."""
+        content = repr([tuple(row.items()) for row in page_data])
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
 
     async def _fetch_page(self, rating_type: str, page: int) -> str:
         """Загружает страницу.
@@ -127,65 +226,158 @@ class CodeRunRatingScraper:
             rating_type: Тип рейтинга ('Общий' или язык программирования)
             page: Номер страницы
         """
-        session = await self._get_session()
         params = {"currentPage": page}
         
         if rating_type != 'Общий':
             params["language"] = rating_type
         
-        for attempt in range(self.max_retries):
+        host = urlparse(ParserConfig.BASE_URL).netloc
+        for attempt in range(self._retry_policy.max_retries):
             try:
+                self._circuit_breaker.check(host)
                 logger.debug(f"Запрос страницы {page} для {rating_type} (попытка {attempt + 1})")
-                async with session.get(
-                    ParserConfig.BASE_URL,
-                    params=params,
-                    ssl=False
-                ) as response:
-                    response.raise_for_status()
-                    return await response.text()
+                async with self._get_semaphore():
+                    await self._rate_limiter.acquire(host)
+                    html = await self._transport.get_text(
+                        ParserConfig.BASE_URL, params, (rating_type, page)
+                    )
+                self._circuit_breaker.record_success(host)
+                return html
             except Exception as e:
-                if attempt == self.max_retries - 1:
+                retryable = self._retry_policy.is_retryable(e)
+                if retryable:
+                    self._circuit_breaker.record_failure(host)
+                if not retryable or attempt == self._retry_policy.max_retries - 1:
                     logger.error(f"Ошибка загрузки страницы {page} для {rating_type}: {str(e)}")
-                    raise NetworkError(f"Не удалось загрузить страницу {page} для {rating_type} после {self.max_retries} попыток: {str(e)}")
-                await asyncio.sleep(self.delay * 2)
-                logger.debug(f"Повторная попытка ({attempt + 2}/{self.max_retries})")
+                    if isinstance(e, NetworkError):
+                        raise
+                    raise NetworkError(f"Не удалось загрузить страницу {page} для {rating_type} "
+                                       f"(попыток: {attempt + 1}): {str(e)}")
+                pause = self._retry_policy.backoff(attempt, e)
+                logger.debug(f"Повторная попытка ({attempt + 2}/{self._retry_policy.max_retries}) "
+                             f"через {pause:.1f} с: {str(e)}")
+                await asyncio.sleep(pause)
 
-    async def _collect_stats(self, rating_type: str) -> List[Dict[str, Any]]:
-        """Cобирает статистику по всем страницам для указанного типа рейтинга.
-        Прекращает парсинг при обнаружении первого участника с 0 баллов."""
-        all_data = []
-        found_zero = False
-        page = 1
+    async def _fetch_unless_checkpointed(self, rating_type: str, page: int, delay: float = 0.0) -> Optional[str]:
+        """Загружает страницу после задержки, если ее нет в контрольных точках
+        (иначе возвращает None без запроса)."""
+        if self._checkpoint is not None and (rating_type, page) in self._checkpoint:
+            return None
+        if delay:
+            await asyncio.sleep(delay)
+        return await self._fetch_page(rating_type, page)
+
+    async def _parse_or_restore(
+        self,
+        rating_type: str,
+        page: int,
+        html: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Разбирает загруженную страницу и сохраняет контрольную точку
+        или, если html равен None, восстанавливает страницу из контрольной точки."""
+        loop = asyncio.get_running_loop()
+        if html is None:
+            parsed = await loop.run_in_executor(None, self._checkpoint.get, rating_type, page)
+            if parsed is not None:
+                logger.debug(f"[{rating_type}] Страница {page} восстановлена из контрольной точки")
+                return parsed
+            html = await self._fetch_page(rating_type, page)
+
+        parsed = await self._parse_page(html, rating_type)
+        if self._checkpoint is not None:
+            await loop.run_in_executor(None, self._checkpoint.put, rating_type, page, parsed)
+        return parsed
+
+    async def _load_page(self, rating_type: str, page: int) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Загружает и разбирает страницу (или берет ее из контрольной точки)."""
+        html = await self._fetch_unless_checkpointed(rating_type, page)
+        return await self._parse_or_restore(rating_type, page, html)
+
+    @staticmethod
+    def _discard(task: Optional[asyncio.Future]) -> None:
+        """Отменяет ненужную задачу, не оставляя ее ошибку необработанной."""
+        if task is None:
+            return
+        if task.done():
+            if not task.cancelled():
+                task.exception()
+        else:
+            task.cancel()
+
+    async def _iter_pages(
+        self,
+        rating_type: str,
+        delay: float
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]], bool, int]]:
+        """Последовательно выдает разобранные страницы начиная с первой.
+
+        Пока потребитель обрабатывает страницу N, уже загружается страница N+1.
+        Упреждающая загрузка начинается только после разбора страницы N и только
+        если она не последняя и на ней нет участника с 0 баллов, поэтому лишних
+        запросов за границей нулевых баллов не делается. Если потребитель
+        прекращает итерацию, упреждающая загрузка отменяется.
 
+        Yields:
+            Номер страницы, строки, флаг 0 баллов и общее количество страниц
+        """
+        page = 1
+        total_pages = None
+        fetch = asyncio.ensure_future(self._fetch_unless_checkpointed(rating_type, page))
         try:
-            while not found_zero:
+            while fetch is not None:
                 logger.debug(f"[{rating_type}] Загрузка страницы {page}")
+                html = await fetch
+                fetch = None
 
-                html = await self._fetch_page(rating_type, page)
-                soup = BeautifulSoup(html, 'html.parser')
-                
+                page_data, found_zero, page_count = await self._parse_or_restore(rating_type, page, html)
+                if total_pages is None:
+                    total_pages = page_count
+                if page_data and not found_zero and page < total_pages:
+                    fetch = asyncio.ensure_future(
+                        self._fetch_unless_checkpointed(rating_type, page + 1, delay)
+                    )
+                yield page, page_data, found_zero, total_pages
+                page += 1
+        finally:
+            self._discard(fetch)
+
+    async def _collect_stats(
+        self,
+        rating_type: str,
+        sink: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        delay: Optional[float] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Cобирает статистику по всем страницам для указанного типа рейтинга.
+        Прекращает парсинг при обнаружении первого участника с 0 баллов.
+        Возвращает строки, сгруппированные по страницам.
+
+        Если передан sink, каждая страница сразу передается в него и не
+        накапливается (возвращается пустой список)."""
+        all_data = []
+        rows = 0
+        pages = self._iter_pages(rating_type, self.delay if delay is None else delay)
+
+        try:
+            async for page, page_data, found_zero, total_pages in pages:
                 if page == 1:
-                    total_pages = self._get_total_pages(soup)
                     if total_pages <= 0:
                         logger.error(f"Неверное количество страниц: {total_pages}")
                         raise DataCollectionError(rating_type, "Не удалось определить количество страниц")
                     logger.info(f"Всего страниц для {rating_type}: {total_pages}")
 
-                page_data, zero_detected = self._parse_table(soup, rating_type)
-                found_zero = zero_detected
-                
                 if not page_data:
                     if page == 1:
                         logger.error(f"Нет данных на первой странице для {rating_type}")
                         raise EmptyDataError(f"Нет данных на первой странице для {rating_type}")
                     break
                 
-                all_data.extend(page_data)
-                
-                if not found_zero and page < total_pages:
-                    page += 1
-                    await asyncio.sleep(self.delay)
+                rows += len(page_data)
+                if sink is not None:
+                    await sink(page_data)
                 else:
+                    all_data.append(page_data)
+                
+                if found_zero or page >= total_pages:
                     logger.debug(f"Завершение сбора для {rating_type} на странице {page}")
                     break
 
@@ -194,64 +386,424 @@ class CodeRunRatingScraper:
             if not isinstance(e, ScraperError):
                 raise DataCollectionError(rating_type, str(e))
             raise
+        finally:
+            await pages.aclose()
 
-        if not all_data:
+        if not rows:
             logger.error(f"Нет данных для {rating_type}")
             raise EmptyDataError(f"Не удалось собрать данные для {rating_type}")
 
-        logger.info(f"Собрано {len(all_data)} записей для {rating_type}")
+        logger.info(f"Собрано {rows} записей для {rating_type}")
         return all_data
 
-    async def update(self) -> None:
-        """Асинхронно обновляет данные рейтинга."""
-        if self._is_updating:
-            logger.warning("Попытка обновления во время уже выполняющегося обновления")
-            raise UpdateInProgressError()
-            
-        self._is_updating = True
+    async def _find_zero_page(
+        self,
+        rating_type: str,
+        total_pages: int,
+        first_page: List[Dict[str, Any]],
+        loaded: Dict[int, Tuple[List[Dict[str, Any]], bool]]
+    ) -> int:
+        """Находит первую страницу (начиная со второй), на которой есть участник
+        с 0 баллов или нет строк.
+
+        Участники отсортированы по убыванию баллов, поэтому на всех следующих
+        страницах тоже только нули. Проверяемая страница оценивается продолжением
+        прямой через баллы двух последних известных строк (первая строка первой
+        страницы и последние строки проверенных страниц без нулей), а если баллы
+        на них одинаковы - шагом вдвое больше предыдущего, но не дальше удвоения
+        номера последней страницы без нулей. При длинном хвосте малых баллов
+        оценка получается раньше границы, и проверенная страница все равно нужна.
+        Если страница с нулем начинается с ненулевых баллов, все предыдущие
+        страницы без нулей и граница найдена точно, иначе она уточняется бинарным
+        поиском. Проверенные страницы сохраняются в loaded и повторно не загружаются.
+
+        Returns:
+            Номер страницы или total_pages + 1, если таких страниц нет
+        """
+        points_key = f'Баллы_{rating_type}'
+        page_size = len(first_page)
+        # Известные точки (номер строки, баллы) на страницах без нулей
+        known = [(0, first_page[0][points_key]), (page_size - 1, first_page[-1][points_key])]
+
+        async def probe(page: int) -> Optional[bool]:
+            """True - страница с нулем, False - без нулей, None - граница ровно на ней."""
+            logger.debug(f"[{rating_type}] Проверка страницы {page} при поиске границы")
+            page_data, found_zero, _ = await self._load_page(rating_type, page)
+            loaded[page] = (page_data, found_zero)
+            if page_data and not found_zero:
+                known.append((page * page_size - 1, page_data[-1][points_key]))
+                return False
+            if page_data and page_data[0][points_key] > 0:
+                return None
+            return True
+
+        def estimate(low: int, high: int) -> int:
+            (x1, y1), (x2, y2) = known[-2], known[-1]
+            last = low - 1
+            if y1 > y2 > 0:
+                zero_row = x2 + y2 * (x2 - x1) / (y1 - y2)
+                page = int(zero_row // page_size) + 1
+            else:
+                # Баллы не убывают (одинаковые на обеих страницах) - шаг вдвое больше предыдущего
+                page = last + 2 * max(1, last - x1 // page_size - 1)
+            return max(low, min(page, 2 * last, high - 1))
+
+        low, high = 2, total_pages + 1
+        while low < high:
+            page = estimate(low, high)
+            zero = await probe(page)
+            if zero is None:
+                return page
+            if zero:
+                high = page
+                break
+            low = page + 1
+
+        while low < high:
+            middle = (low + high) // 2
+            zero = await probe(middle)
+            if zero is None:
+                return middle
+            if zero:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    async def _collect_stats_concurrent(self, rating_type: str) -> List[List[Dict[str, Any]]]:
+        """Cобирает статистику по всем страницам для указанного типа рейтинга конкурентно.
+
+        Первая страница загружается отдельно, чтобы узнать общее количество страниц.
+        Затем по баллам проверенных страниц (_find_zero_page) находится первая
+        страница с нулевыми баллами,
+        и все страницы до нее, не загруженные при поиске, загружаются одновременно
+        (общее число запросов ограничено max_concurrency). Страницы собираются
+        строго по порядку, поэтому результат совпадает с последовательным сбором."""
+        all_data = []
+
+        try:
+            logger.debug(f"[{rating_type}] Загрузка страницы 1")
+            page_data, found_zero, total_pages = await self._load_page(rating_type, 1)
+
+            if total_pages <= 0:
+                logger.error(f"Неверное количество страниц: {total_pages}")
+                raise DataCollectionError(rating_type, "Не удалось определить количество страниц")
+            logger.info(f"Всего страниц для {rating_type}: {total_pages}")
+
+            if not page_data:
+                logger.error(f"Нет данных на первой странице для {rating_type}")
+                raise EmptyDataError(f"Нет данных на первой странице для {rating_type}")
+            all_data.append(page_data)
+
+            loaded: Dict[int, Tuple[List[Dict[str, Any]], bool]] = {}
+            cutoff = 1 if found_zero else await self._find_zero_page(rating_type, total_pages, page_data, loaded)
+            last_page = min(cutoff, total_pages)
+            logger.debug(f"[{rating_type}] Граница нулевых баллов: страница {cutoff} "
+                         f"(проверено страниц: {len(loaded)})")
+
+            missing = [page for page in range(2, last_page + 1) if page not in loaded]
+            if missing:
+                logger.debug(f"[{rating_type}] Загрузка страниц 2-{last_page} (осталось {len(missing)})")
+                parsed_pages = await self._gather(
+                    self._load_page(rating_type, page) for page in missing
+                )
+                for page, (page_data, found_zero, _) in zip(missing, parsed_pages):
+                    loaded[page] = (page_data, found_zero)
+
+            for page in range(2, last_page + 1):
+                page_data, _ = loaded[page]
+                if not page_data:
+                    break
+                all_data.append(page_data)
+
+        except Exception as e:
+            logger.error(f"Ошибка сбора данных для {rating_type}: {str(e)}", exc_info=True)
+            if not isinstance(e, ScraperError):
+                raise DataCollectionError(rating_type, str(e))
+            raise
+
+        logger.info(f"Собрано {sum(map(len, all_data))} записей для {rating_type} "
+                    f"(загружено страниц: {len(loaded) + 1})")
+        return all_data
+
+    async def _collect_stats_incremental(self, rating_type: str) -> List[List[Dict[str, Any]]]:
+        """Cобирает статистику, перезагружая только изменившиеся страницы.
+
+        Каждая загруженная страница сравнивается по хэшу с той же страницей
+        предыдущего снимка. После INCREMENTAL_UNCHANGED_PAGES неизменных страниц
+        подряд сбор останавливается, а оставшиеся страницы берутся из снимка
+        без участников, уже встретившихся на свежих страницах."""
+        old_pages = self._pages[rating_type]
+        old_hashes = self._page_hashes[rating_type]
+        all_data = []
+        unchanged_run = 0
+        loaded = 0
+        pages = self._iter_pages(rating_type, 0 if self.concurrent else self.delay)
+
+        try:
+            async for page, page_data, found_zero, total_pages in pages:
+                loaded = page
+                if page == 1 and total_pages <= 0:
+                    logger.error(f"Неверное количество страниц: {total_pages}")
+                    raise DataCollectionError(rating_type, "Не удалось определить количество страниц")
+
+                if not page_data:
+                    if page == 1:
+                        logger.error(f"Нет данных на первой странице для {rating_type}")
+                        raise EmptyDataError(f"Нет данных на первой странице для {rating_type}")
+                    break
+
+                all_data.append(page_data)
+                if found_zero or page >= total_pages:
+                    break
+
+                if page <= len(old_hashes) and self._page_hash(page_data) == old_hashes[page - 1]:
+                    unchanged_run += 1
+                else:
+                    unchanged_run = 0
+
+                if unchanged_run >= ParserConfig.INCREMENTAL_UNCHANGED_PAGES:
+                    fresh_users = {row['Участник'] for data in all_data for row in data}
+                    tail = [
+                        [row for row in data if row['Участник'] not in fresh_users]
+                        for data in old_pages[page:]
+                    ]
+                    all_data.extend(data for data in tail if data)
+                    logger.info(f"[{rating_type}] Страницы {page + 1}-{len(old_pages)} "
+                                f"не изменились, взяты из предыдущего снимка")
+                    break
+
+        except Exception as e:
+            logger.error(f"Ошибка сбора данных для {rating_type}: {str(e)}", exc_info=True)
+            if not isinstance(e, ScraperError):
+                raise DataCollectionError(rating_type, str(e))
+            raise
+        finally:
+            await pages.aclose()
+
+        logger.info(f"Собрано {sum(map(len, all_data))} записей для {rating_type} "
+                    f"(загружено страниц: {loaded})")
+        return all_data
+
+    @staticmethod
+    async def _gather(coros) -> list:
+        """Выполняет корутины конкурентно, отменяя оставшиеся при первой ошибке."""
+        tasks = [asyncio.ensure_future(coro) for coro in coros]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _collect_rating(
+        self,
+        rating_type: str,
+        incremental: bool,
+        spool: Optional[PageSpool] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Собирает один тип рейтинга выбранным способом.
+
+        При переданном spool страницы собираются по порядку и сразу
+        дописываются в его файл (конкурентность сохраняется между типами рейтинга)."""
+        name = "общего зачета" if rating_type == 'Общий' else f"языка {rating_type}"
+        try:
+            logger.debug(f"Начало обработки {name}")
+            if spool is not None:
+                loop = asyncio.get_running_loop()
+
+                async def sink(page_data: List[Dict[str, Any]]) -> None:
+                    await loop.run_in_executor(None, spool.append, rating_type, page_data)
+
+                data = await self._collect_stats(rating_type, sink, 0.0 if self.concurrent else None)
+            elif incremental and rating_type in self._pages:
+                data = await self._collect_stats_incremental(rating_type)
+            elif self.concurrent:
+                data = await self._collect_stats_concurrent(rating_type)
+            else:
+                data = await self._collect_stats(rating_type)
+            logger.info(f"Обработка {name} успешно завершена")
+            return data
+        except DataCollectionError as e:
+            logger.error(f"Ошибка обработки {name}: {str(e)}")
+            raise DataCollectionError(f"Не удалось обработать {name}: {str(e)}")
+
+    async def _collect_ratings(
+        self,
+        rating_types: List[str],
+        incremental: bool,
+        spool: Optional[PageSpool] = None
+    ) -> Dict[str, Union[List[List[Dict[str, Any]]], Exception]]:
+        """Собирает все типы рейтинга.
+
+        В режиме partial_update ошибка одного типа рейтинга не прерывает сбор
+        остальных: вместо его страниц возвращается исключение."""
+        async def collect(rating_type: str):
+            try:
+                return await self._collect_rating(rating_type, incremental, spool)
+            except Exception as e:
+                if not self.partial_update:
+                    raise
+                logger.error(f"Сбор {rating_type} не удался, остальные типы рейтинга продолжают собираться: {str(e)}")
+                return e
+
+        if self.concurrent:
+            results = await self._gather(collect(rating_type) for rating_type in rating_types)
+        else:
+            results = []
+            for rating_type in rating_types:
+                results.append(await collect(rating_type))
+        return dict(zip(rating_types, results))
+
+    def _needs_full_update(self) -> bool:
+        """Проверяет, пора ли выполнить полное обновление вместо инкрементального."""
+        if not self._pages or self._last_full_update is None:
+            return True
+        age = (datetime.now() - self._last_full_update).total_seconds()
+        return age >= ParserConfig.INCREMENTAL_FULL_REFRESH_INTERVAL
+
+    async def update(self, incremental: Optional[bool] = None, force: bool = False) -> bool:
+        """Асинхронно обновляет данные рейтинга.
+
+        Обновление выполняется в режиме single-flight: если сбор уже идет,
+        вызов не запускает новый, а ожидает текущий и получает его результат
+        или ошибку. Если с последнего обновления прошло меньше
+        min_update_interval секунд, сбор не запускается.
+
+        Args:
+            incremental: Перезагружать только изменившиеся страницы
+                (по умолчанию используется значение из конструктора)
+            force: Игнорировать min_update_interval
+
+        Returns:
+            True, если данные были собраны (этим или уже выполнявшимся вызовом),
+            False, если данные еще свежие и сбор не запускался
+        """
+        if self.is_updating:
+            logger.info("Обновление уже выполняется, ожидание его результата")
+            await asyncio.shield(self._update_task)
+            return True
+
+        if not force and self._last_update and self.min_update_interval:
+            age = self.data_age
+            if age < self.min_update_interval:
+                logger.info(f"Данные обновлены {age:.0f} с назад, повторный сбор не требуется")
+                return False
+
+        self._update_task = asyncio.create_task(self._run_update(incremental))
+        self._update_task.add_done_callback(self._on_update_done)
+        await asyncio.shield(self._update_task)
+        return True
+
+    @staticmethod
+    def _on_update_done(task: asyncio.Task) -> None:
+        # Ошибка получена ожидающими вызовами; здесь она только помечается
+        # как обработанная на случай, если все они были отменены
+        if not task.cancelled():
+            task.exception()
+
+    async def _run_update(self, incremental: Optional[bool]) -> None:
+        """Собирает данные и заменяет хранилище (выполняется в единственной задаче)."""
         logger.info("Начало обновления данных")
-        
+        self._transport.reset_stats()
+        loop = asyncio.get_running_loop()
+        spool = PageSpool() if self.streaming else None
         try:
-            async with self._lock:
-                all_results = []
-                if self.include_general:
-                    try:
-                        logger.debug("Начало обработки общего зачета")
-                        general_data = await self._collect_stats('Общий')
-                        all_results.extend(general_data)
-                        logger.info("Общий зачет успешно обработан")
-                    except DataCollectionError as e:
-                        logger.error(f"Ошибка обработки общего зачета: {str(e)}")
-                        raise DataCollectionError(f"Не удалось обработать общий зачет: {str(e)}")
-                
-                for lang in self.languages:
-                    try:
-                        logger.debug(f"Начало обработки языка {lang}")
-                        lang_data = await self._collect_stats(lang)
-                        all_results.extend(lang_data)
-                        logger.info(f"Язык {lang} успешно обработан")
-                    except DataCollectionError as e:
-                        logger.error(f"Ошибка обработки языка {lang}: {str(e)}")
-                        raise DataCollectionError(f"Не удалось обработать язык {lang}: {str(e)}")
-
-                if not all_results:
-                    logger.error("Нет данных для построения DataFrame")
-                    raise EmptyDataError("Нет данных для построения DataFrame")
-                    
-                self.df = pd.DataFrame(all_results)
-                self._last_update = datetime.now()
-                logger.info(f"Данные успешно обновлены. Всего записей: {len(self.df)}")
+            if self._checkpoint is not None:
+                await loop.run_in_executor(None, self._checkpoint.begin)
+            incremental = self.incremental if incremental is None else incremental
+            incremental = incremental and not self._needs_full_update() and spool is None
+            logger.info("Режим обновления: " + ("инкрементальный" if incremental else "полный")
+                        + (", потоковая запись на диск" if spool is not None else ""))
+
+            rating_types = self._get_rating_types()
+            if spool is not None:
+                await loop.run_in_executor(None, spool.reset)
+            collected = await self._collect_ratings(rating_types, incremental, spool)
+            failed = [rating_type for rating_type, result in collected.items() if isinstance(result, Exception)]
+            pages_by_type = {
+                rating_type: result for rating_type, result in collected.items() if rating_type not in failed
+            }
+            if not pages_by_type:
+                raise collected[failed[0]]
+
+            if spool is not None:
+                store = await loop.run_in_executor(None, spool.to_store, list(pages_by_type))
+                if store.empty:
+                    logger.error("Нет данных для построения хранилища")
+                    raise EmptyDataError("Нет данных для построения хранилища")
+            elif not any(data for pages in pages_by_type.values() for data in pages):
+                logger.error("Нет данных для построения хранилища")
+                raise EmptyDataError("Нет данных для построения хранилища")
+            else:
+                store = await loop.run_in_executor(None, RatingStore.from_pages, pages_by_type)
+            kept = [rating_type for rating_type in failed if rating_type in self.store.rating_types]
+            if kept:
+                parts = {
+                    rating_type: store if rating_type in pages_by_type else self.store
+                    for rating_type in rating_types
+                    if rating_type in pages_by_type or rating_type in kept
+                }
+                store = await loop.run_in_executor(None, RatingStore.combine, parts)
+            if failed:
+                logger.warning(f"Не удалось обновить: {', '.join(failed)}; "
+                               f"прежние данные сохранены для: {', '.join(kept) or 'нет'}")
+
+            snapshot = self._publish(store)
+            if spool is not None:
+                # Страницы не хранятся в памяти, следующее обновление будет полным
+                self._pages = {}
+                self._page_hashes = {}
+            else:
+                self._pages = {
+                    rating_type: pages_by_type[rating_type] if rating_type in pages_by_type
+                    else self._pages[rating_type]
+                    for rating_type in rating_types
+                    if rating_type in pages_by_type or rating_type in self._pages
+                }
+                self._page_hashes = {
+                    rating_type: [self._page_hash(data) for data in pages] if rating_type in pages_by_type
+                    else self._page_hashes[rating_type]
+                    for rating_type, pages in self._pages.items()
+                }
+            self._stale_ratings = failed
+            self._last_update = snapshot.timestamp
+            if not incremental and not failed:
+                self._last_full_update = self._last_update
+            logger.info(f"Данные успешно обновлены. Всего записей: {len(self.store)}")
+            logger.info(f"HTTP: {self._transport.stats_text()}")
+            if self._checkpoint is not None:
+                await loop.run_in_executor(None, self._checkpoint.clear)
+            self._notify_update()
         except Exception as e:
             logger.error(f"Критическая ошибка при обновлении: {str(e)}", exc_info=True)
             raise
         finally:
-            self._is_updating = False
-            logger.debug("Флаг обновления сброшен")
+            if spool is not None:
+                await loop.run_in_executor(None, spool.clear)
 
     def get_data(self) -> pd.DataFrame:
-        """Возвращает текущий DataFrame с рейтингом."""
-        return self.df.copy()
+        """Возвращает текущий DataFrame с рейтингом в прежнем формате
+        (без копирования данных, см. RatingStore.to_legacy_frame)."""
+        return self.store.to_legacy_frame()
     
+    @staticmethod
+    def _write_atomic(full_filename: str, write: Callable[[str], None]) -> None:
+        """Записывает файл через временный файл и переименование,
+        чтобы при сбое не остался наполовину записанный файл."""
+        path = Path(full_filename)
+        tmp_path = path.with_name(f".{path.stem}.tmp{path.suffix}")
+        try:
+            write(str(tmp_path))
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _normalize_format(file_format: Optional[str]) -> str:
+        file_format = (file_format or ParserConfig.DEFAULT_FILE_FORMAT).lower()
+        return 'feather' if file_format == 'arrow' else file_format
+
     def save(
         self,
         filename: str = None,
@@ -263,24 +815,31 @@ class CodeRunRatingScraper:
         
         Args:
             filename: Имя файла (без расширения)
-            file_format: Формат файла ('csv' или 'excel')
+            file_format: Формат файла ('csv', 'excel', 'feather' или 'parquet')
             encoding: Кодировка для CSV файлов
         """
-        if self.df.empty:
+        if self.store.empty:
             logger.error("Попытка сохранения пустого DataFrame")
             raise ValueError("DataFrame пуст, нечего сохранять.")
 
         filename = filename or ParserConfig.DEFAULT_FILENAME
-        file_format = file_format or ParserConfig.DEFAULT_FILE_FORMAT
+        file_format = self._normalize_format(file_format)
 
         try:
-            if file_format.lower() == 'csv':
+            if file_format in RatingStore.SNAPSHOT_FORMATS:
+                full_filename = f"{filename}{RatingStore.SNAPSHOT_FORMATS[file_format]}"
+                metadata = {'last_update': self._last_update.isoformat()} if self._last_update else None
+                self.store.write_snapshot(full_filename, file_format, metadata)
+                logger.info(f"Снимок данных сохранен ({file_format}): {full_filename}")
+            elif file_format == 'csv':
                 full_filename = f"{filename}.csv"
-                self.df.to_csv(full_filename, index=False, encoding=encoding)
+                df = self.store.to_legacy_frame()
+                self._write_atomic(full_filename, lambda path: df.to_csv(path, index=False, encoding=encoding))
                 logger.info(f"Данные сохранены в CSV: {full_filename}")
-            elif file_format.lower() in ('excel', 'xlsx'):
+            elif file_format in ('excel', 'xlsx'):
                 full_filename = f"{filename}.xlsx"
-                self.df.to_excel(full_filename, index=False)
+                df = self.store.to_legacy_frame()
+                self._write_atomic(full_filename, lambda path: df.to_excel(path, index=False))
                 logger.info(f"Данные сохранены в Excel: {full_filename}")
             else:
                 logger.error(f"Неподдерживаемый формат файла: {file_format}")
@@ -300,7 +859,7 @@ class CodeRunRatingScraper:
         
         Args:
             filename: Имя файла (без расширения)
-            file_format: Формат файла ('csv' или 'excel')
+            file_format: Формат файла ('csv', 'excel', 'feather' или 'parquet')
             encoding: Кодировка для CSV файлов
             
         Raises:
@@ -308,27 +867,39 @@ class CodeRunRatingScraper:
             FileNotFoundError: Если указанный файл не существует
         """
         filename = filename or ParserConfig.DEFAULT_FILENAME
-        file_format = file_format or ParserConfig.DEFAULT_FILE_FORMAT
+        file_format = self._normalize_format(file_format)
+        last_update = None
         
         try:
-            if file_format.lower() == 'csv':
+            if file_format in RatingStore.SNAPSHOT_FORMATS:
+                full_filename = f"{filename}{RatingStore.SNAPSHOT_FORMATS[file_format]}"
+                logger.debug(f"Загрузка снимка данных ({file_format}): {full_filename}")
+                store, metadata = RatingStore.read_snapshot(full_filename, file_format)
+                if 'last_update' in metadata:
+                    last_update = datetime.fromisoformat(metadata['last_update'])
+            elif file_format == 'csv':
                 full_filename = f"{filename}.csv"
                 logger.debug(f"Загрузка данных из CSV: {full_filename}")
-                self.df = pd.read_csv(full_filename, encoding=encoding)
-            elif file_format.lower() in ('excel', 'xlsx'):
+                store = RatingStore.from_legacy_frame(pd.read_csv(full_filename, encoding=encoding))
+            elif file_format in ('excel', 'xlsx'):
                 full_filename = f"{filename}.xlsx"
                 logger.debug(f"Загрузка данных из Excel: {full_filename}")
-                self.df = pd.read_excel(full_filename)
+                store = RatingStore.from_legacy_frame(pd.read_excel(full_filename))
             else:
                 logger.error(f"Неподдерживаемый формат файла: {file_format}")
                 raise ValueError(f"Неподдерживаемый формат файла: {file_format}")
             
-            if self.df.empty:
+            if store.empty:
                 logger.error("Загруженный DataFrame пуст")
                 raise ValueError("Загруженный DataFrame пуст.")
             
-            self._last_update = datetime.now()
-            logger.info(f"Данные успешно загружены из {full_filename}. Записей: {len(self.df)}")
+            snapshot = self._publish(store, last_update)
+            self._pages = {}
+            self._page_hashes = {}
+            self._stale_ratings = []
+            self._last_update = snapshot.timestamp
+            logger.info(f"Данные успешно загружены из {full_filename}. Записей: {len(self.store)}")
+            self._notify_update()
         except FileNotFoundError:
             logger.error(f"Файл не найден: {full_filename}")
             raise
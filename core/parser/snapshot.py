@@ -0,0 +1,43 @@
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from .store import RatingStore
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Опубликованная версия набора данных.
+
+    Скрапер создает новый снимок при каждом обновлении или загрузке данных и
+    заменяет ссылку на текущий снимок одним присваиванием, поэтому читатель,
+    взявший снимок, до конца запроса видит одну и ту же версию. Снимки
+    разделяются всеми читателями без копирования данных.
+        version   - номер версии, монотонно растет в пределах процесса
+        timestamp - время получения данных (None для пустого начального снимка)
+        store     - данные (RatingStore, не модифицируется)
+    """
+    version: int
+    timestamp: Optional[datetime]
+    store: RatingStore
+
+    @property
+    def fingerprint(self) -> str:
+        return self.store.fingerprint
+
+    @property
+    def empty(self) -> bool:
+        return self.store.empty
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def frame(self) -> pd.DataFrame:
+        """Данные для чтения: новый DataFrame над теми же массивами. Изменения
+        в нем не затрагивают снимок, а данные копируются только при записи
+        (copy-on-write, включается в core.parser.store и для pandas 2)."""
+        return self.store.frame.copy(deep=False)
+
+    def legacy_frame(self) -> pd.DataFrame:
+        """Данные в прежнем формате (строятся один раз на снимок)."""
+        return self.store.to_legacy_frame()
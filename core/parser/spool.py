@@ -0,0 +1,115 @@
+import shutil
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+from .config import ParserConfig
+from .store import RatingStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+
+class PageSpool:
+    """Потоковая запись собранных страниц на диск.
+
+    Для каждого типа рейтинга открывается файл Arrow IPC (<тип>.arrow),
+    в который страницы дописываются батчами не больше batch_rows строк после
+    нормализации (RatingStore.normalize_page), поэтому в памяти находятся
+    только загружаемые страницы и один незаписанный батч на тип рейтинга.
+    После сбора файлы один раз читаются в RatingStore.
+    Запись в файлы одного типа рейтинга должна выполняться последовательно.
+    """
+    def __init__(self, directory: Optional[Path] = None, batch_rows: Optional[int] = None):
+        if pa is None:
+            raise ImportError("Для потокового сбора необходимо установить пакет pyarrow")
+        self.directory = Path(directory or ParserConfig.SPOOL_DIR)
+        self.batch_rows = batch_rows or ParserConfig.SPOOL_BATCH_ROWS
+        self.schema = pa.schema([
+            ('participant', pa.string()),
+            ('rank', pa.int32()),
+            ('points', pa.float32()),
+            ('tasks', pa.int16()),
+            ('date', pa.timestamp('us', tz=ParserConfig.TIME_ZONE)),
+        ])
+        self._writers: Dict[str, Any] = {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._rows: Dict[str, int] = {}
+
+    def _path(self, rating_type: str) -> Path:
+        return self.directory / f"{rating_type}.arrow"
+
+    def reset(self) -> None:
+        """Удаляет файлы предыдущего сбора и готовит каталог."""
+        self._pending = {}
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._rows = {}
+
+    def append(self, rating_type: str, page_data: List[Dict[str, Any]]) -> int:
+        """Добавляет страницу; накопленный батч типа рейтинга записывается в файл.
+
+        Returns:
+            Количество строк типа рейтинга после добавления
+        """
+        pending = self._pending.setdefault(rating_type, [])
+        pending.extend(page_data)
+        if len(pending) >= self.batch_rows:
+            self._flush(rating_type)
+        self._rows[rating_type] = self._rows.get(rating_type, 0) + len(page_data)
+        return self._rows[rating_type]
+
+    def _flush(self, rating_type: str) -> None:
+        pending = self._pending.pop(rating_type, None)
+        if not pending:
+            return
+        frame = RatingStore.normalize_page(pending, rating_type)
+        frame['date'] = frame['date'].dt.as_unit('us')
+        batch = pa.RecordBatch.from_pandas(frame, schema=self.schema, preserve_index=False)
+
+        writer = self._writers.get(rating_type)
+        if writer is None:
+            writer = ipc.new_file(str(self._path(rating_type)), self.schema)
+            self._writers[rating_type] = writer
+        writer.write_batch(batch)
+
+    def rows(self, rating_type: str) -> int:
+        return self._rows.get(rating_type, 0)
+
+    def close(self) -> None:
+        """Записывает незаписанные батчи и закрывает файлы."""
+        for rating_type in list(self._pending):
+            self._flush(rating_type)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def _read(self, rating_type: str) -> pd.DataFrame:
+        with pa.memory_map(str(self._path(rating_type))) as source:
+            table = ipc.open_file(source).read_all()
+        frame = table.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+        frame['participant'] = frame['participant'].astype(object)
+        return frame
+
+    def to_store(self, rating_types: List[str]) -> RatingStore:
+        """Закрывает файлы и читает записанные типы рейтинга в хранилище."""
+        self.close()
+        frames = {
+            rating_type: self._read(rating_type)
+            for rating_type in rating_types if rating_type in self._rows
+        }
+        logger.info(f"Прочитано из потоковых файлов: {sum(map(len, frames.values()))} строк")
+        return RatingStore.from_frames(frames)
+
+    def clear(self) -> None:
+        """Удаляет файлы сбора."""
+        self._pending = {}
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._rows = {}
@@ -0,0 +1,317 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, Union
+from .config import ParserConfig
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as parquet
+except ImportError:
+    pa = None
+
+# Снимки данных раздаются читателям поверхностными копиями (copy(deep=False)).
+# Защищает их только copy-on-write: в pandas 3 он всегда включен, в pandas 2
+# без этой опции поверхностная копия делит буферы с оригиналом и запись
+# через .loc/.iloc изменила бы общий снимок.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+class RatingStore:
+    """Колоночное типизированное хранилище рейтинга в длинном (tidy) формате.
+
+    Одна строка - один участник в одном типе рейтинга:
+        participant  - category (имена интернированы, коды int32)
+        rating_type  - category ('Общий' и языки в порядке сбора)
+        rank         - Int32 (место; NA, если место не число)
+        points       - float32
+        tasks        - int16
+        date         - datetime64 в часовом поясе ParserConfig.TIME_ZONE
+
+    Хранилище неизменяемо по соглашению: методы возвращают новые объекты,
+    а frame не следует модифицировать на месте.
+    """
+    COLUMNS: List[str] = ['participant', 'rating_type', 'rank', 'points', 'tasks', 'date']
+    POINTS_DECIMALS: int = 4  # Точность восстановления баллов из float32
+    MISSING_RANK: str = '—'  # Место без числа (как на сайте) в прежнем формате
+    SNAPSHOT_FORMATS: Dict[str, str] = {'feather': '.arrow', 'parquet': '.parquet'}
+    SNAPSHOT_METADATA_KEY: bytes = b'coderun'
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        self.frame = frame if frame is not None else self._build([], [], [], [], [], [], [])
+        self._fingerprint: Optional[str] = None
+        self._legacy_frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def _normalize(
+        cls,
+        participants: List[str],
+        ranks: List[Any],
+        points: List[float],
+        tasks: List[int],
+        dates: List[Any]
+    ) -> pd.DataFrame:
+        """Приводит колонки к типам хранилища (участник пока остается строкой)."""
+        date = pd.to_datetime(pd.Series(dates, dtype=object), errors='coerce', utc=True)
+        return pd.DataFrame({
+            'participant': np.asarray(participants, dtype=object),
+            'rank': pd.to_numeric(pd.Series(ranks, dtype=object), errors='coerce').astype('Int32'),
+            'points': np.asarray(points, dtype=np.float32),
+            'tasks': np.asarray(tasks, dtype=np.int16),
+            'date': date.dt.tz_convert(ParserConfig.TIME_ZONE)
+        })
+
+    @classmethod
+    def _encode(cls, normalized: pd.DataFrame, rating_types: List[str], type_codes: List[int]) -> pd.DataFrame:
+        """Интернирует участников и типы рейтинга в категории."""
+        participant = pd.Categorical(normalized['participant'])
+        participant = pd.Categorical.from_codes(
+            participant.codes.astype(np.int32, copy=False), dtype=participant.dtype
+        )
+        return pd.DataFrame({
+            'participant': participant,
+            'rating_type': pd.Categorical.from_codes(
+                np.asarray(type_codes, dtype=np.int8), categories=rating_types
+            ),
+            'rank': normalized['rank'].array,
+            'points': normalized['points'].to_numpy(),
+            'tasks': normalized['tasks'].to_numpy(),
+            'date': normalized['date'].array
+        }, columns=cls.COLUMNS)
+
+    @classmethod
+    def _build(
+        cls,
+        participants: List[str],
+        rating_types: List[str],
+        type_codes: List[int],
+        ranks: List[Any],
+        points: List[float],
+        tasks: List[int],
+        dates: List[Any]
+    ) -> pd.DataFrame:
+        return cls._encode(cls._normalize(participants, ranks, points, tasks, dates), rating_types, type_codes)
+
+    @classmethod
+    def normalize_page(cls, page_data: List[Dict[str, Any]], rating_type: str) -> pd.DataFrame:
+        """Приводит записи одной страницы парсера к типам хранилища
+        (колонки participant, rank, points, tasks, date)."""
+        rank_key, points_key = f'Место_{rating_type}', f'Баллы_{rating_type}'
+        return cls._normalize(
+            [row['Участник'] for row in page_data],
+            [row[rank_key] for row in page_data],
+            [row[points_key] for row in page_data],
+            [row['Задачи'] for row in page_data],
+            [row['Дата'] for row in page_data]
+        )
+
+    @classmethod
+    def from_frames(cls, frames_by_type: Dict[str, pd.DataFrame]) -> 'RatingStore':
+        """Строит хранилище из нормализованных строк (normalize_page), сгруппированных по типам рейтинга."""
+        frames = list(frames_by_type.values())
+        if not frames:
+            return cls()
+        normalized = pd.concat(frames, ignore_index=True)
+        type_codes = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+        return cls(cls._encode(normalized, list(frames_by_type), type_codes))
+
+    @classmethod
+    def from_pages(cls, pages_by_type: Dict[str, List[List[Dict[str, Any]]]]) -> 'RatingStore':
+        """Строит хранилище из записей парсера, сгруппированных по типам рейтинга и страницам."""
+        rating_types = list(pages_by_type)
+        participants, type_codes, ranks, points, tasks, dates = [], [], [], [], [], []
+        for code, (rating_type, pages) in enumerate(pages_by_type.items()):
+            rank_key, points_key = f'Место_{rating_type}', f'Баллы_{rating_type}'
+            for page_data in pages:
+                for row in page_data:
+                    participants.append(row['Участник'])
+                    type_codes.append(code)
+                    ranks.append(row[rank_key])
+                    points.append(row[points_key])
+                    tasks.append(row['Задачи'])
+                    dates.append(row['Дата'])
+        return cls(cls._build(participants, rating_types, type_codes, ranks, points, tasks, dates))
+
+    @classmethod
+    def from_legacy_frame(cls, df: pd.DataFrame) -> 'RatingStore':
+        """Строит хранилище из DataFrame в прежнем формате
+        (колонки Участник, Задачи, Дата, Место_<тип>, Баллы_<тип>)."""
+        rating_types = [col[len('Место_'):] for col in df.columns if col.startswith('Место_')]
+        participants, type_codes, ranks, points, tasks, dates = [], [], [], [], [], []
+        for code, rating_type in enumerate(rating_types):
+            # Строки типа рейтинга определяются по баллам: место может отсутствовать
+            part = df[df[f'Баллы_{rating_type}'].notna()]
+            participants.extend(part['Участник'].tolist())
+            type_codes.extend([code] * len(part))
+            ranks.extend(part[f'Место_{rating_type}'].tolist())
+            points.extend(pd.to_numeric(part[f'Баллы_{rating_type}'], errors='coerce').fillna(0).tolist())
+            tasks.extend(pd.to_numeric(part['Задачи'], errors='coerce').fillna(0).astype(int).tolist())
+            dates.extend(part['Дата'].tolist())
+        return cls(cls._build(participants, rating_types, type_codes, ranks, points, tasks, dates))
+
+    @classmethod
+    def combine(cls, parts: Dict[str, 'RatingStore']) -> 'RatingStore':
+        """Собирает хранилище из типов рейтинга разных хранилищ.
+
+        Args:
+            parts: Тип рейтинга -> хранилище, из которого берутся его строки
+                (порядок ключей задает порядок типов рейтинга)
+        """
+        frames = [store.rating(rating_type) for rating_type, store in parts.items()]
+        if not frames:
+            return cls()
+        return cls(cls._build(
+            np.concatenate([np.asarray(frame['participant'], dtype=object) for frame in frames]),
+            list(parts),
+            np.repeat(np.arange(len(frames)), [len(frame) for frame in frames]),
+            np.concatenate([frame['rank'].to_numpy(dtype=object, na_value=None) for frame in frames]),
+            np.concatenate([frame['points'].to_numpy() for frame in frames]),
+            np.concatenate([frame['tasks'].to_numpy() for frame in frames]),
+            pd.concat([frame['date'] for frame in frames], ignore_index=True)
+        ))
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def fingerprint(self) -> str:
+        """Хэш содержимого хранилища: одинаковые данные дают одинаковый отпечаток,
+        в том числе после перезапуска и загрузки из файла."""
+        if self._fingerprint is None:
+            hashes = pd.util.hash_pandas_object(self.frame, index=False).to_numpy()
+            self._fingerprint = hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+        return self._fingerprint
+
+    @property
+    def rating_types(self) -> List[str]:
+        """Типы рейтинга в порядке сбора."""
+        return list(self.frame['rating_type'].cat.categories)
+
+    @property
+    def participants(self) -> pd.Index:
+        """Все участники (интернированные имена)."""
+        return self.frame['participant'].cat.categories
+
+    def rating(self, rating_type: str) -> pd.DataFrame:
+        """Строки одного типа рейтинга в порядке мест."""
+        return self.frame[self.frame['rating_type'] == rating_type]
+
+    def participant(self, name: str) -> pd.DataFrame:
+        """Строки одного участника по всем типам рейтинга."""
+        return self.frame[self.frame['participant'] == name]
+
+    def count_participants(self, min_points: float = 0.0) -> pd.Series:
+        """Количество участников с баллами больше min_points по типам рейтинга."""
+        mask = self.frame['points'].to_numpy() > min_points
+        return self.frame.loc[mask, 'rating_type'].value_counts(sort=False)
+
+    def memory_usage(self) -> int:
+        """Объем памяти, занимаемый хранилищем, в байтах."""
+        return int(self.frame.memory_usage(deep=True).sum())
+
+    @staticmethod
+    def _require_pyarrow() -> None:
+        if pa is None:
+            raise ImportError("Для бинарных снимков необходимо установить пакет pyarrow")
+
+    def write_snapshot(
+        self,
+        path: Union[str, Path],
+        file_format: str = 'feather',
+        metadata: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Атомарно сохраняет хранилище в бинарный снимок с сохранением типов колонок.
+
+        'feather' - файл Arrow IPC без сжатия (читается через memory map),
+        'parquet' - компактный файл Parquet. Запись идет во временный файл,
+        который затем переименовывается, поэтому читатели никогда не видят
+        недописанный снимок. metadata сохраняется в схеме файла.
+        """
+        self._require_pyarrow()
+        if file_format not in self.SNAPSHOT_FORMATS:
+            raise ValueError(f"Неподдерживаемый формат снимка: {file_format}")
+
+        table = pa.Table.from_pandas(self.frame, preserve_index=False)
+        if metadata:
+            table = table.replace_schema_metadata({
+                **table.schema.metadata,
+                self.SNAPSHOT_METADATA_KEY: json.dumps(metadata).encode()
+            })
+
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            if file_format == 'feather':
+                feather.write_feather(table, tmp_path, compression='uncompressed')
+            else:
+                parquet.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def read_snapshot(
+        cls,
+        path: Union[str, Path],
+        file_format: str = 'feather'
+    ) -> Tuple['RatingStore', Dict[str, str]]:
+        """Загружает хранилище и метаданные из снимка, записанного write_snapshot."""
+        cls._require_pyarrow()
+        if file_format == 'feather':
+            with pa.memory_map(str(path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        elif file_format == 'parquet':
+            table = parquet.read_table(path)
+        else:
+            raise ValueError(f"Неподдерживаемый формат снимка: {file_format}")
+
+        metadata = (table.schema.metadata or {}).get(cls.SNAPSHOT_METADATA_KEY)
+        frame = table.to_pandas()
+        missing = set(cls.COLUMNS) - set(frame.columns)
+        if missing:
+            raise ValueError(f"В снимке нет колонок: {', '.join(sorted(missing))}")
+        return cls(frame[cls.COLUMNS]), json.loads(metadata) if metadata else {}
+
+    def to_legacy_frame(self) -> pd.DataFrame:
+        """Возвращает данные в прежнем формате: по строке на запись парсера,
+        с колонками Место_<тип> (строки) и Баллы_<тип> для каждого типа рейтинга.
+
+        Таблица строится один раз, вызывающие получают поверхностную копию:
+        данные не копируются, а изменения в ней не затрагивают хранилище
+        благодаря copy-on-write (всегда в pandas 3, в pandas 2 включается
+        при импорте модуля)."""
+        if self._legacy_frame is None:
+            self._legacy_frame = self._build_legacy_frame()
+        return self._legacy_frame.copy(deep=False)
+
+    def _build_legacy_frame(self) -> pd.DataFrame:
+        frame = self.frame
+        type_codes = frame['rating_type'].cat.codes.to_numpy()
+        ranks = frame['rank']
+        rank_text = np.where(ranks.isna().to_numpy(), self.MISSING_RANK, ranks.astype(str).to_numpy())
+        points = np.round(frame['points'].to_numpy(dtype=np.float64), self.POINTS_DECIMALS)
+
+        participant = frame['participant'].cat
+        columns = {
+            'Участник': np.asarray(participant.categories, dtype=object)[participant.codes.to_numpy()],
+            'Задачи': frame['tasks'].to_numpy(dtype=np.int64),
+        }
+        for code, rating_type in enumerate(self.rating_types):
+            mask = type_codes == code
+            place = np.full(len(frame), np.nan, dtype=object)
+            place[mask] = rank_text[mask]
+            columns[f'Место_{rating_type}'] = place
+            columns[f'Баллы_{rating_type}'] = np.where(mask, points, np.nan)
+            if 'Дата' not in columns:
+                columns['Дата'] = frame['date'].array
+        columns.setdefault('Дата', frame['date'].array)
+        return pd.DataFrame(columns)
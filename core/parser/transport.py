@@ -0,0 +1,203 @@
+import gzip
+import json
+import zlib
+import asyncio
+import logging
+import aiohttp
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+from .config import ParserConfig
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, int]  # (тип рейтинга, номер страницы)
+
+
+class ResponseCache:
+    """Дисковый кэш ответов для условных запросов, ключ - тип рейтинга и страница.
+
+    Для каждой страницы хранятся два файла:
+    - <тип>_<страница>.json - валидаторы ответа (ETag, Last-Modified);
+    - <тип>_<страница>.html.gz - тело ответа, сжатое gzip.
+    Тело читается только при ответе 304 Not Modified.
+    """
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory or ParserConfig.HTTP_CACHE_DIR)
+
+    def _paths(self, key: CacheKey) -> Tuple[Path, Path]:
+        rating_type, page = key
+        stem = f"{rating_type}_{page}"
+        return self.directory / f"{stem}.json", self.directory / f"{stem}.html.gz"
+
+    def validators(self, key: CacheKey) -> Dict[str, str]:
+        """Возвращает сохраненные валидаторы страницы (пустой словарь, если их нет)."""
+        meta_path, body_path = self._paths(key)
+        try:
+            if body_path.exists():
+                return json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Не удалось прочитать валидаторы {key}: {str(e)}")
+        return {}
+
+    def body(self, key: CacheKey) -> Optional[str]:
+        """Возвращает сохраненное тело страницы."""
+        _, body_path = self._paths(key)
+        try:
+            return gzip.decompress(body_path.read_bytes()).decode('utf-8')
+        except (OSError, EOFError, zlib.error) as e:
+            logger.warning(f"Не удалось прочитать тело страницы {key} из кэша: {str(e)}")
+            return None
+
+    def put(self, key: CacheKey, validators: Dict[str, str], body: str) -> None:
+        """Сохраняет валидаторы и тело страницы (через временные файлы)."""
+        meta_path, body_path = self._paths(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path, data in (
+                (body_path, gzip.compress(body.encode('utf-8'), compresslevel=1)),
+                (meta_path, json.dumps(validators).encode('utf-8'))
+            ):
+                tmp_path = path.with_name(f".{path.name}.tmp")
+                tmp_path.write_bytes(data)
+                tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить страницу {key} в кэш: {str(e)}")
+
+    def discard(self, key: CacheKey) -> None:
+        """Удаляет страницу из кэша."""
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+
+class HttpTransport:
+    """HTTP-транспорт парсера.
+
+    - пул соединений TCPConnector с keep-alive, лимитом на хост и кэшем DNS;
+    - сжатие ответов (gzip/deflate, br при установленном пакете brotli),
+      распаковка выполняется вручную, чтобы учитывать реально переданные байты;
+    - условные запросы If-None-Match/If-Modified-Since по дисковому кэшу:
+      неизменная страница стоит ответа 304 без тела;
+    - счетчики запросов, попаданий в кэш и переданных байтов.
+    """
+    def __init__(self, cache: Optional[ResponseCache] = None, use_cache: Optional[bool] = None):
+        use_cache = ParserConfig.HTTP_CACHE_ENABLED if use_cache is None else use_cache
+        self.cache = cache or (ResponseCache() if use_cache else None)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.reset_stats()
+
+    @staticmethod
+    def accept_encoding() -> str:
+        return "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+    def reset_stats(self) -> None:
+        """Сбрасывает счетчики."""
+        self.requests = 0
+        self.cache_hits = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает счетчики: запросы, ответы 304, байты по сети и после распаковки."""
+        return {
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'bytes_received': self.bytes_received,
+            'bytes_decoded': self.bytes_decoded,
+        }
+
+    def stats_text(self) -> str:
+        return (f"запросов: {self.requests}, не изменилось (304): {self.cache_hits}, "
+                f"получено: {self.bytes_received / 1024:.1f} КБ "
+                f"(после распаковки {self.bytes_decoded / 1024:.1f} КБ)")
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Создает или возвращает существующую сессию."""
+        if self._session is None or self._session.closed:
+            logger.debug("Создание новой HTTP-сессии")
+            connector = aiohttp.TCPConnector(
+                limit=ParserConfig.CONNECTION_LIMIT,
+                limit_per_host=ParserConfig.CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=ParserConfig.DNS_CACHE_TTL,
+                keepalive_timeout=ParserConfig.KEEPALIVE_TIMEOUT,
+                ssl=False
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={**ParserConfig.HEADERS, 'Accept-Encoding': self.accept_encoding()},
+                timeout=aiohttp.ClientTimeout(total=ParserConfig.REQUEST_TIMEOUT),
+                auto_decompress=False
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            logger.debug("Закрытие HTTP-сессии")
+            await self._session.close()
+
+    @staticmethod
+    def _decode(body: bytes, content_encoding: str) -> bytes:
+        content_encoding = content_encoding.strip().lower()
+        if content_encoding in ('', 'identity'):
+            return body
+        if content_encoding in ('gzip', 'x-gzip'):
+            return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        if content_encoding == 'deflate':
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        if content_encoding == 'br' and brotli is not None:
+            return brotli.decompress(body)
+        raise ValueError(f"Неподдерживаемое сжатие ответа: {content_encoding}")
+
+    async def get_text(self, url: str, params: Dict[str, object], key: CacheKey) -> str:
+        """Выполняет GET-запрос и возвращает текст ответа.
+
+        Если страница есть в кэше, запрос отправляется условным; при ответе
+        304 возвращается сохраненное тело. Ошибки HTTP пробрасываются
+        как aiohttp.ClientResponseError.
+        """
+        session = await self.get_session()
+        loop = asyncio.get_running_loop()
+        headers = {}
+        validators = {}
+        if self.cache is not None:
+            validators = await loop.run_in_executor(None, self.cache.validators, key)
+            if 'etag' in validators:
+                headers['If-None-Match'] = validators['etag']
+            if 'last_modified' in validators:
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        async with session.get(url, params=params, headers=headers) as response:
+            self.requests += 1
+            if response.status == 304 and validators:
+                body = await loop.run_in_executor(None, self.cache.body, key)
+                if body is not None:
+                    self.cache_hits += 1
+                    self.bytes_decoded += len(body.encode('utf-8'))
+                    logger.debug(f"Страница {key} не изменилась (304)")
+                    return body
+                await loop.run_in_executor(None, self.cache.discard, key)
+                raise aiohttp.ClientError(f"Страница {key} не изменилась, но ее нет в кэше")
+
+            response.raise_for_status()
+            raw = await response.read()
+            self.bytes_received += len(raw)
+            decoded = self._decode(raw, response.headers.get('Content-Encoding', ''))
+            self.bytes_decoded += len(decoded)
+            text = decoded.decode(response.charset or 'utf-8', errors='replace')
+
+            if self.cache is not None:
+                new_validators = {}
+                if 'ETag' in response.headers:
+                    new_validators['etag'] = response.headers['ETag']
+                if 'Last-Modified' in response.headers:
+                    new_validators['last_modified'] = response.headers['Last-Modified']
+                if new_validators:
+                    await loop.run_in_executor(None, self.cache.put, key, new_validators, text)
+            return text